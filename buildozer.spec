@@ -18,7 +18,9 @@
  
  
  # (list) Source files to include (let empty to include all the files)
- source.include_exts =py,png,jpg,kv,atlas,ttf,json
+ # .env is never packaged, run tools/generate_app_config.py first so the
+ # SMS and email credentials ship in app_config.json
+ source.include_exts =py,png,jpg,kv,atlas,ttf,json,bin
  # (list) List of inclusions using pattern matching
  source.include_patterns = assets/*,screens/**/*,models/**/*,utils/**/*,migrations/**/*
  
@@ -58,7 +60,7 @@
  fullscreen = 0
  
  # (list) Permissions
- android.permissions = INTERNET,WRITE_EXTERNAL_STORAGE,READ_EXTERNAL_STORAGE,CAMERA,ACCESS_FINE_LOCATION,ACCESS_COARSE_LOCATION,READ_CONTACTS,WRITE_CONTACTS,BLUETOOTH,BLUETOOTH_ADMIN,BLUETOOTH_ADVERTISE,BLUETOOTH_CONNECT,BLUETOOTH_SCAN,BATTERY_STATS
+ android.permissions = INTERNET,ACCESS_NETWORK_STATE,WRITE_EXTERNAL_STORAGE,READ_EXTERNAL_STORAGE,CAMERA,ACCESS_FINE_LOCATION,ACCESS_COARSE_LOCATION,READ_CONTACTS,WRITE_CONTACTS,BLUETOOTH,BLUETOOTH_ADMIN,BLUETOOTH_ADVERTISE,BLUETOOTH_CONNECT,BLUETOOTH_SCAN,BATTERY_STATS
  
  # (int) Target Android API, should be as high as possible.
  android.api = 33
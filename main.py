@@ -16,6 +16,7 @@ import string
 import json
 import traceback
 from utils.android_permissions import AndroidPermissions
+from utils.app_config import load_app_config
 
 # Add the project root directory to Python path
 project_root = os.path.dirname(os.path.abspath(__file__))
@@ -38,6 +39,7 @@ from screens.info.info_screen import InfoMainScreen
 from screens.terminate_account.terminate_account_screen import TerminateAccountScreen
 from screens.bluetooth.bluetooth_screen import BluetoothScreen
 from screens.accidental_press.accidental_press_screen import AccidentalPressScreen
+from screens.alert_history.alert_history_screen import AlertHistoryScreen
 
 class DatabaseError(Exception):
     """Custom exception for database operations"""
@@ -108,6 +110,7 @@ class SafinityApp(App):
                 ('terminate_account', 'terminate_account_screen.kv'),  # Add terminate account KV file
                 ('bluetooth', 'bluetooth_screen.kv'),  # Add bluetooth screen KV file
             ('accidental_press', 'accidental_press_screen.kv'),  # Add accidental press screen KV file
+                ('alert_history', 'alert_history_screen.kv'),
             ]
             
             for folder, filename in kv_files:
@@ -146,6 +149,7 @@ class SafinityApp(App):
                 ('terminate_account', TerminateAccountScreen),  # Add terminate account screen
                 ('bluetooth', BluetoothScreen),  # Add bluetooth screen
             ('accidental_press', AccidentalPressScreen),  # Add accidental press screen
+                ('alert_history', AlertHistoryScreen),
             ]
             
             # Print available screens before adding new ones
@@ -178,6 +182,14 @@ class SafinityApp(App):
         print("Setting initial screen...")
         self.sm.current = 'login'
         return self.sm
+
+    def on_start(self):
+        """Warn straight away if alerts and verification codes cannot be sent"""
+        from utils.sms_gateways import get_sms_router
+        if not get_sms_router().configured_gateways():
+            print("Error: No SMS gateway configured, set VEEVOTECH_API_HASH or TWILIO_* in .env "
+                  "or generate app_config.json with tools/generate_app_config.py before building")
+            self.show_message("No SMS service is configured.\nEmergency alerts and verification\ncodes cannot be sent.")
         
     # CRUD Operations for User Data
     def create_user(self, user_data):
@@ -400,6 +412,7 @@ if __name__ == '__main__':
     try:
         print("Starting Safinity application...")
         load_dotenv()
+        load_app_config()  # Packaged builds carry their credentials here, .env is not packaged
         app = SafinityApp()
         print("Running application...")
         app.run()
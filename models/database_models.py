@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, inspect, text
+from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Index, UniqueConstraint, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 from kivy.utils import platform
+import json
 import os
 import traceback
 from utils.android_permissions import AndroidPermissions
@@ -28,6 +29,7 @@ class User(Base):
     
     # Relationship with EmergencyContact model
     emergency_contacts = relationship('EmergencyContact', back_populates='user', cascade='all, delete-orphan')
+    alerts = relationship('Alert', back_populates='user', cascade='all, delete-orphan')
     created_at = Column(DateTime, default=datetime.utcnow)
     last_phone_change = Column(DateTime, nullable=True)
     
@@ -80,6 +82,8 @@ class EmergencyContact(Base):
     name = Column(String, nullable=False)
     phone_number = Column(String, nullable=False)
     relation_type = Column(String, nullable=False)
+    email = Column(String, nullable=True)
+    webhook_url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     user = relationship('User', back_populates='emergency_contacts')
     
@@ -91,9 +95,79 @@ class EmergencyContact(Base):
             'name': self.name,
             'phone_number': self.phone_number,
             'relationship': self.relationship,
+            'email': self.email,
+            'webhook_url': self.webhook_url,
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
 
+class Alert(Base):
+    __tablename__ = 'alerts'
+    __table_args__ = (
+        Index('ix_alerts_user_created', 'user_id', 'created_at'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    message_type = Column(String, nullable=False)
+    message = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    user = relationship('User', back_populates='alerts')
+    deliveries = relationship('AlertDelivery', back_populates='alert', cascade='all, delete-orphan')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'message_type': self.message_type,
+            'message': self.message,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class AlertDelivery(Base):
+    __tablename__ = 'alert_deliveries'
+    __table_args__ = (
+        UniqueConstraint('alert_id', 'phone_number', name='uq_alert_deliveries_alert_phone'),
+        # Leading status column also serves plain status lookups
+        Index('ix_alert_deliveries_status_created', 'status', 'created_at'),
+        Index('ix_alert_deliveries_provider_id', 'provider_message_id'),
+    )
+    
+    # Delivery statuses, in the order a successful delivery moves through them
+    QUEUED = 'queued'
+    SENT = 'sent'
+    GATEWAY_ACKED = 'gateway_acked'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    
+    id = Column(Integer, primary_key=True)
+    alert_id = Column(Integer, ForeignKey('alerts.id'), nullable=False)
+    contact_name = Column(String, nullable=True)
+    phone_number = Column(String, nullable=False)
+    status = Column(String, nullable=False, default=QUEUED)
+    gateway = Column(String, nullable=True)
+    provider_message_id = Column(String, nullable=True)
+    error = Column(String, nullable=True)
+    # JSON of other channels (email, webhook) still owed to this contact, channel -> address
+    pending_channels = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    alert = relationship('Alert', back_populates='deliveries')
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'alert_id': self.alert_id,
+            'contact_name': self.contact_name,
+            'phone_number': self.phone_number,
+            'status': self.status,
+            'gateway': self.gateway,
+            'provider_message_id': self.provider_message_id,
+            'error': self.error,
+            'pending_channels': json.loads(self.pending_channels) if self.pending_channels else {},
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
 class UserCountry(Base):
     __tablename__ = 'user_country'
     
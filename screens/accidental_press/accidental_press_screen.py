@@ -6,6 +6,7 @@ from utils.emergency_contact_service import EmergencyContactService
 from kivy.uix.popup import Popup
 from kivy.uix.label import Label
 from kivy.clock import Clock
+from threading import Thread
 
 class AccidentalPressScreen(Screen):
     """Screen for verifying accidental emergency button press"""
@@ -42,40 +43,41 @@ class AccidentalPressScreen(Screen):
             return
         
         # Verify user credentials
-        session = self.db.get_session()
-        try:
-            user = self.db.verify_user_credentials(session, phone, password)
-            
-            if not user or user.id != user_id:
-                self.show_error('Invalid credentials')
-                return
-            
-            # Send accidental press message
-            self.status_message = 'Sending accidental press notification...'
-            self.send_accidental_press_message(session, user_id)
-            
-        finally:
-            session.close()
+        user = self.db.get_user_by_credentials(phone, password)
+        self.db.session.remove()
+        if not user or str(user['id']) != str(user_id):
+            self.show_error('Invalid credentials')
+            return
+        
+        # Send accidental press message
+        self.status_message = 'Sending accidental press notification...'
+        self.send_accidental_press_message(user_id)
     
-    def send_accidental_press_message(self, session, user_id):
-        """Send accidental press message to emergency contacts"""
-        # Custom message for accidental press
+    def send_accidental_press_message(self, user_id):
+        """Send accidental press message to emergency contacts
+        
+        Goes through the same send path as an accidental press on the
+        wearable, on a worker thread so the UI stays responsive.
+        """
         def send_message():
-            result = self.emergency_service.send_custom_message(
-                session, 
-                user_id,
-                "Accidental Press : The previous emergency alert was triggered by mistake. No action is required. The user is safe"
-            )
-            
-            if result['status'] in ['success', 'partial']:
-                self.show_success('Accidental press notification sent')
-                # Return to home screen after delay
-                Clock.schedule_once(lambda dt: self.go_to_home(), 2)
-            else:
-                self.show_error(f"Failed to send notification: {result['message']}")
+            try:
+                result = self.emergency_service.send_emergency_message(
+                    self.db.session(), user_id, 'accidental'
+                )
+            finally:
+                self.db.session.remove()
+            Clock.schedule_once(lambda dt: self.on_message_sent(result))
         
-        # Use Clock to avoid blocking UI
-        Clock.schedule_once(lambda dt: send_message(), 0.5)
+        Thread(target=send_message, daemon=True).start()
+    
+    def on_message_sent(self, result):
+        """Report the send result on the UI thread"""
+        if result['status'] in ['success', 'partial']:
+            self.show_success('Accidental press notification sent')
+            # Return to home screen after delay
+            Clock.schedule_once(lambda dt: self.go_to_home(), 2)
+        else:
+            self.show_error(f"Failed to send notification: {result['message']}")
     
     def show_error(self, message):
         """Show error popup"""
@@ -0,0 +1,114 @@
+from datetime import datetime
+from threading import Thread
+from kivy.uix.screenmanager import Screen
+from kivy.uix.boxlayout import BoxLayout
+from kivy.properties import StringProperty
+from kivy.app import App
+from kivy.clock import Clock
+from utils.alert_history import get_alert_history, SOURCE_BLUETOOTH
+
+class AlertHistoryRow(BoxLayout):
+    """One alert in the history list, recycled as the list scrolls"""
+    
+    title = StringProperty('')
+    subtitle = StringProperty('')
+    outcome = StringProperty('')
+
+class AlertHistoryScreen(Screen):
+    """Screen listing past alerts, newest first, loaded a page at a time"""
+    
+    status_message = StringProperty('')
+    page_size = 50
+    load_threshold = 0.1  # Fetch the next page within the last 10% of the list
+    
+    def __init__(self, **kwargs):
+        super(AlertHistoryScreen, self).__init__(**kwargs)
+        self._user_id = None
+        self._cursor = None
+        self._loading = False
+        self._exhausted = False
+        self._generation = 0  # Bumped on every reload, pages from older loads are dropped
+    
+    def on_enter(self):
+        """Called when screen is entered"""
+        app = App.get_running_app()
+        self._user_id = getattr(app, 'user_id', None)
+        self._generation += 1
+        self._cursor = None
+        self._loading = False
+        self._exhausted = False
+        self.ids.history_list.data = []
+        
+        if not self._user_id:
+            self.status_message = 'User not logged in'
+            return
+        
+        self.status_message = 'Loading alert history...'
+        self.load_next_page()
+    
+    def load_next_page(self):
+        """Fetch the page after the current cursor in the background"""
+        if self._loading or self._exhausted or not self._user_id:
+            return
+        self._loading = True
+        generation, user_id, cursor = self._generation, self._user_id, self._cursor
+        
+        def load():
+            page = None
+            try:
+                page = get_alert_history().page(user_id, self.page_size, cursor)
+            except Exception as e:
+                print(f"Error loading alert history: {str(e)}")
+            finally:
+                # Always hand back, or _loading would stay set and no page could load again
+                Clock.schedule_once(lambda dt: self._on_page_loaded(generation, page))
+        
+        Thread(target=load, daemon=True).start()
+    
+    def _on_page_loaded(self, generation, page):
+        if generation != self._generation:
+            return  # The list was reset while this page was loading, the newer load owns _loading
+        self._loading = False
+        if page is None:
+            self.status_message = 'Could not load alert history'
+            return
+        
+        self.ids.history_list.data.extend(self._to_row(item) for item in page['items'])
+        self._cursor = page['next_cursor']
+        self._exhausted = self._cursor is None
+        
+        count = len(self.ids.history_list.data)
+        self.status_message = f'{count} alerts' if count else 'No alerts sent yet'
+    
+    def on_scroll(self, scroll_y):
+        """Load more once the list is scrolled near the bottom"""
+        if scroll_y <= self.load_threshold:
+            self.load_next_page()
+    
+    @staticmethod
+    def _to_row(item):
+        """Convert a history entry into RecycleView data"""
+        when = datetime.fromtimestamp(item['created_at']).strftime('%d %b %Y, %H:%M')
+        source = 'Wearable button' if item['source'] == SOURCE_BLUETOOTH else 'App'
+        subtitle = f"{when} - {source}"
+        if item['place']:
+            subtitle += f" - {item['place']}"
+        
+        outcome = f"Sent to {item['sent']} of {item['total']} contacts"
+        sending = sum(1 for contact in item['outcomes'] if contact['status'] == 'pending')
+        if sending:
+            outcome += f", {sending} still sending"
+        
+        return {
+            'title': f"{item['message_type'].capitalize()} alert",
+            'subtitle': subtitle,
+            'outcome': outcome
+        }
+    
+    def go_to_home(self):
+        """Navigate back to home screen"""
+        self.manager.current = 'home'
+    
+    def on_back_press(self):
+        """Handle back button press"""
+        self.go_to_home()
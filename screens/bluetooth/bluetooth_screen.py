@@ -1,22 +1,36 @@
 from kivy.uix.screenmanager import Screen
 from kivy.properties import StringProperty
 from kivy.clock import Clock
-from utils.bluetooth_service import BluetoothService
+from utils.bluetooth_connection import BACKOFF, CONNECTED, CONNECTING, IDLE, SCANNING
+from utils.bluetooth_events import ButtonEvent, RawEvent, StatusEvent
+from utils.bluetooth_service import BluetoothService, get_bluetooth_service
 from utils.permission_handler import PermissionHandler
 
 class BluetoothScreen(Screen):
-    """Screen for handling Bluetooth connectivity and messages"""
+    """Screen for handling Bluetooth connectivity and messages
+    
+    Shows the wearable link the home screen keeps open. Button presses are
+    sent as alerts by the home screen's callback, this screen only follows
+    the shared service's events.
+    """
     
     message_text = StringProperty('Waiting for message...')
     connection_status = StringProperty('Disconnected')
     
     def __init__(self, **kwargs):
         super(BluetoothScreen, self).__init__(**kwargs)
-        self.bluetooth_service = BluetoothService()
+        self.bluetooth_service = get_bluetooth_service()
+        self.bluetooth_service.events.subscribe(StatusEvent, self.on_status)
+        self.bluetooth_service.events.subscribe(ButtonEvent, self.on_button_press)
+        self.bluetooth_service.events.subscribe(RawEvent, self.on_message)
         self.permission_handler = PermissionHandler()
     
     def on_enter(self):
         """Called when screen is entered"""
+        if self.bluetooth_service.is_connected:
+            self.connection_status = 'Connected'
+        elif self.bluetooth_service.supervisor.running:
+            self.connection_status = 'Connecting...'
         if not self.permission_handler.check_bluetooth_permission():
             self.permission_handler.request_bluetooth_permission(callback=self._on_permission_result)
     
@@ -28,44 +42,50 @@ class BluetoothScreen(Screen):
             self.message_text = 'Bluetooth permission denied'
     
     def connect_to_esp32(self):
-        """Connect to ESP32 device"""
-        def on_message(message):
-            """Handle incoming messages from ESP32"""
-            if message == 'connected':
-                self.connection_status = 'Connected'
-                self.message_text = 'Connection established'
-            elif message == 'disconnected':
-                self.connection_status = 'Disconnected'
-                self.message_text = 'Connection lost - retrying...'
-            elif message == 'reconnecting':
-                self.connection_status = f'Reconnecting ({self.bluetooth_service.connection_retries}/{self.bluetooth_service.max_retries})'
-            elif message == 'one_time':
-                self.message_text = 'Check-in message sent.'
-            elif message == 'two_time':
-                self.message_text = 'Warning message sent.'
-            elif message == 'three_time':
-                self.message_text = 'Emergency message sent!'
-        
-        def on_button_press(press_type):
-            """Handle button press events"""
-            if press_type == BluetoothService.SINGLE_PRESS:
-                self.message_text = 'Single press detected - Check-in'
-            elif press_type == BluetoothService.DOUBLE_PRESS:
-                self.message_text = 'Double press detected - Warning'
-            elif press_type == BluetoothService.TRIPLE_PRESS:
-                self.message_text = 'Triple press detected - Emergency!'
-        
-        if self.bluetooth_service.connect_to_esp32(on_message, on_button_press):
+        """Connect to ESP32 device, keeping the alert callback the home screen set"""
+        if self.bluetooth_service.supervisor.running:
+            return
+        if self.bluetooth_service.connect_to_esp32():
             self.connection_status = 'Connecting...'
         else:
             self.connection_status = 'Initial connection failed'
             self.message_text = 'Check Bluetooth settings'
     
+    def on_message(self, event):
+        """Handle incoming messages from ESP32"""
+        if event.message == 'one_time':
+            self.message_text = 'Check-in message sent.'
+        elif event.message == 'two_time':
+            self.message_text = 'Warning message sent.'
+        elif event.message == 'three_time':
+            self.message_text = 'Emergency message sent!'
+    
+    def on_button_press(self, event):
+        """Handle coalesced button press events"""
+        if event.press_type == BluetoothService.SINGLE_PRESS:
+            self.message_text = 'Single press detected - Check-in'
+        elif event.press_type == BluetoothService.DOUBLE_PRESS:
+            self.message_text = 'Double press detected - Warning'
+        elif event.press_type == BluetoothService.TRIPLE_PRESS:
+            self.message_text = 'Triple press detected - Emergency!'
+    
+    def on_status(self, event):
+        """Show connection state changes from the Bluetooth supervisor"""
+        if event.status == CONNECTED:
+            self.connection_status = 'Connected'
+            self.message_text = 'Connection established'
+        elif event.status == 'disconnected':
+            self.connection_status = 'Disconnected'
+            if self.bluetooth_service.supervisor.running:
+                self.message_text = 'Connection lost - retrying...'
+        elif event.status in (SCANNING, CONNECTING):
+            self.connection_status = 'Connecting...'
+        elif event.status == BACKOFF:
+            self.connection_status = f'Reconnecting in {event.detail:.0f}s'
+        elif event.status == IDLE:
+            self.connection_status = 'Disconnected'
+    
     def disconnect(self):
         """Disconnect from ESP32"""
         self.bluetooth_service.disconnect()
         self.connection_status = 'Disconnected'
-    
-    def on_leave(self):
-        """Called when screen is exited"""
-        self.disconnect()
\ No newline at end of file
@@ -6,6 +6,7 @@ from kivy.uix.spinner import Spinner
 from kivy.uix.button import Button
 from utils.contact_service import ContactService
 from utils.veevotech_service import VeevotechService
+from utils.emergency_contact_service import EmergencyContactService
 from models.database_models import User, EmergencyContact
 from sqlalchemy.orm import Session
 from sqlalchemy import create_engine
@@ -13,6 +14,8 @@ from sqlalchemy import create_engine
 class EmergencyContactSection(BoxLayout):
     name_input = ObjectProperty(None)
     phone_input = ObjectProperty(None)
+    email_input = ObjectProperty(None)
+    webhook_input = ObjectProperty(None)
     relationship_spinner = ObjectProperty(None)
     section_id = NumericProperty(0)
     
@@ -24,6 +27,8 @@ class EmergencyContactSection(BoxLayout):
     def clear_fields(self):
         self.name_input.text = ''
         self.phone_input.text = ''
+        self.email_input.text = ''
+        self.webhook_input.text = ''
         self.relationship_spinner.text = 'Select Relationship'
 
 class EmergencyContactsScreen(Screen):
@@ -49,6 +54,8 @@ class EmergencyContactsScreen(Screen):
                 section = self.ids[f'section_{contact.id}']
                 section.name_input.text = contact.name
                 section.phone_input.text = contact.phone_number
+                section.email_input.text = contact.email or ''
+                section.webhook_input.text = contact.webhook_url or ''
                 section.relationship_spinner.text = contact.relationship
         finally:
             session.close()
@@ -87,11 +94,15 @@ class EmergencyContactsScreen(Screen):
                 if existing_contact:
                     existing_contact.name = section.name_input.text
                     existing_contact.relationship = section.relationship_spinner.text
+                    existing_contact.email = section.email_input.text.strip() or None
+                    existing_contact.webhook_url = section.webhook_input.text.strip() or None
                     action = 'updated'
                 else:
                     contact = EmergencyContact(
                         name=section.name_input.text,
                         phone_number=section.phone_input.text,
+                        email=section.email_input.text.strip() or None,
+                        webhook_url=section.webhook_input.text.strip() or None,
                         relationship=section.relationship_spinner.text,
                         user_id=user.id
                     )
@@ -100,8 +111,9 @@ class EmergencyContactsScreen(Screen):
                 
                 try:
                     message = f"{user.full_name} with phone number: {user.phone_number} has added you as their emergency contact"
-                    self.veevotech_service.send_verification_code(section.phone_input.text)
+                    self.veevotech_service.send_verification_code_async(section.phone_input.text)
                     session.commit()
+                    EmergencyContactService.disarm(user.id)  # Contact list changed, re-arm on next home entry
                     self.load_contacts()  # Refresh the contacts list
                     self.show_message(f'Contact successfully {action}')
                     section.clear_fields()
@@ -124,8 +136,10 @@ class EmergencyContactsScreen(Screen):
                 phone_number=section.phone_input.text
             ).first()
             if contact:
+                owner_id = contact.user_id
                 session.delete(contact)
                 session.commit()
+                EmergencyContactService.disarm(owner_id)
                 section.clear_fields()
         finally:
             session.close()
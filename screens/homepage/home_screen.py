@@ -18,8 +18,12 @@ from kivy.uix.modalview import ModalView
 from kivy.uix.widget import Widget
 from kivy.clock import Clock
 import traceback
-from utils.bluetooth_service import BluetoothService
+from threading import Thread
+from utils.bluetooth_connection import BACKOFF, CONNECTED, CONNECTING, IDLE, SCANNING
+from utils.bluetooth_events import StatusEvent
+from utils.bluetooth_service import BluetoothService, get_bluetooth_service
 from utils.emergency_contact_service import EmergencyContactService
+from utils.alert_history import SOURCE_BLUETOOTH
 
 class SliderMenu(BoxLayout):
     profile_picture = StringProperty('assets/profile_icon.png')  # Default profile picture
@@ -171,6 +175,22 @@ class SliderMenu(BoxLayout):
         anim.start(self)
 
 class HomeScreen(Screen):
+    # Alert message type sent for each wearable button press
+    PRESS_MESSAGE_TYPES = {
+        BluetoothService.SINGLE_PRESS: 'check',
+        BluetoothService.DOUBLE_PRESS: 'warning',
+        BluetoothService.TRIPLE_PRESS: 'emergency',
+    }
+    # Status bar text for each wearable connection state
+    BLUETOOTH_STATUS_LABELS = {
+        SCANNING: 'Connecting...',
+        CONNECTING: 'Connecting...',
+        CONNECTED: 'Connected',
+        BACKOFF: 'Reconnecting...',
+        IDLE: 'Disconnected',
+        'disconnected': 'Disconnected',
+    }
+
     slider_menu = ObjectProperty(None)
     slider_open = BooleanProperty(False)
     bluetooth_status = StringProperty('Disconnected')
@@ -179,7 +199,8 @@ class HomeScreen(Screen):
         print("Initializing HomeScreen...")
         super().__init__(**kwargs)
         self.db = DatabaseService()
-        self.bluetooth_service = BluetoothService()
+        self.bluetooth_service = get_bluetooth_service()  # One link to the wearable, shared with the Bluetooth screen
+        self.bluetooth_service.events.subscribe(StatusEvent, self.on_bluetooth_status)
         self.emergency_service = EmergencyContactService()
         print(f"HomeScreen initialized with name: {self.name}")
         print(f"HomeScreen parent: {self.parent}")
@@ -197,9 +218,64 @@ class HomeScreen(Screen):
             # Redirect to login if not logged in
             self.manager.current = 'login'
         else:
+            # Preload everything an alert needs before any button press
+            self.arm_emergency_alerts(app.user_id)
             # Connect to ESP device
             self.connect_to_esp_device()
-            self.connect_to_esp_device()
+
+    def arm_emergency_alerts(self, user_id):
+        """Arm the emergency path in the background so entering home stays responsive"""
+        def arm():
+            try:
+                self.emergency_service.arm(self.db.session(), user_id)
+                # Send anything queued while every gateway was down
+                self.emergency_service.retry_queued()
+            finally:
+                self.db.session.remove()
+
+        Thread(target=arm, daemon=True).start()
+
+    def connect_to_esp_device(self):
+        """Connect to the ESP32 wearable and route its button presses to alerts"""
+        if self.bluetooth_service.supervisor.running:
+            return
+
+        if self.bluetooth_service.connect_to_esp32(on_button_press=self.on_button_press):
+            self.bluetooth_status = 'Connecting...'
+        else:
+            self.bluetooth_status = 'Connection Failed'
+
+    def on_bluetooth_status(self, event):
+        """Track the wearable connection state reported by the Bluetooth supervisor"""
+        self.bluetooth_status = self.BLUETOOTH_STATUS_LABELS.get(event.status, self.bluetooth_status)
+
+    def on_button_press(self, press_type, sequence=None):
+        """Send the alert for a coalesced wearable button press
+        
+        Delivered on the main thread by the Bluetooth event bus, so the send
+        runs on its own thread and never stalls the UI.
+        """
+        message_type = self.PRESS_MESSAGE_TYPES.get(press_type)
+        if not message_type:
+            return
+
+        app = App.get_running_app()
+        user_id = getattr(app, 'user_id', None)
+        if not user_id:
+            print("Button press ignored, no user logged in")
+            return
+
+        def send():
+            try:
+                result = self.emergency_service.send_emergency_message(
+                    self.db.session(), user_id, message_type,
+                    source=SOURCE_BLUETOOTH, sequence=sequence
+                )
+                print(f"{message_type} alert #{sequence} result: {result['message']}")
+            finally:
+                self.db.session.remove()
+
+        Thread(target=send, daemon=True).start()
 
     def toggle_slider(self):
         """Toggle slider menu open/closed"""
@@ -290,6 +366,13 @@ class HomeScreen(Screen):
         else:
             print("Info screen not found in the screen manager")
 
+    def on_alert_history_press(self):
+        """Handle alert history button press"""
+        print("Alert history button pressed")
+        self.close_slider()
+        if 'alert_history' in self.manager.screen_names:
+            self.manager.current = 'alert_history'
+
     def on_terminate_account_press(self):
         """Handle terminate account button press"""
         print("Terminate account button pressed")
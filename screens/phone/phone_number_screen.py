@@ -100,8 +100,8 @@ class PhoneNumberScreen(Screen):
             app.phone_number = phone_number
             app.country_code = country_code
             
-            # Send verification code
-            self.send_verification_code(phone_number)
+            # Send verification code, the verify screen shows its result rather than sending again
+            app.otp_request = self.send_verification_code(phone_number)
             
             # Navigate to verify screen
             self.manager.current = 'verify'
@@ -112,20 +112,30 @@ class PhoneNumberScreen(Screen):
             self.show_error("An error occurred while validating phone number")
             
     def send_verification_code(self, phone_number):
-        """Send verification code using the configured service"""
+        """Send verification code using the configured service
+        
+        Returns:
+            OtpRequest: Handle for the send, or None if it could not be started
+        """
         try:
-            # Use VeevotechService to send verification code
-            success = self.veevotech.send_verification_code(phone_number)
-            if success:
-                print(f"Verification code sent to {phone_number}")
-                self.show_message(f"Verification code sent to {phone_number}")
-            else:
-                print("Failed to send verification code")
-                self.show_error("Failed to send verification code")
+            # Use VeevotechService to send verification code in the background
+            return self.veevotech.send_verification_code_async(
+                phone_number, lambda response: self.on_code_sent(phone_number, response)
+            )
         except Exception as e:
             print(f"Error sending verification code: {str(e)}")
             traceback.print_exc()
             self.show_error("Failed to send verification code")
+            return None
+
+    def on_code_sent(self, phone_number, response):
+        """Report the send result once the gateway has answered"""
+        if response['status'] == 'pending':
+            print(f"Verification code sent to {phone_number}")
+            self.show_message(f"Verification code sent to {phone_number}")
+        else:
+            print(f"Failed to send verification code: {response['message']}")
+            self.show_error(response['message'])
 
     def show_error(self, message):
         """Show error message popup"""
@@ -516,17 +516,24 @@ class ProfileUpdateScreen(Screen):
             return
             
         try:
-            response = self.veevotech.send_verification_code(self.updated_phone)
-            if response['status'] == 'pending':
-                self.show_message('OTP Sent', 'A verification code has been sent to your phone')
-                self.start_countdown()
-            else:
-                self.show_error(response.get('message', 'Failed to send verification code'))
+            # Sent in the background, the countdown starts right away
+            self.start_countdown()
+            self.veevotech.send_verification_code_async(self.updated_phone, self.on_otp_sent)
         except Exception as e:
             print(f"[DEBUG] Error sending OTP: {str(e)}")
             traceback.print_exc()
             self.show_error("Failed to send verification code")
     
+    def on_otp_sent(self, response):
+        """Report the OTP delivery once the gateway has answered"""
+        if response['status'] == 'pending':
+            self.show_message('OTP Sent', 'A verification code has been sent to your phone')
+        else:
+            self.stop_countdown()
+            self.resend_timer_active = False
+            self.ids.send_otp_button.disabled = False
+            self.show_error(response.get('message', 'Failed to send verification code'))
+    
     def verify_otp(self):
         """Verify the entered OTP"""
         if not self.phone_changed:
@@ -14,6 +14,7 @@ class VerifyScreen(Screen):
     resend_timer_active = BooleanProperty(False)
     countdown = NumericProperty(60)
     phone_number = StringProperty('')
+    delivery_status = StringProperty('')
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -29,8 +30,13 @@ class VerifyScreen(Screen):
                 # Normalize the phone number
                 self.phone_number = normalize_phone_number(app.phone_number)
                 print(f"Phone number set and normalized: {self.phone_number}")
-                # Send initial verification code
-                self.send_verification_code()
+                # The phone number screen has usually just sent the code, follow that send
+                request = getattr(app, 'otp_request', None)
+                app.otp_request = None
+                if request is not None:
+                    self.follow_verification_code(request)
+                else:
+                    self.send_verification_code()
             else:
                 print("Warning: No phone number found in app")
                 self.show_error("No phone number found")
@@ -40,20 +46,33 @@ class VerifyScreen(Screen):
             self.show_error("Failed to initialize verification")
 
     def send_verification_code(self):
-        """Send verification code"""
+        """Send verification code in the background, the countdown starts right away"""
         try:
-            response = self.veevotech.send_verification_code(self.phone_number)
-            if response['status'] == 'pending':
-                print("Verification code sent successfully")
-                self.start_countdown()
-            else:
-                print(f"Failed to send verification code: {response['message']}")
-                self.show_error(response['message'])
+            self.delivery_status = 'Sending verification code...'
+            self.start_countdown()
+            self.veevotech.send_verification_code_async(self.phone_number, self.on_code_sent)
         except Exception as e:
             print(f"Error sending verification code: {str(e)}")
             traceback.print_exc()
             self.show_error("Failed to send verification code")
 
+    def follow_verification_code(self, request):
+        """Show the status of a code another screen is sending, the countdown starts right away"""
+        self.delivery_status = 'Sending verification code...'
+        self.start_countdown()
+        request.add_callback(self.on_code_sent)
+
+    def on_code_sent(self, response):
+        """Show the delivery status once the gateway has answered"""
+        if response['status'] == 'pending':
+            print("Verification code sent successfully")
+            self.delivery_status = 'Verification code sent'
+        else:
+            print(f"Failed to send verification code: {response['message']}")
+            self.delivery_status = 'Verification code was not sent'
+            self.stop_countdown()
+            self.show_error(response['message'])
+
     def verify_code_input(self, code=None):
         """Verify the entered verification code"""
         try:
@@ -175,12 +194,16 @@ class VerifyScreen(Screen):
         self.ids.resend_button.text = f"Resend ({self.countdown}s)"
         
         if self.countdown <= 0:
-            self.resend_timer_active = False
-            self.ids.resend_button.text = "Resend Code"
-            if self.countdown_event:
-                self.countdown_event.cancel()
+            self.stop_countdown()
             return False
 
+    def stop_countdown(self):
+        """Stop the countdown timer and allow resending"""
+        self.resend_timer_active = False
+        self.ids.resend_button.text = "Resend Code"
+        if self.countdown_event:
+            self.countdown_event.cancel()
+
     def show_error(self, message):
         """Show error message popup"""
         popup = Popup(
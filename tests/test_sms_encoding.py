@@ -0,0 +1,148 @@
+import unittest
+from string import Template
+
+from utils.alert_templates import DEFAULT_TEMPLATES
+from utils.sms_encoding import (
+    GSM7, UCS2, SmsEncoder, analyze, detect_encoding, segment_count, transliterate
+)
+
+# Emergency template body as sent, with a location suffix like the one alerts append
+EMERGENCY_BODY = ("EMERGENCY ALERT: {name} has triggered an emergency alert. "
+                  "Please contact them immediately at +923001234567."
+                  "\nLocation: https://maps.google.com/?q=31.520370123,74.358749456")
+
+class DetectEncodingTest(unittest.TestCase):
+
+    def test_plain_ascii_is_gsm7(self):
+        self.assertEqual(detect_encoding("Help me at the market"), GSM7)
+
+    def test_gsm_accented_letters_stay_gsm7(self):
+        self.assertEqual(detect_encoding("Müller Peña Renée"), GSM7)
+
+    def test_extension_table_is_gsm7(self):
+        self.assertEqual(detect_encoding("Price [€5] {ok}"), GSM7)
+
+    def test_letters_outside_gsm_force_ucs2(self):
+        self.assertEqual(detect_encoding("Zoë"), UCS2)
+        self.assertEqual(detect_encoding("François"), UCS2)  # Only the capital Ç is in GSM
+
+    def test_urdu_script_is_ucs2(self):
+        self.assertEqual(detect_encoding("محمد علی"), UCS2)
+
+    def test_emoji_is_ucs2(self):
+        self.assertEqual(detect_encoding("Safe 🙂"), UCS2)
+
+class SegmentCountTest(unittest.TestCase):
+
+    def test_empty_text_has_no_segments(self):
+        self.assertEqual(segment_count(""), 0)
+
+    def test_gsm7_single_segment_boundary(self):
+        self.assertEqual(segment_count("a" * 160), 1)
+        self.assertEqual(segment_count("a" * 161), 2)
+
+    def test_gsm7_concatenated_boundary(self):
+        self.assertEqual(segment_count("a" * 306), 2)
+        self.assertEqual(segment_count("a" * 307), 3)
+
+    def test_ucs2_single_segment_boundary(self):
+        self.assertEqual(segment_count("ع" * 70), 1)
+        self.assertEqual(segment_count("ع" * 71), 2)
+
+    def test_ucs2_concatenated_boundary(self):
+        self.assertEqual(segment_count("ع" * 134), 2)
+        self.assertEqual(segment_count("ع" * 135), 3)
+
+    def test_escaped_character_costs_two_septets(self):
+        self.assertEqual(analyze("€")['units'], 2)
+        self.assertEqual(segment_count("a" * 158 + "€"), 1)
+        self.assertEqual(segment_count("a" * 159 + "€"), 2)
+
+    def test_escape_sequence_is_not_split_across_segments(self):
+        # 306 septets would fit two segments, but the escape cannot straddle the boundary
+        text = "a" * 152 + "€" + "a" * 152
+        self.assertEqual(analyze(text)['units'], 306)
+        self.assertEqual(segment_count(text), 3)
+
+    def test_surrogate_pair_costs_two_units(self):
+        self.assertEqual(analyze("🙂")['units'], 2)
+        self.assertEqual(segment_count("ع" * 68 + "🙂"), 1)
+        self.assertEqual(segment_count("ع" * 69 + "🙂"), 2)
+
+    def test_surrogate_pair_is_not_split_across_segments(self):
+        text = "ع" * 66 + "🙂" + "ع" * 66
+        self.assertEqual(analyze(text)['units'], 134)
+        self.assertEqual(segment_count(text), 3)
+
+class TransliterateTest(unittest.TestCase):
+
+    def test_strips_accents_gsm_lacks(self):
+        self.assertEqual(transliterate("Zoë Ćirić"), "Zoe Ciric")
+
+    def test_keeps_accents_gsm_has(self):
+        self.assertEqual(transliterate("Müller Peña"), "Müller Peña")
+
+    def test_replaces_typographic_characters(self):
+        self.assertEqual(transliterate("Ali’s “alert” – now…"), "Ali's \"alert\" - now...")
+
+    def test_keeps_urdu_script(self):
+        self.assertEqual(transliterate("محمد علی"), "محمد علی")
+
+class SmsEncoderFitTest(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = SmsEncoder()
+
+    def test_short_message_is_unchanged(self):
+        result = self.encoder.encode("Ayesha Khan is safe.")
+        self.assertEqual(result['text'], "Ayesha Khan is safe.")
+        self.assertEqual(result['steps'], [])
+
+    def test_latin_names_fit_one_gsm7_segment(self):
+        for name in ("Muhammad Ali", "Ayesha Siddiqa", "Syed Hassan Raza Naqvi"):
+            with self.subTest(name=name):
+                result = self.encoder.encode(EMERGENCY_BODY.format(name=name))
+                self.assertEqual(result['encoding'], GSM7)
+                self.assertEqual(result['segments'], 1)
+                self.assertIn(name, result['text'])
+                self.assertIn("maps.google.com/?q=31.52037,74.35875", result['text'])
+
+    def test_accented_names_are_transliterated_into_gsm7(self):
+        for name, sent_as in (("Zoë Brontë", "Zoe Bronte"), ("François Dupont", "FranÇois Dupont"),
+                              ("José Ćirić", "José Ciric")):
+            with self.subTest(name=name):
+                result = self.encoder.encode(EMERGENCY_BODY.format(name=name))
+                self.assertEqual(result['encoding'], GSM7)
+                self.assertEqual(result['segments'], 1)
+                self.assertIn('transliterate', result['steps'])
+                self.assertIn(sent_as, result['text'])
+
+    def test_urdu_names_stay_readable_in_fewer_segments(self):
+        for name in ("محمد علی", "عائشہ صدیقہ"):
+            with self.subTest(name=name):
+                body = EMERGENCY_BODY.format(name=name)
+                result = self.encoder.encode(body)
+                self.assertEqual(result['encoding'], UCS2)
+                self.assertIn(name, result['text'])
+                self.assertEqual(result['original_segments'], segment_count(body))
+                self.assertLess(result['segments'], result['original_segments'])
+                self.assertEqual(result['segments'], segment_count(result['text']))
+
+    def test_abbreviation_keeps_header_and_meaning(self):
+        # Long enough that every template needs shortening to fit one segment
+        name = "Syed Muhammad Hassan Raza Naqvi"
+        location = "\nLocation: https://maps.google.com/?q=31.520370123,74.358749456"
+        for message_type, header, keeps in (("emergency", "EMERGENCY ALERT:", "immediately"),
+                                            ("warning", "WARNING:", "warning"),
+                                            ("accidental", "ACCIDENTAL ALERT:", "mistake")):
+            with self.subTest(message_type=message_type):
+                body = Template(DEFAULT_TEMPLATES[message_type]).substitute(
+                    full_name=name, phone_number="+923001234567") + location
+                result = self.encoder.encode(body)
+                self.assertIn('abbreviate', result['steps'])
+                self.assertEqual(result['segments'], 1)
+                self.assertTrue(result['text'].startswith(f"{header} {name}"))
+                self.assertIn(keeps, result['text'])
+
+if __name__ == '__main__':
+    unittest.main()
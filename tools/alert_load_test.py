@@ -0,0 +1,175 @@
+"""
+Load generator for the SMS send path.
+
+Drives VeevotechService (OTP sends) or EmergencyContactService (alert fan-out)
+at a configurable concurrency against the local mock gateway and reports
+throughput and latency percentiles.
+
+Usage:
+    python tools/alert_load_test.py --mode alert --contacts 5 --requests 200 --concurrency 8
+    python tools/alert_load_test.py --mode otp --gateway-url http://127.0.0.1:8765/v3
+"""
+import argparse
+import atexit
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Keep Kivy from parsing our command line arguments when services import it
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+# Run from anywhere inside the repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.mock_sms_gateway import MockSmsGateway
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def summarize(name, latencies, statuses, elapsed):
+    """Print throughput, status counts and latency percentiles"""
+    latencies = sorted(latencies)
+    counts = {}
+    for status in statuses:
+        counts[status] = counts.get(status, 0) + 1
+
+    print(f"\n=== {name} ===")
+    print(f"Requests:   {len(latencies)} in {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} req/s" if elapsed else "Throughput: n/a")
+    print(f"Statuses:   {counts}")
+    for label, fraction in (('p50', 0.50), ('p90', 0.90), ('p99', 0.99)):
+        print(f"{label}:        {percentile(latencies, fraction) * 1000:.1f} ms")
+    if latencies:
+        print(f"max:        {latencies[-1] * 1000:.1f} ms")
+
+def run_load(worker, total, concurrency):
+    """Call worker(i) total times across concurrency threads, return (latencies, statuses, elapsed)"""
+    def timed(index):
+        started = time.perf_counter()
+        status = worker(index)
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+
+    return [latency for latency, _ in results], [status for _, status in results], elapsed
+
+def use_temporary_data_dir():
+    """Keep the run's alert history, OTP codes and device registry out of the real ~/.safinity"""
+    data_dir = tempfile.mkdtemp(prefix='safinity-tools-')
+    os.environ['SAFINITY_DATA_DIR'] = data_dir
+    atexit.register(shutil.rmtree, data_dir, ignore_errors=True)
+    return data_dir
+
+def create_alert_fixture(contact_count):
+    """Create an in-memory database with one user and their emergency contacts"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker, scoped_session
+    from sqlalchemy.pool import StaticPool
+    from models.database_models import Base, User, EmergencyContact
+
+    engine = create_engine(
+        'sqlite://',
+        connect_args={'check_same_thread': False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session_factory = scoped_session(sessionmaker(bind=engine))
+
+    session = session_factory()
+    user = User(full_name='Load Test User', phone_number='+920000000000', email='load@test.local')
+    session.add(user)
+    session.flush()
+    for index in range(contact_count):
+        session.add(EmergencyContact(
+            user_id=user.id,
+            name=f'Contact {index}',
+            phone_number=f'+92300{index:07d}',
+            relation_type='Other'
+        ))
+    session.commit()
+    user_id = user.id
+    session_factory.remove()
+    return session_factory, user_id
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the SMS send path against a mock gateway')
+    parser.add_argument('--mode', choices=['otp', 'alert', 'both'], default='both')
+    parser.add_argument('--requests', type=int, default=100, help='OTP sends or alerts to issue')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--contacts', type=int, default=5, help='Emergency contacts per alert')
+    parser.add_argument('--message-type', default='emergency')
+    parser.add_argument('--gateway-url', default=None,
+                        help='Use an already running gateway instead of starting the mock')
+    parser.add_argument('--latency', default='lognormal:0.05:0.6', help='Mock gateway latency spec')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=None)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    mock = None
+    gateway_url = args.gateway_url
+    if not gateway_url:
+        mock = MockSmsGateway(
+            latency=args.latency,
+            error_rate=args.error_rate,
+            rate_limit=args.rate_limit,
+            seed=args.seed
+        ).start()
+        gateway_url = mock.base_url
+        print(f"Started mock gateway at {gateway_url}")
+
+    # Kivy routes Python logging to the console, per-request HTTP logs would drown the report
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+    # The shared router is built on first use, so point it at the mock before importing services
+    os.environ['VEEVOTECH_BASE_URL'] = gateway_url
+    os.environ['SMS_GATEWAYS'] = 'veevotech'
+    os.environ.setdefault('VEEVOTECH_API_HASH', 'mock')
+    # Fixture users and codes must not show up in the app's own stores
+    use_temporary_data_dir()
+
+    try:
+        if args.mode in ('otp', 'both'):
+            from utils.veevotech_service import VeevotechService
+            service = VeevotechService()
+
+            def send_otp(index):
+                return service.send_verification_code(f'+92311{index:07d}')['status']
+
+            summarize('VeevotechService.send_verification_code',
+                      *run_load(send_otp, args.requests, args.concurrency))
+
+        if args.mode in ('alert', 'both'):
+            from utils.emergency_contact_service import EmergencyContactService
+            session_factory, user_id = create_alert_fixture(args.contacts)
+            from utils.delivery_tracker import delivery_tracker
+            delivery_tracker.session_factory = session_factory  # Record deliveries in the fixture database
+            service = EmergencyContactService()
+            service.arm(session_factory(), user_id)
+
+            def send_alert(index):
+                try:
+                    return service.send_emergency_message(session_factory(), user_id, args.message_type)['status']
+                finally:
+                    session_factory.remove()
+
+            summarize(f'EmergencyContactService.send_emergency_message ({args.contacts} contacts)',
+                      *run_load(send_alert, args.requests, args.concurrency))
+    finally:
+        if mock:
+            print(f"\nMock gateway stats: {mock.state.stats}")
+            mock.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""
+End-to-end latency benchmark for wearable button alerts.
+
+Presses a simulated wearable and times each alert through the whole phone
+side path: the frame reader, gesture decoding and coalescing, the event bus
+hop to the main thread, and EmergencyContactService sending to every contact
+through the local mock gateway. Optional link drops and garbage frames show
+how reconnects and noise affect the numbers.
+
+Usage:
+    python tools/bluetooth_latency_benchmark.py --presses 50 --contacts 5
+    python tools/bluetooth_latency_benchmark.py --raw --chunk-size 4 --drop-every 10 --garbage-every 3
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from threading import Lock, Thread
+
+# Keep Kivy from parsing our command line arguments when services import it
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+# Run from anywhere inside the repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.alert_load_test import create_alert_fixture, percentile, use_temporary_data_dir
+from tools.mock_sms_gateway import MockSmsGateway
+from tools.wearable_simulator import WearableSimulator
+
+# Same mapping as the home screen uses for wearable presses
+PRESS_MESSAGE_TYPES = {
+    'single_press': 'check',
+    'double_press': 'warning',
+    'triple_press': 'emergency',
+}
+
+def report(name, latencies):
+    """Print latency percentiles for one stage"""
+    latencies = sorted(latencies)
+    if not latencies:
+        print(f"{name:<28} no samples")
+        return
+    values = [percentile(latencies, fraction) * 1000 for fraction in (0.50, 0.90, 0.99)]
+    print(f"{name:<28} p50 {values[0]:8.1f} ms  p90 {values[1]:8.1f} ms  p99 {values[2]:8.1f} ms  "
+          f"max {latencies[-1] * 1000:8.1f} ms  (n={len(latencies)})")
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure wearable press to alert sent latency')
+    parser.add_argument('--presses', type=int, default=30, help='Emergency presses to send')
+    parser.add_argument('--interval', type=float, default=0.2, help='Seconds between presses')
+    parser.add_argument('--contacts', type=int, default=3, help='Emergency contacts per alert')
+    parser.add_argument('--raw', action='store_true', help='Send raw down/up events instead of press tokens')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Split wearable writes into chunks')
+    parser.add_argument('--drop-every', type=int, default=0, help='Drop the link after every N presses')
+    parser.add_argument('--garbage-every', type=int, default=0, help='Send a garbage frame before every Nth press')
+    parser.add_argument('--latency', default='lognormal:0.05:0.6', help='Mock gateway latency spec')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    mock = MockSmsGateway(latency=args.latency, error_rate=args.error_rate, seed=args.seed).start()
+    print(f"Started mock gateway at {mock.base_url}")
+
+    # Kivy routes Python logging to the console, per-request HTTP logs would drown the report
+    logging.getLogger('urllib3').setLevel(logging.WARNING)
+
+    # The shared router is built on first use, so point it at the mock before importing services
+    os.environ['VEEVOTECH_BASE_URL'] = mock.base_url
+    os.environ['SMS_GATEWAYS'] = 'veevotech'
+    os.environ.setdefault('VEEVOTECH_API_HASH', 'mock')
+    # Fixture alerts and the simulated wearable must not show up in the app's own stores
+    use_temporary_data_dir()
+
+    from kivy.clock import Clock
+    from utils.alert_history import SOURCE_BLUETOOTH
+    from utils.bluetooth_connection import Backoff
+    from utils.bluetooth_service import BluetoothService
+    from utils.delivery_tracker import delivery_tracker
+    from utils.emergency_contact_service import EmergencyContactService
+
+    session_factory, user_id = create_alert_fixture(args.contacts)
+    delivery_tracker.session_factory = session_factory  # Record deliveries in the fixture database
+    emergency_service = EmergencyContactService()
+    emergency_service.arm(session_factory(), user_id)
+    session_factory.remove()
+
+    simulator = WearableSimulator(raw=args.raw, chunk_size=args.chunk_size, seed=args.seed)
+    # No coalescing window, every press is a separate alert to time
+    service = BluetoothService(alert_window=0.0, alert_settle=0.0,
+                               find_device=simulator.find_device, open_socket=simulator.open_socket,
+                               backoff=Backoff(base=0.05, cap=1.0))
+
+    # Timestamps per alert, keyed by the coalescer's sequence number (1 per press)
+    lock = Lock()
+    pressed, decoded, delivered, sent, statuses = {}, {}, {}, {}, []
+    reconnects = []
+
+    coalesced = service.alert_coalescer.on_alert
+
+    def on_alert(event):
+        decoded[event.sequence] = time.perf_counter()
+        coalesced(event)
+
+    service.alert_coalescer.on_alert = on_alert
+
+    def on_button_press(press_type, sequence=None):
+        delivered[sequence] = time.perf_counter()
+
+        def send():
+            try:
+                result = emergency_service.send_emergency_message(
+                    session_factory(), user_id, PRESS_MESSAGE_TYPES[press_type],
+                    source=SOURCE_BLUETOOTH, sequence=sequence
+                )
+            finally:
+                session_factory.remove()
+            with lock:
+                sent[sequence] = time.perf_counter()
+                statuses.append(result['status'])
+
+        Thread(target=send, daemon=True).start()
+
+    service.connect_to_esp32(on_button_press=on_button_press)
+    if not simulator.wait_connected():
+        print("Simulator never connected")
+        mock.stop()
+        return
+
+    def drive():
+        for index in range(1, args.presses + 1):
+            if args.garbage_every and index % args.garbage_every == 0:
+                simulator.garbage(48)
+            pressed[index] = simulator.press(3)
+            time.sleep(args.interval)
+            if args.drop_every and index % args.drop_every == 0:
+                dropped_at = time.perf_counter()
+                simulator.drop()
+                simulator.wait_connected()
+                reconnects.append(time.perf_counter() - dropped_at)
+
+    started = time.perf_counter()
+    driver = Thread(target=drive, daemon=True)
+    driver.start()
+    # The event bus drains on this thread, standing in for the app's main thread
+    deadline = None
+    while True:
+        Clock.tick()
+        if not driver.is_alive():
+            deadline = deadline or time.perf_counter() + 30.0
+            with lock:
+                finished = len(sent) >= len(pressed)
+            if finished or time.perf_counter() > deadline:
+                break
+    elapsed = time.perf_counter() - started
+    reader = service.frame_reader
+    service.disconnect()
+    Clock.tick()
+
+    def stage(start, end):
+        return [end[sequence] - start[sequence] for sequence in end if sequence in start]
+
+    counts = {}
+    for status in statuses:
+        counts[status] = counts.get(status, 0) + 1
+
+    mode = 'raw down/up' if args.raw else 'press tokens'
+    print(f"\n=== Wearable press to alert sent ({mode}, {args.contacts} contacts) ===")
+    print(f"Presses:    {len(pressed)} in {elapsed:.2f}s, {len(sent)} alerts sent")
+    print(f"Statuses:   {counts}")
+    report('press -> decoded', stage(pressed, decoded))
+    report('decoded -> main thread', stage(decoded, delivered))
+    report('main thread -> sent', stage(delivered, sent))
+    report('press -> sent', stage(pressed, sent))
+    if reconnects:
+        report('link drop -> reconnected', reconnects)
+
+    print(f"\nSimulator:  {simulator.stats}")
+    print(f"Last link:  {reader.stats if reader else None}")
+    print(f"Decoder:    {service.gesture_decoder.stats}")
+    print(f"Coalescer:  {service.alert_coalescer.stats}")
+    print(f"Events:     {service.events.stats}")
+    print(f"Connect:    {service.supervisor.stats}")
+    print(f"Mock gateway stats: {mock.state.stats}")
+    mock.stop()
+
+if __name__ == '__main__':
+    main()
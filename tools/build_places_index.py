@@ -0,0 +1,87 @@
+"""
+Build the bundled places index used by the offline reverse geocoder.
+
+    python -m tools.build_places_index [assets/places.csv] [assets/places.bin]
+
+The CSV needs name, country, lat, lon and population columns. Rebuild the
+index whenever the CSV changes and commit both files.
+"""
+import argparse
+import csv
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.reverse_geocoder import (CELL, COORD_SCALE, HEADER, MAGIC, PLACE, VERSION,
+                                    cell_key)
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+
+def read_places(csv_path):
+    """Read places from CSV as (name, country, lat, lon, population) tuples"""
+    places = []
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            places.append((
+                row['name'].strip(),
+                row['country'].strip().upper(),
+                float(row['lat']),
+                float(row['lon']),
+                int(row.get('population') or 0)
+            ))
+    return places
+
+def build_index(places, cell_size=0.5):
+    """
+    Encode places into the binary index format.
+
+    Returns:
+        bytes: Index file contents
+    """
+    keyed = sorted(places, key=lambda place: (cell_key(place[2], place[3], cell_size), -place[4]))
+
+    cells = []
+    records = []
+    names = bytearray()
+    for index, (name, country, lat, lon, population) in enumerate(keyed):
+        key = cell_key(lat, lon, cell_size)
+        if cells and cells[-1][0] == key:
+            cells[-1][2] += 1
+        else:
+            cells.append([key, index, 1])
+
+        encoded = name.encode('utf-8')
+        records.append(PLACE.pack(
+            int(round(lat * COORD_SCALE)),
+            int(round(lon * COORD_SCALE)),
+            population,
+            len(names),
+            len(encoded),
+            country.encode('ascii')[:2].ljust(2)
+        ))
+        names.extend(encoded)
+
+    names_offset = HEADER.size + len(cells) * CELL.size + len(records) * PLACE.size
+    parts = [HEADER.pack(MAGIC, VERSION, 0, cell_size, len(records), len(cells), names_offset)]
+    parts.extend(CELL.pack(*cell) for cell in cells)
+    parts.extend(records)
+    parts.append(bytes(names))
+    return b''.join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the offline places index')
+    parser.add_argument('source', nargs='?', default=os.path.join(ASSETS_DIR, 'places.csv'))
+    parser.add_argument('output', nargs='?', default=os.path.join(ASSETS_DIR, 'places.bin'))
+    parser.add_argument('--cell-size', type=float, default=0.5, help='Grid cell size in degrees')
+    args = parser.parse_args()
+
+    places = read_places(args.source)
+    data = build_index(places, args.cell_size)
+    with open(args.output, 'wb') as f:
+        f.write(data)
+    print(f"Wrote {len(places)} places ({len(data)} bytes) to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+In-process stand-in for an Android BluetoothSocket.
+
+Implements the calls BluetoothService makes on a socket (connect, close,
+isConnected, getInputStream().read and getOutputStream().write/flush), so
+the Bluetooth read path can be exercised and benchmarked on Linux:
+
+    socket = FakeBluetoothSocket()
+    service.attach(socket)
+    socket.feed(b"button_press_3\\n")
+"""
+from collections import deque
+from threading import Condition
+
+class FakeInputStream:
+    """java.io.InputStream side of the fake, read() blocks until data is fed"""
+
+    def __init__(self, socket):
+        self._socket = socket
+
+    def read(self, buffer, offset=0, length=None):
+        """Copy queued bytes into buffer like InputStream.read(byte[], int, int)
+
+        Returns:
+            int: Bytes read, or -1 once the remote side hung up
+        """
+        length = len(buffer) - offset if length is None else length
+        return self._socket._read(buffer, offset, length)
+
+    def available(self):
+        return self._socket.pending_bytes()
+
+class FakeOutputStream:
+    """java.io.OutputStream side of the fake, records everything written"""
+
+    def __init__(self, socket):
+        self._socket = socket
+
+    def write(self, data, offset=0, length=None):
+        data = bytes(data)
+        length = len(data) - offset if length is None else length
+        self._socket._write(data[offset:offset + length])
+
+    def flush(self):
+        self._socket._flush()
+
+class FakeBluetoothSocket:
+    """
+    Scriptable BluetoothSocket.
+
+    feed() queues bytes for the app to read (each call arrives as its own
+    chunk, so split or merged frames can be reproduced exactly), hang_up()
+    ends the stream and fail() makes the next read raise like a dropped link.
+    Writes from the app are collected in written and counted per flush.
+    """
+
+    def __init__(self, connect_error=None):
+        """
+        Args:
+            connect_error (Exception): Raised by connect(), to simulate an unreachable device
+        """
+        self.connect_error = connect_error
+        self.connected = False
+        self.written = bytearray()
+        self.stats = {'reads': 0, 'writes': 0, 'flushes': 0, 'fed': 0}
+        self._chunks = deque()
+        self._eof = False
+        self._error = None
+        self._closed = False
+        self._cond = Condition()
+        self._input = FakeInputStream(self)
+        self._output = FakeOutputStream(self)
+
+    # BluetoothSocket API
+
+    def connect(self):
+        if self.connect_error:
+            raise self.connect_error
+        self.connected = True
+
+    def isConnected(self):
+        return self.connected and not self._closed
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self.connected = False
+            self._cond.notify_all()
+
+    def getInputStream(self):
+        return self._input
+
+    def getOutputStream(self):
+        return self._output
+
+    # Scripting
+
+    def feed(self, data):
+        """Queue bytes for the app to read as one chunk"""
+        with self._cond:
+            self._chunks.append(bytes(data))
+            self.stats['fed'] += len(data)
+            self._cond.notify_all()
+
+    def hang_up(self):
+        """End the stream after the queued bytes are read"""
+        with self._cond:
+            self._eof = True
+            self._cond.notify_all()
+
+    def fail(self, error=None):
+        """Make the next read raise, as when the wearable walks out of range"""
+        with self._cond:
+            self._error = error or IOError('bt socket closed, read return: -1')
+            self._cond.notify_all()
+
+    def pending_bytes(self):
+        with self._cond:
+            return sum(len(chunk) for chunk in self._chunks)
+
+    # Stream internals
+
+    def _read(self, buffer, offset, length):
+        with self._cond:
+            while not self._chunks and not self._eof and not self._error and not self._closed:
+                self._cond.wait()
+            if self._error:
+                error, self._error = self._error, None
+                self.connected = False
+                raise error
+            if self._closed:
+                raise IOError('socket closed')
+            if not self._chunks:
+                return -1
+
+            chunk = self._chunks.popleft()
+            count = min(length, len(chunk))
+            buffer[offset:offset + count] = chunk[:count]
+            if count < len(chunk):
+                self._chunks.appendleft(chunk[count:])
+            self.stats['reads'] += 1
+            return count
+
+    def _write(self, data):
+        if self._closed:
+            raise IOError('socket closed')
+        self.written.extend(data)
+        self.stats['writes'] += 1
+
+    def _flush(self):
+        if self._closed:
+            raise IOError('socket closed')
+        self.stats['flushes'] += 1
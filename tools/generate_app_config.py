@@ -0,0 +1,46 @@
+"""
+Write app_config.json with the credentials an Android build needs.
+
+Buildozer skips dotfiles, so .env never reaches the APK and the app would
+start without an SMS gateway. Run this before every buildozer build. It
+reads the settings from .env and the environment and writes them to
+app_config.json in the project root. That file is packaged with the app
+(json is in source.include_exts) and loaded by main.py at start. The file
+holds secrets and is git-ignored, so do not commit it.
+
+Usage:
+    python tools/generate_app_config.py
+    python tools/generate_app_config.py --env-file .env.production && buildozer android release
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import dotenv_values
+from utils.app_config import CONFIG_KEYS, default_config_path
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate app_config.json for packaged builds')
+    parser.add_argument('--env-file', default='.env', help='Dotenv file to read, the environment overrides it')
+    parser.add_argument('--output', default=default_config_path(), help='Config file to write')
+    args = parser.parse_args()
+
+    values = dotenv_values(args.env_file) if os.path.exists(args.env_file) else {}
+    config = {}
+    for key in CONFIG_KEYS:
+        value = os.getenv(key) or values.get(key)
+        if value:
+            config[key] = value
+
+    if not config.get('VEEVOTECH_API_HASH') and not config.get('TWILIO_ACCOUNT_SID'):
+        print("Warning: no SMS gateway credentials found, the app will not be able to send alerts")
+
+    with open(args.output, 'w') as f:
+        json.dump(config, f, indent=2)
+    print(f"Wrote {len(config)} settings to {args.output}: {', '.join(sorted(config))}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Local stand-ins for the email and webhook alert channels.
+
+Runs a minimal SMTP server and an HTTP webhook receiver with configurable
+latency and error rate, so multi-channel alert fan-out can be exercised
+without a mail provider or a public endpoint.
+
+Usage:
+    python tools/mock_alert_channels.py --smtp-port 8025 --webhook-port 8766 --latency uniform:0.1:0.5
+    SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_USE_TLS=0 python main.py
+    (contact webhook URL: http://127.0.0.1:8766/hook)
+"""
+import argparse
+import json
+import os
+import random
+import socketserver
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.mock_sms_gateway import LatencyModel
+
+class MockChannelState:
+    """Behaviour settings, counters and received messages for one stand-in server"""
+
+    def __init__(self, latency='fixed:0.05', error_rate=0.0, seed=None):
+        self.latency = LatencyModel(latency, seed)
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self.stats = {'received': 0, 'delivered': 0, 'failed': 0}
+        self.messages = []
+
+    def receive(self, message):
+        """Simulate processing one message, returns True if it was accepted"""
+        time.sleep(self.latency.sample())
+        with self._lock:
+            self.stats['received'] += 1
+            if self._random.random() < self.error_rate:
+                self.stats['failed'] += 1
+                return False
+            self.stats['delivered'] += 1
+            self.messages.append(message)
+            return True
+
+class MockSmtpHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: HELO/EHLO, MAIL, RCPT, DATA, RSET, NOOP, QUIT"""
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        state = self.server.state
+        envelope = {'from': None, 'to': []}
+        self._reply('220 localhost Mock SMTP ready')
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode(errors='replace').strip()
+            verb = command[:4].upper()
+
+            if verb in ('HELO', 'EHLO'):
+                self._reply('250 localhost')
+            elif verb == 'MAIL':
+                envelope = {'from': command[10:].strip(), 'to': []}
+                self._reply('250 OK')
+            elif verb == 'RCPT':
+                envelope['to'].append(command[8:].strip())
+                self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                body = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b'.\r\n', b'.\n'):
+                        break
+                    body.append(data_line.decode(errors='replace'))
+                message = dict(envelope, data=''.join(body))
+                if state.receive(message):
+                    self._reply('250 OK queued')
+                else:
+                    self._reply('451 Simulated mail server failure')
+            elif verb == 'RSET':
+                envelope = {'from': None, 'to': []}
+                self._reply('250 OK')
+            elif verb == 'NOOP':
+                self._reply('250 OK')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Command not implemented')
+
+class MockWebhookHandler(BaseHTTPRequestHandler):
+    """Accepts JSON POSTs on any path"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._reply(400, {'status': 'error', 'message': 'Invalid JSON'})
+            return
+
+        if self.server.state.receive({'path': self.path, 'payload': payload}):
+            self._reply(200, {'status': 'ok'})
+        else:
+            self._reply(500, {'status': 'error', 'message': 'Simulated webhook failure'})
+
+class MockSmtpServer:
+    """SMTP stand-in that can run in the background of a test or benchmark"""
+
+    def __init__(self, host='127.0.0.1', port=0, **behaviour):
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), MockSmtpHandler)
+        self.server.daemon_threads = True
+        self.server.state = MockChannelState(**behaviour)
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def start(self):
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class MockWebhookServer:
+    """Webhook receiver that can run in the background of a test or benchmark"""
+
+    def __init__(self, host='127.0.0.1', port=0, **behaviour):
+        self.server = ThreadingHTTPServer((host, port), MockWebhookHandler)
+        self.server.daemon_threads = True
+        self.server.state = MockChannelState(**behaviour)
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/hook"
+
+    def start(self):
+        Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-ins for the email and webhook alert channels')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--smtp-port', type=int, default=8025)
+    parser.add_argument('--webhook-port', type=int, default=8766)
+    parser.add_argument('--latency', default='fixed:0.05',
+                        help='fixed:S, uniform:LOW:HIGH, exponential:MEAN or lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of messages that fail')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    behaviour = {'latency': args.latency, 'error_rate': args.error_rate, 'seed': args.seed}
+    smtp = MockSmtpServer(args.host, args.smtp_port, **behaviour).start()
+    webhook = MockWebhookServer(args.host, args.webhook_port, **behaviour).start()
+    print(f"Mock SMTP server listening on {smtp.address[0]}:{smtp.address[1]}")
+    print(f"Mock webhook receiver listening on {webhook.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        smtp.stop()
+        webhook.stop()
+        print(f"SMTP stats: {smtp.state.stats}")
+        print(f"Webhook stats: {webhook.state.stats}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Local stand-in for the Veevotech SMS API.
+
+Serves GET /v3/sendsms with the same query parameters and JSON shape as the
+real gateway, with configurable latency, error rate and rate limit so the
+send path can be benchmarked and regression-tested without network access.
+
+Usage:
+    python tools/mock_sms_gateway.py --port 8765 --latency lognormal:0.2:0.5 --error-rate 0.05 --rate-limit 50
+    VEEVOTECH_BASE_URL=http://127.0.0.1:8765/v3 VEEVOTECH_API_HASH=mock python main.py
+"""
+import argparse
+import json
+import math
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from urllib.parse import urlparse, parse_qs
+
+class LatencyModel:
+    """
+    Latency distribution for simulated gateway responses.
+
+    Spec strings:
+        fixed:SECONDS
+        uniform:LOW:HIGH
+        exponential:MEAN
+        lognormal:MEDIAN:SIGMA
+    """
+
+    def __init__(self, spec='fixed:0.05', seed=None):
+        self.spec = spec
+        parts = spec.split(':')
+        self.kind = parts[0]
+        self.params = [float(value) for value in parts[1:]]
+        self._random = random.Random(seed)
+        self._lock = Lock()
+
+        expected = {'fixed': 1, 'uniform': 2, 'exponential': 1, 'lognormal': 2}
+        if self.kind not in expected or len(self.params) != expected[self.kind]:
+            raise ValueError(f"Invalid latency spec: {spec}")
+
+    def sample(self):
+        """Draw one latency in seconds"""
+        with self._lock:
+            if self.kind == 'fixed':
+                return self.params[0]
+            if self.kind == 'uniform':
+                return self._random.uniform(self.params[0], self.params[1])
+            if self.kind == 'exponential':
+                return self._random.expovariate(1.0 / self.params[0])
+            median, sigma = self.params
+            return self._random.lognormvariate(math.log(median), sigma)
+
+class TokenBucket:
+    """Requests-per-second limiter, None rate means unlimited"""
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.capacity = burst or rate or 0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = Lock()
+
+    def allow(self):
+        if not self.rate:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+class MockGatewayState:
+    """Behaviour settings and counters shared by all request handlers"""
+
+    def __init__(self, latency='fixed:0.05', error_rate=0.0, rate_limit=None, api_hash=None, seed=None):
+        self.latency = LatencyModel(latency, seed)
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit)
+        self.api_hash = api_hash
+        self._random = random.Random(seed)
+        self._lock = Lock()
+        self.stats = {'received': 0, 'sent': 0, 'failed': 0, 'rate_limited': 0, 'unauthorized': 0}
+        self.messages = []
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def should_fail(self):
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+class MockGatewayHandler(BaseHTTPRequestHandler):
+    """Request handler imitating the Veevotech /sendsms endpoint"""
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real gateway
+
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._reply(200, {})
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+
+        if url.path.endswith('/stats'):
+            self._reply(200, state.stats)
+            return
+        if not url.path.endswith('/sendsms'):
+            self._reply(404, {'status': 'error', 'message': 'Not found'})
+            return
+
+        state.count('received')
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if state.api_hash and params.get('hash') != state.api_hash:
+            state.count('unauthorized')
+            self._reply(200, {'status': 'error', 'message': 'Invalid hash'})
+            return
+        if not params.get('receivernum') or not params.get('textmessage'):
+            state.count('failed')
+            self._reply(200, {'status': 'error', 'message': 'Missing receiver or message'})
+            return
+        if not state.bucket.allow():
+            state.count('rate_limited')
+            self._reply(429, {'status': 'error', 'message': 'Rate limit exceeded'})
+            return
+
+        time.sleep(state.latency.sample())
+
+        if state.should_fail():
+            state.count('failed')
+            self._reply(500, {'status': 'error', 'message': 'Simulated gateway failure'})
+            return
+
+        state.count('sent')
+        self._reply(200, {'status': 'success', 'message': 'Message sent'})
+
+class MockSmsGateway:
+    """Mock gateway server that can run in the background of a test or benchmark"""
+
+    def __init__(self, host='127.0.0.1', port=0, **behaviour):
+        self.server = ThreadingHTTPServer((host, port), MockGatewayHandler)
+        self.server.daemon_threads = True
+        self.server.state = MockGatewayState(**behaviour)
+        self._thread = None
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v3"
+
+    def start(self):
+        self._thread = Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Local mock of the Veevotech SMS API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='fixed:0.05',
+                        help='fixed:S, uniform:LOW:HIGH, exponential:MEAN or lognormal:MEDIAN:SIGMA')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of sends that fail')
+    parser.add_argument('--rate-limit', type=float, default=None, help='Accepted sends per second')
+    parser.add_argument('--api-hash', default=None, help='Reject requests with a different hash')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    gateway = MockSmsGateway(
+        args.host, args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        api_hash=args.api_hash,
+        seed=args.seed
+    )
+    print(f"Mock SMS gateway listening on {gateway.base_url}")
+    try:
+        gateway.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.server.server_close()
+        print(f"Stats: {gateway.state.stats}")
+
+if __name__ == '__main__':
+    main()
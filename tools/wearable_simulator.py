@@ -0,0 +1,249 @@
+"""
+Scripted ESP32 wearable for exercising the Bluetooth path on Linux.
+
+The simulator plugs into BluetoothService's find_device/open_socket hooks
+and talks over a FakeBluetoothSocket, so the real reader, gesture decoder,
+coalescer, event bus and supervisor all run unchanged.
+
+Script steps, separated by ';':
+    press N          N presses (button_press_N token, or raw down/up events with --raw)
+    long_press S     hold for S seconds (raw events only)
+    wait S           sleep S seconds
+    garbage N        N random bytes followed by a newline
+    burst N          N triple press tokens in a single chunk
+    drop             break the link, the app reconnects
+    away S           go out of range for S seconds
+
+Usage:
+    python tools/wearable_simulator.py --script "press 1; wait 1; press 3; drop; wait 2; garbage 32; press 2"
+    python tools/wearable_simulator.py --raw --chunk-size 5 --script "press 3; long_press 2"
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from threading import Event
+
+# Keep Kivy from parsing our command line arguments when services import it
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.fake_bluetooth import FakeBluetoothSocket
+
+class WearableSimulator:
+    """
+    A simulated ESP32 wearable.
+
+    Acts as its own bonded device (getName/getAddress) and opens a fresh
+    FakeBluetoothSocket on every connect, like a real RFCOMM link. Presses go
+    out as button_press_N tokens, or as raw btn_down/btn_up events stamped
+    with a simulated millisecond clock. With chunk_size set, every write is
+    split into chunks of that many bytes to reproduce frames split across reads.
+    """
+
+    def __init__(self, name='ESP32-Safinity-SIM', address='5A:F1:00:00:00:01', raw=False, chunk_size=None,
+                 seed=None):
+        """
+        Args:
+            name (str): Device name the app sees
+            address (str): Device MAC address
+            raw (bool): Send raw down/up events rather than press tokens
+            chunk_size (int): Split writes into chunks of this many bytes
+            seed (int): Random seed for garbage bytes
+        """
+        self.name = name
+        self.address = address
+        self.raw = raw
+        self.chunk_size = chunk_size
+        self.in_range = True
+        self.socket = None
+        self.stats = {'connects': 0, 'refused': 0, 'presses': 0, 'drops': 0, 'garbage_bytes': 0}
+        self._random = random.Random(seed)
+        self._clock_start = time.monotonic()
+        self._connected = Event()
+
+    # Bonded device API
+
+    def getName(self):
+        return self.name
+
+    def getAddress(self):
+        return self.address
+
+    # BluetoothService transport hooks
+
+    def find_device(self):
+        """Return the simulated device if it is in range"""
+        return self if self.in_range else None
+
+    def open_socket(self, device):
+        """Open a new connected socket to the simulated device"""
+        if not self.in_range:
+            self.stats['refused'] += 1
+            raise IOError('read failed, socket might closed or timeout, read ret: -1')
+        socket = FakeBluetoothSocket()
+        socket.connect()
+        self.socket = socket
+        self.stats['connects'] += 1
+        self._connected.set()
+        return socket
+
+    def wait_connected(self, timeout=10.0):
+        """Wait until the app has a live socket, returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.socket is not None and self.socket.isConnected():
+                return True
+            self._connected.wait(0.05)
+        return False
+
+    # Behaviour
+
+    def millis(self):
+        """Simulated device clock, a wrapping 32-bit millisecond counter"""
+        return int((time.monotonic() - self._clock_start) * 1000) & 0xFFFFFFFF
+
+    def send(self, data):
+        """Write bytes to the app, split into chunks if configured"""
+        if self.socket is None or not self.socket.isConnected():
+            return False
+        if not self.chunk_size:
+            self.socket.feed(data)
+            return True
+        for start in range(0, len(data), self.chunk_size):
+            self.socket.feed(data[start:start + self.chunk_size])
+        return True
+
+    def press(self, count=1, hold=0.08, gap=0.12):
+        """
+        Press the button count times.
+
+        Returns:
+            float: perf_counter time the deciding event was sent
+        """
+        self.stats['presses'] += 1
+        if not self.raw:
+            sent_at = time.perf_counter()
+            self.send(f"button_press_{count}\n".encode())
+            return sent_at
+
+        sent_at = None
+        for index in range(count):
+            sent_at = time.perf_counter()
+            self.send(f"btn_down:{self.millis()}\n".encode())
+            time.sleep(hold)
+            self.send(f"btn_up:{self.millis()}\n".encode())
+            if index < count - 1:
+                time.sleep(gap)
+        return sent_at
+
+    def long_press(self, hold=2.0):
+        """Hold the button down, returns the perf_counter time it went down"""
+        self.stats['presses'] += 1
+        sent_at = time.perf_counter()
+        self.send(f"btn_down:{self.millis()}\n".encode())
+        time.sleep(hold)
+        self.send(f"btn_up:{self.millis()}\n".encode())
+        return sent_at
+
+    def garbage(self, size=64):
+        """Send random bytes, as from a noisy link or a firmware bug"""
+        data = bytes(self._random.randrange(256) for _ in range(size)).replace(b'\n', b'?')
+        self.stats['garbage_bytes'] += size
+        self.send(data + b'\n')
+
+    def burst(self, count=20):
+        """Send many triple press tokens in one chunk"""
+        self.stats['presses'] += count
+        self.send(b"button_press_3\n" * count)
+
+    def drop(self):
+        """Break the current link"""
+        socket, self.socket = self.socket, None
+        if socket is not None:
+            self.stats['drops'] += 1
+            self._connected.clear()
+            socket.fail()
+
+    def away(self, seconds):
+        """Go out of range for a while, dropping the link"""
+        self.in_range = False
+        self.drop()
+        time.sleep(seconds)
+        self.in_range = True
+
+    def run(self, script):
+        """Run a ';' separated script, see the module docstring"""
+        for step in filter(None, (part.strip() for part in script.split(';'))):
+            command, *args = step.split()
+            value = float(args[0]) if args else None
+            if command == 'press':
+                self.press(int(value or 1))
+            elif command == 'long_press':
+                self.long_press(value or 2.0)
+            elif command == 'wait':
+                time.sleep(value or 1.0)
+            elif command == 'garbage':
+                self.garbage(int(value or 64))
+            elif command == 'burst':
+                self.burst(int(value or 20))
+            elif command == 'drop':
+                self.drop()
+            elif command == 'away':
+                self.away(value or 5.0)
+            else:
+                raise ValueError(f"Unknown script step: {step}")
+            if command in ('drop', 'away'):
+                self.wait_connected()
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive BluetoothService with a scripted wearable')
+    parser.add_argument('--script', default='press 1; wait 1; press 2; wait 1; press 3; drop; wait 1; press 3')
+    parser.add_argument('--raw', action='store_true', help='Send raw down/up events')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Split writes into chunks')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    from threading import Thread
+    from kivy.clock import Clock
+    from utils.bluetooth_connection import Backoff
+    from utils.bluetooth_service import BluetoothService
+    from utils.device_registry import DeviceRegistry
+
+    simulator = WearableSimulator(raw=args.raw, chunk_size=args.chunk_size, seed=args.seed)
+    # In-memory registry, the simulated wearable must not be remembered by the real app
+    service = BluetoothService(find_device=simulator.find_device, open_socket=simulator.open_socket,
+                               backoff=Backoff(base=0.1, cap=2.0), registry=DeviceRegistry())
+    started = time.perf_counter()
+
+    def on_message(message):
+        print(f"{time.perf_counter() - started:7.3f}s  message: {message!r}")
+
+    def on_button_press(press_type, sequence=None):
+        print(f"{time.perf_counter() - started:7.3f}s  press:   {press_type} #{sequence}")
+
+    service.connect_to_esp32(on_message, on_button_press)
+    simulator.wait_connected()
+
+    script = Thread(target=simulator.run, args=(args.script,), daemon=True)
+    script.start()
+    # Events are delivered on this thread, as on the app's main thread
+    while script.is_alive():
+        Clock.tick()
+    for _ in range(30):
+        Clock.tick()
+    reader = service.frame_reader
+    service.disconnect()
+    Clock.tick()
+
+    print(f"\nSimulator: {simulator.stats}")
+    print(f"Reader:    {reader.stats if reader else None}")
+    print(f"Events:    {service.events.stats}")
+    print(f"Coalescer: {service.alert_coalescer.stats}")
+    print(f"Decoder:   {service.gesture_decoder.stats}")
+    print(f"Connect:   {service.supervisor.stats}")
+
+if __name__ == '__main__':
+    main()
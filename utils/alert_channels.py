@@ -0,0 +1,265 @@
+import os
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from email.message import EmailMessage
+from threading import Lock
+import requests
+from utils.message_scheduler import get_message_scheduler, priority_for
+from utils.shared import shared_instance
+
+class AlertChannel:
+    """
+    One way of reaching an emergency contact.
+
+    Each channel has its own timeout and concurrency budget. Sends run on a
+    pool sized to the budget, so a slow channel can only tie up its own
+    workers and never delays the others.
+    """
+
+    name = 'channel'
+
+    def __init__(self, timeout=10.0, max_concurrency=4):
+        """
+        Args:
+            timeout (float): Seconds a send may take before it counts as failed
+            max_concurrency (int): Sends this channel may have in flight
+        """
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._lock = Lock()
+
+    def is_configured(self):
+        """Check if the channel has the settings it needs"""
+        return True
+
+    def address_for(self, contact):
+        """Get the contact's address on this channel, or None if they have none"""
+        raise NotImplementedError
+
+    def send(self, address, message, message_type, subject):
+        """
+        Deliver one alert.
+
+        Returns:
+            dict: {'status': 'success' or 'error', 'message': str}
+        """
+        raise NotImplementedError
+
+    def submit(self, address, message, message_type, subject):
+        """Start a send within the concurrency budget, returns a Future of the result dict"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix=f'alert-{self.name}'
+                )
+        return self._executor.submit(self.send, address, message, message_type, subject)
+
+class SmsChannel(AlertChannel):
+    """SMS through the priority scheduler and gateway router"""
+
+    name = 'sms'
+
+    def __init__(self, scheduler=None, timeout=15.0):
+        # The scheduler enforces per-priority SMS budgets itself
+        super().__init__(timeout=timeout, max_concurrency=None)
+        self._scheduler = scheduler
+
+    @property
+    def scheduler(self):
+        if self._scheduler is None:
+            self._scheduler = get_message_scheduler()
+        return self._scheduler
+
+    def address_for(self, contact):
+        return contact.get('phone_number')
+
+    def submit(self, address, message, message_type, subject):
+        return self.scheduler.submit(address, message, priority_for(message_type))
+
+class EmailChannel(AlertChannel):
+    """Email over SMTP, configured with the SMTP_* environment variables"""
+
+    name = 'email'
+
+    def __init__(self, host=None, port=None, username=None, password=None, sender=None,
+                 use_tls=None, timeout=15.0, max_concurrency=4):
+        super().__init__(timeout=timeout, max_concurrency=max_concurrency)
+        self.host = host or os.getenv('SMTP_HOST')
+        self.port = int(port or os.getenv('SMTP_PORT', '587'))
+        self.username = username or os.getenv('SMTP_USERNAME')
+        self.password = password or os.getenv('SMTP_PASSWORD')
+        self.sender = sender or os.getenv('SMTP_SENDER', 'alerts@safinity.app')
+        self.use_tls = use_tls if use_tls is not None else os.getenv('SMTP_USE_TLS', '1') == '1'
+
+    def is_configured(self):
+        return bool(self.host)
+
+    def address_for(self, contact):
+        return contact.get('email')
+
+    def send(self, address, message, message_type, subject):
+        email = EmailMessage()
+        email['From'] = self.sender
+        email['To'] = address
+        email['Subject'] = subject
+        email.set_content(message)
+
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+                if self.use_tls:
+                    smtp.starttls()
+                if self.username:
+                    smtp.login(self.username, self.password)
+                smtp.send_message(email)
+            return {'status': 'success', 'message': 'Email sent'}
+        except (smtplib.SMTPException, OSError) as e:
+            return {'status': 'error', 'message': f'Email failed: {str(e)}'}
+
+class WebhookChannel(AlertChannel):
+    """JSON POST to a contact's webhook URL, e.g. a family chat bot or monitoring service"""
+
+    name = 'webhook'
+
+    def __init__(self, timeout=5.0, max_concurrency=8):
+        super().__init__(timeout=timeout, max_concurrency=max_concurrency)
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=max_concurrency)
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+    def address_for(self, contact):
+        return contact.get('webhook_url')
+
+    def send(self, address, message, message_type, subject):
+        payload = {'type': message_type, 'subject': subject, 'message': message, 'sent_at': time.time()}
+        try:
+            response = self.http.post(address, json=payload, timeout=self.timeout)
+            if response.status_code >= 400:
+                return {'status': 'error', 'message': f'Webhook returned HTTP {response.status_code}'}
+            return {'status': 'success', 'message': 'Webhook delivered'}
+        except requests.exceptions.RequestException as e:
+            return {'status': 'error', 'message': f'Webhook failed: {str(e)}'}
+
+class ChannelDispatcher:
+    """
+    Fans an alert out over every channel each contact has, all at once.
+
+    A contact counts as reached as soon as any channel succeeds, so one
+    degraded carrier no longer decides how quickly someone hears about an
+    emergency. SMS fields (gateway, provider_id, circuit_open, offline) are
+    copied to the top of each contact's result, since delivery tracking
+    follows the SMS. Channels that failed are listed with their address in
+    failed_channels, so a queued delivery can resend them later.
+
+    An SMS that has not finished within the channel timeout is not a
+    failure: the scheduler still holds it and sends it. Its result is marked
+    pending, and the scheduler's future is handed to the caller through
+    pending_sms so the real outcome can be recorded when it arrives.
+    """
+
+    def __init__(self, channels):
+        self.channels = list(channels)
+
+    def active_channels(self):
+        """Channels with the settings they need"""
+        return [channel for channel in self.channels if channel.is_configured()]
+
+    def submit(self, channel_name, address, message, message_type='emergency', subject=None):
+        """
+        Resend an alert over one channel.
+
+        Returns:
+            Future: Of the result dict, or None if the channel is not configured
+        """
+        for channel in self.active_channels():
+            if channel.name == channel_name:
+                subject = subject or f"Safinity {message_type} alert"
+                return channel.submit(address, message, message_type, subject)
+        return None
+
+    def dispatch(self, contacts, message, message_type='emergency', subject=None, pending_sms=None):
+        """
+        Send an alert to every contact on every channel they have.
+
+        Args:
+            contacts (list): Contact dicts with name, phone_number and optionally email and webhook_url
+            message (str): Alert body
+            message_type (str): Alert type, sets the SMS priority
+            subject (str): Email subject, defaults to the alert type
+            pending_sms (list): Filled with (phone_number, future) for each SMS
+                still sending when its timeout ran out
+
+        Returns:
+            list: Per-contact result dicts in contact order
+        """
+        subject = subject or f"Safinity {message_type} alert"
+        started = time.monotonic()
+        jobs = []
+        for index, contact in enumerate(contacts):
+            for channel in self.active_channels():
+                address = channel.address_for(contact)
+                if address:
+                    jobs.append((index, channel, channel.submit(address, message, message_type, subject)))
+
+        outcomes = [{} for _ in contacts]
+        addresses = [{} for _ in contacts]
+        for index, channel, future in jobs:
+            remaining = max(0, channel.timeout - (time.monotonic() - started))
+            try:
+                result = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                if channel.name == 'sms':
+                    # Still queued or in flight in the scheduler, it will be sent
+                    result = {'status': 'pending', 'message': 'SMS still sending', 'pending': True}
+                    if pending_sms is not None:
+                        pending_sms.append((contacts[index].get('phone_number'), future))
+                else:
+                    result = {'status': 'error', 'message': f'{channel.name} timed out'}
+            except Exception as e:
+                result = {'status': 'error', 'message': f'Unexpected error: {str(e)}'}
+            outcomes[index][channel.name] = result
+            addresses[index][channel.name] = channel.address_for(contacts[index])
+
+        return [self._aggregate(contact, channels, channel_addresses)
+                for contact, channels, channel_addresses in zip(contacts, outcomes, addresses)]
+
+    @staticmethod
+    def _aggregate(contact, channels, addresses):
+        """Combine one contact's channel results into the per-contact result dict"""
+        sms = channels.get('sms', {})
+        reached = [name for name, result in channels.items() if result['status'] == 'success']
+        if not channels:
+            message = 'No channel configured for contact'
+        elif reached:
+            message = f"Reached by {', '.join(reached)}"
+        else:
+            message = sms.get('message') or next(iter(channels.values())).get('message', '')
+
+        if reached:
+            status = 'success'
+        elif sms.get('pending'):
+            status = 'pending'
+        else:
+            status = 'error'
+        return {
+            'contact_name': contact.get('name'),
+            'phone_number': contact.get('phone_number'),
+            'status': status,
+            'message': message,
+            'gateway': sms.get('gateway'),
+            'provider_id': sms.get('provider_id'),
+            'circuit_open': sms.get('circuit_open', False),
+            'offline': sms.get('offline', False),
+            'channels': channels,
+            'failed_channels': {
+                name: addresses[name] for name, result in channels.items()
+                if result['status'] not in ('success', 'pending')
+            }
+        }
+
+@shared_instance
+def get_channel_dispatcher():
+    """Get the shared dispatcher with SMS, email and webhook channels"""
+    return ChannelDispatcher([SmsChannel(), EmailChannel(), WebhookChannel()])
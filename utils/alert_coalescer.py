@@ -0,0 +1,138 @@
+import time
+from threading import Lock, Timer
+
+class AlertEvent:
+    """A coalesced alert ready to be dispatched"""
+
+    def __init__(self, press_type, severity, timestamp):
+        self.press_type = press_type
+        self.severity = severity
+        self.timestamp = timestamp  # When the first merged press arrived
+        self.sequence = None  # Set when dispatched
+        self.merged = 1  # Number of presses folded into this alert
+
+    def __repr__(self):
+        return (f"AlertEvent({self.press_type}, sequence={self.sequence}, "
+                f"merged={self.merged})")
+
+class AlertCoalescer:
+    """
+    Merges bursts of button presses into single alerts.
+
+    Within the coalescing window:
+    - repeats of an alert that was already sent, or anything less severe, are dropped
+    - lower severity presses wait a short settle delay so a follow-up press can
+      upgrade them (a check-in followed by an emergency becomes one emergency)
+    - the highest severity is dispatched immediately, never delayed
+    Every dispatched alert gets an increasing sequence number.
+    """
+
+    def __init__(self, on_alert, severities, window=10.0, settle=1.5):
+        """
+        Args:
+            on_alert: Callback receiving each dispatched AlertEvent
+            severities (dict): Press type -> severity, higher is more urgent
+            window (float): Seconds after a dispatch during which equal or lower alerts are dropped
+            settle (float): Seconds a lower severity alert waits for an upgrade
+        """
+        self.on_alert = on_alert
+        self.severities = severities
+        self.max_severity = max(severities.values())
+        self.window = window
+        self.settle = settle
+        self.sequence = 0
+        self.stats = {'received': 0, 'dispatched': 0, 'dropped': 0, 'merged': 0, 'upgraded': 0}
+        self._pending = None
+        self._timer = None
+        self._timer_generation = 0  # Bumped per settle timer, callbacks from cancelled timers are ignored
+        self._last_severity = 0
+        self._last_time = None
+        self._lock = Lock()
+
+    def submit(self, press_type):
+        """
+        Submit a press, dispatching, holding or dropping it.
+
+        Returns:
+            str: 'dispatched', 'pending', 'upgraded', 'merged' or 'dropped'
+        """
+        severity = self.severities.get(press_type)
+        if severity is None:
+            raise ValueError(f"Unknown press type: {press_type}")
+
+        now = time.monotonic()
+        ready = None
+        with self._lock:
+            self.stats['received'] += 1
+
+            # Already alerted at this level or higher within the window
+            if (self._last_time is not None and now - self._last_time < self.window
+                    and severity <= self._last_severity):
+                self.stats['dropped'] += 1
+                return 'dropped'
+
+            if self._pending is not None:
+                self._pending.merged += 1
+                if severity <= self._pending.severity:
+                    self.stats['merged'] += 1
+                    return 'merged'
+                self._pending.press_type = press_type
+                self._pending.severity = severity
+                self.stats['upgraded'] += 1
+                outcome = 'upgraded'
+            else:
+                self._pending = AlertEvent(press_type, severity, now)
+                outcome = 'pending'
+
+            if severity >= self.max_severity:
+                ready = self._take_pending(now)
+            elif self._timer is None:
+                self._timer_generation += 1
+                self._timer = Timer(self.settle, self._on_settled, args=(self._timer_generation,))
+                self._timer.daemon = True
+                self._timer.start()
+
+        if ready is not None:
+            self.on_alert(ready)
+            return 'dispatched'
+        return outcome
+
+    def flush(self):
+        """Dispatch any held alert immediately"""
+        with self._lock:
+            ready = self._take_pending(time.monotonic()) if self._pending else None
+        if ready is not None:
+            self.on_alert(ready)
+
+    def reset(self):
+        """Forget held and recent alerts, e.g. after the wearable reconnects"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+                self._timer = None
+            self._pending = None
+            self._last_severity = 0
+            self._last_time = None
+
+    def _on_settled(self, generation):
+        with self._lock:
+            if self._timer is None or generation != self._timer_generation:
+                return  # Cancelled after it had started running, a newer timer owns the pending alert
+            self._timer = None
+            ready = self._take_pending(time.monotonic()) if self._pending else None
+        if ready is not None:
+            self.on_alert(ready)
+
+    def _take_pending(self, now):
+        """Assign a sequence number to the held alert and clear it, caller holds the lock"""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        event = self._pending
+        self._pending = None
+        self.sequence += 1
+        event.sequence = self.sequence
+        self._last_severity = event.severity
+        self._last_time = now
+        self.stats['dispatched'] += 1
+        return event
@@ -0,0 +1,263 @@
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timezone
+from threading import Lock
+from utils.shared import app_data_dir, shared_instance
+
+SOURCE_BLUETOOTH = 'bluetooth'
+SOURCE_UI = 'ui'
+
+PARTITION_PATTERN = re.compile(r'^alerts-(\d{4})-(\d{2})\.sqlite3$')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    message_type TEXT NOT NULL,
+    source TEXT NOT NULL,
+    sequence INTEGER,
+    lat REAL,
+    lon REAL,
+    place TEXT,
+    message TEXT,
+    alert_id INTEGER,
+    status TEXT,
+    sent INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    outcomes TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_alert_history_user_created
+    ON alert_history (user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS ix_alert_history_alert
+    ON alert_history (alert_id);
+"""
+
+COLUMNS = ('id', 'user_id', 'created_at', 'message_type', 'source', 'sequence', 'lat', 'lon',
+           'place', 'message', 'alert_id', 'status', 'sent', 'total', 'outcomes')
+
+def partition_key(timestamp):
+    """Month partition a timestamp belongs to, as 'YYYY-MM' in UTC"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m')
+
+class AlertHistoryStore:
+    """
+    Log of every alert sent, one SQLite file per month.
+
+    Entries are only updated to record how an SMS that was still sending
+    when the alert was logged turned out. Retention drops whole month files,
+    so old history is removed without rewriting anything. Pages are read newest
+    first with keyset pagination. A cursor holds the last entry's partition,
+    created_at and id, so each page is an index range scan no matter how far
+    back the user has scrolled.
+    """
+
+    def __init__(self, directory, retention_months=12):
+        """
+        Args:
+            directory (str): Folder holding the month partitions
+            retention_months (int): Months of history to keep, including the current one
+        """
+        self.directory = directory
+        self.retention_months = retention_months
+        self._connections = {}
+        self._lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'alerts-{key}.sqlite3')
+
+    def partitions(self):
+        """Existing partition keys, newest first"""
+        keys = []
+        for filename in os.listdir(self.directory):
+            match = PARTITION_PATTERN.match(filename)
+            if match:
+                keys.append(f'{match.group(1)}-{match.group(2)}')
+        return sorted(keys, reverse=True)
+
+    def _connect(self, key):
+        """Open a partition, creating it if needed, caller holds the lock"""
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = sqlite3.connect(self._path(key), check_same_thread=False)
+            connection.executescript(SCHEMA)
+            self._connections[key] = connection
+        return connection
+
+    def append(self, user_id, message_type, source, message=None, results=None, alert_id=None,
+               sequence=None, lat=None, lon=None, place=None, status=None, created_at=None):
+        """
+        Add an alert to the history.
+
+        Args:
+            user_id: User who triggered the alert
+            message_type (str): Alert type
+            source (str): SOURCE_BLUETOOTH or SOURCE_UI
+            message (str): Body that was sent
+            results (list): Per-contact dicts with contact_name, phone_number and status
+            alert_id (int): Matching Alert row in the delivery tracker
+            sequence (int): Wearable press sequence number
+            lat, lon (float): Position included in the alert
+            place (str): Place description included in the alert
+            status (str): Overall send status
+            created_at (float): Unix time, defaults to now
+
+        Returns:
+            int: Entry ID within its partition, or None on error
+        """
+        created_at = time.time() if created_at is None else created_at
+        outcomes = [
+            {
+                'contact_name': result.get('contact_name'),
+                'phone_number': result.get('phone_number'),
+                'status': result.get('status')
+            }
+            for result in results or []
+        ]
+        sent = sum(1 for outcome in outcomes if outcome['status'] == 'success')
+        try:
+            with self._lock:
+                connection = self._connect(partition_key(created_at))
+                with connection:
+                    cursor = connection.execute(
+                        "INSERT INTO alert_history (user_id, created_at, message_type, source, sequence, "
+                        "lat, lon, place, message, alert_id, status, sent, total, outcomes) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (str(user_id), created_at, message_type, source, sequence, lat, lon, place,
+                         message, alert_id, status, sent, len(outcomes), json.dumps(outcomes))
+                    )
+                return cursor.lastrowid
+        except Exception as e:
+            print(f"Error appending alert history: {str(e)}")
+            return None
+
+    def update_outcome(self, user_id, alert_id, phone_number, status):
+        """
+        Record the final outcome of one contact of a logged alert.
+
+        Args:
+            user_id: User who triggered the alert
+            alert_id (int): Alert ID the entry was appended with
+            phone_number (str): Contact whose outcome is now known
+            status (str): 'success' or 'error'
+
+        Returns:
+            bool: False if no entry has that alert and contact
+        """
+        try:
+            with self._lock:
+                # The SMS finishes minutes after the alert, so the newest partitions hold it
+                for key in self.partitions():
+                    connection = self._connect(key)
+                    row = connection.execute(
+                        "SELECT id, outcomes FROM alert_history WHERE alert_id = ? AND user_id = ? "
+                        "ORDER BY created_at DESC, id DESC LIMIT 1", (alert_id, str(user_id))
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    outcomes = json.loads(row[1] or '[]')
+                    matched = False
+                    for outcome in outcomes:
+                        if outcome['phone_number'] == phone_number:
+                            outcome['status'] = status
+                            matched = True
+                    if not matched:
+                        return False
+
+                    sent = sum(1 for outcome in outcomes if outcome['status'] == 'success')
+                    still_sending = any(outcome['status'] == 'pending' for outcome in outcomes)
+                    overall = 'success' if sent == len(outcomes) else \
+                        'partial' if sent or still_sending else 'error'
+                    with connection:
+                        connection.execute(
+                            "UPDATE alert_history SET outcomes = ?, sent = ?, status = ? WHERE id = ?",
+                            (json.dumps(outcomes), sent, overall, row[0])
+                        )
+                    return True
+        except Exception as e:
+            print(f"Error updating alert history: {str(e)}")
+        return False
+
+    def page(self, user_id, limit=50, cursor=None):
+        """
+        Get one page of a user's history, newest first.
+
+        Args:
+            user_id: User ID
+            limit (int): Entries per page
+            cursor (tuple): next_cursor from the previous page, None for the first page
+
+        Returns:
+            dict: 'items' (list of entry dicts) and 'next_cursor' (None on the last page)
+        """
+        items = []
+        last = None
+        with self._lock:
+            for key in self.partitions():
+                if cursor is not None and key > cursor[0]:
+                    continue
+                query = f"SELECT {', '.join(COLUMNS)} FROM alert_history WHERE user_id = ?"
+                params = [str(user_id)]
+                if cursor is not None and key == cursor[0]:
+                    query += " AND (created_at < ? OR (created_at = ? AND id < ?))"
+                    params += [cursor[1], cursor[1], cursor[2]]
+                query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+                params.append(limit - len(items))
+
+                try:
+                    rows = self._connect(key).execute(query, params).fetchall()
+                except Exception as e:
+                    print(f"Error reading alert history {key}: {str(e)}")
+                    continue
+                for row in rows:
+                    item = dict(zip(COLUMNS, row))
+                    item['outcomes'] = json.loads(item['outcomes'] or '[]')
+                    items.append(item)
+                    last = (key, item['created_at'], item['id'])
+                if len(items) >= limit:
+                    break
+
+        return {'items': items, 'next_cursor': last if len(items) >= limit else None}
+
+    def apply_retention(self, now=None):
+        """
+        Delete partitions older than the retention window.
+
+        Returns:
+            list: Partition keys that were removed
+        """
+        current = datetime.fromtimestamp(time.time() if now is None else now, tz=timezone.utc)
+        month_index = current.year * 12 + current.month - 1 - (self.retention_months - 1)
+        oldest_kept = f'{month_index // 12:04d}-{month_index % 12 + 1:02d}'
+
+        removed = []
+        with self._lock:
+            for key in self.partitions():
+                if key >= oldest_kept:
+                    continue
+                connection = self._connections.pop(key, None)
+                if connection is not None:
+                    connection.close()
+                try:
+                    os.remove(self._path(key))
+                    removed.append(key)
+                except OSError as e:
+                    print(f"Error removing alert history {key}: {str(e)}")
+        if removed:
+            print(f"Removed alert history partitions: {', '.join(removed)}")
+        return removed
+
+def default_history_dir():
+    """History folder in the app's private storage"""
+    return os.path.join(app_data_dir(), 'alert_history')
+
+@shared_instance
+def get_alert_history():
+    """Get the shared alert history, applying retention when first opened"""
+    history = AlertHistoryStore(default_history_dir())
+    history.apply_retention()
+    return history
@@ -0,0 +1,99 @@
+from string import Template
+from threading import Lock
+
+# Alert bodies without location, $full_name and $phone_number are substituted per user
+DEFAULT_TEMPLATES = {
+    'emergency': "EMERGENCY ALERT: $full_name has triggered an emergency alert. "
+                 "Please contact them immediately at $phone_number.",
+    'warning': "WARNING: $full_name has triggered a warning alert. "
+               "Please check on them when possible at $phone_number.",
+    'check': "CHECK-IN: $full_name would like you to check on them. "
+             "Please contact them when convenient at $phone_number.",
+    'accidental': "ACCIDENTAL ALERT: $full_name's previous alert was triggered by mistake. "
+                  "No action is required. The user is safe.",
+    'default': "ALERT: $full_name has triggered an alert. "
+               "Please contact them at $phone_number.",
+}
+
+class AlertTemplateRegistry:
+    """
+    Registry of alert message templates.
+    Each template is compiled once per type and locale, and the fully rendered
+    body is cached per user so sending only has to append the location.
+    """
+
+    def __init__(self, default_locale='en'):
+        self.default_locale = default_locale
+        self._templates = {}  # (locale, message_type) -> compiled Template
+        self._rendered = {}  # user_id -> {(locale, message_type): body}
+        self._lock = Lock()
+
+        for message_type, text in DEFAULT_TEMPLATES.items():
+            self.register(message_type, text)
+
+    def register(self, message_type, text, locale=None):
+        """
+        Register or replace a template.
+
+        Args:
+            message_type (str): Alert type (emergency, warning, check, accidental, default)
+            text (str): Template text using $full_name and $phone_number
+            locale (str, optional): Locale code, defaults to the registry default
+        """
+        locale = locale or self.default_locale
+        with self._lock:
+            self._templates[(locale, message_type)] = Template(text)
+            # Rendered bodies may come from the replaced template
+            self._rendered.clear()
+
+    def get_template(self, message_type, locale=None):
+        """
+        Get the compiled template for a type, falling back to the default
+        locale and then to the generic alert.
+        """
+        locale = locale or self.default_locale
+        for key in ((locale, message_type),
+                    (self.default_locale, message_type),
+                    (locale, 'default'),
+                    (self.default_locale, 'default')):
+            template = self._templates.get(key)
+            if template is not None:
+                return template
+        raise KeyError(f"No template registered for {message_type}")
+
+    def render(self, user_id, message_type, full_name, phone_number, locale=None):
+        """
+        Get the rendered alert body for a user, rendering it only on first use.
+
+        Args:
+            user_id: User ID the body is cached under
+            message_type (str): Alert type
+            full_name (str): User's full name
+            phone_number (str): User's phone number
+            locale (str, optional): Locale code
+
+        Returns:
+            str: Alert body without location
+        """
+        key = (locale or self.default_locale, message_type)
+        user_key = str(user_id)
+
+        user_bodies = self._rendered.get(user_key)
+        if user_bodies is not None and key in user_bodies:
+            return user_bodies[key]
+
+        body = self.get_template(message_type, locale).safe_substitute(
+            full_name=full_name or '',
+            phone_number=phone_number or ''
+        )
+        with self._lock:
+            self._rendered.setdefault(user_key, {})[key] = body
+        return body
+
+    def invalidate_user(self, user_id):
+        """Drop cached bodies for a user after their name or phone number changes"""
+        with self._lock:
+            self._rendered.pop(str(user_id), None)
+
+# Singleton instance
+alert_templates = AlertTemplateRegistry()
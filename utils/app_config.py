@@ -0,0 +1,49 @@
+import json
+import os
+
+# Settings the services read from the environment that a packaged app needs
+CONFIG_KEYS = (
+    'SMS_GATEWAYS',
+    'VEEVOTECH_API_HASH', 'VEEVOTECH_BASE_URL',
+    'TWILIO_ACCOUNT_SID', 'TWILIO_AUTH_TOKEN', 'TWILIO_FROM_NUMBER',
+    'SMTP_HOST', 'SMTP_PORT', 'SMTP_USERNAME', 'SMTP_PASSWORD', 'SMTP_SENDER', 'SMTP_USE_TLS',
+)
+
+CONFIG_FILENAME = 'app_config.json'
+
+def default_config_path():
+    """Config file next to main.py, where buildozer packages it"""
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), CONFIG_FILENAME)
+
+def load_app_config(path=None):
+    """
+    Load credentials generated at build time into the environment.
+
+    Buildozer does not package the .env file, so Android builds carry their
+    SMS and email credentials in app_config.json, written by
+    tools/generate_app_config.py before running buildozer. Variables already
+    set in the environment (e.g. from .env on a desktop) take precedence.
+
+    Args:
+        path (str): Config file, defaults to app_config.json next to main.py
+
+    Returns:
+        list: Names of the settings taken from the file
+    """
+    path = path or default_config_path()
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"Error loading app config: {e}")
+        return []
+
+    loaded = []
+    for key in CONFIG_KEYS:
+        value = config.get(key)
+        if value and not os.getenv(key):
+            os.environ[key] = str(value)
+            loaded.append(key)
+    return loaded
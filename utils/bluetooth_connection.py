@@ -0,0 +1,157 @@
+import random
+from threading import Event, Lock, Thread
+
+# Connection states
+IDLE = 'idle'
+SCANNING = 'scanning'
+CONNECTING = 'connecting'
+CONNECTED = 'connected'
+BACKOFF = 'backoff'
+
+class Backoff:
+    """
+    Capped exponential backoff with equal jitter.
+
+    Each delay is half the capped exponential plus a random share of the
+    other half, so retries from several phones spread out but a retry never
+    comes sooner than half the nominal delay. The first retry is quick, since
+    a wearable that just dropped out often comes straight back.
+    """
+
+    def __init__(self, base=0.5, cap=30.0, rng=None):
+        """
+        Args:
+            base (float): Nominal first delay in seconds
+            cap (float): Longest nominal delay in seconds
+            rng (random.Random): Random source, for tests
+        """
+        self.base = base
+        self.cap = cap
+        self.attempt = 0
+        self._random = rng or random.Random()
+
+    def next(self):
+        """Get the next delay in seconds"""
+        nominal = min(self.cap, self.base * (2 ** self.attempt))
+        self.attempt += 1
+        return nominal / 2 + self._random.uniform(0, nominal / 2)
+
+    def reset(self):
+        self.attempt = 0
+
+class ConnectionSupervisor:
+    """
+    Keeps the wearable connected from a thread of its own.
+
+    Runs the connection state machine: scanning finds the device, connecting
+    opens a socket to it, connected hands the socket to the reader and waits
+    until the link is reported lost, and backoff waits a jittered, capped
+    delay after a failure before scanning again. A lost link is rescanned
+    straight away and the backoff resets after every successful connect, so
+    recovery is as fast as the wearable allows. Every transition is reported
+    through on_state.
+    """
+
+    def __init__(self, find_device, open_socket, on_connected, on_state=None, backoff=None):
+        """
+        Args:
+            find_device: Callable returning the device to connect to, or None
+            open_socket: Callable taking the device and returning a connected socket
+            on_connected: Called with each new socket
+            on_state: Called with (state, detail) on every transition
+            backoff (Backoff): Retry delays
+        """
+        self.find_device = find_device
+        self.open_socket = open_socket
+        self.on_connected = on_connected
+        self.on_state = on_state
+        self.backoff = backoff or Backoff()
+        self.state = IDLE
+        self.stats = {'connects': 0, 'failures': 0, 'links_lost': 0}
+        self._running = False
+        self._wake = Event()
+        self._lock = Lock()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        """Start the supervisor thread if it is not running"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            if self._thread is not None and self._thread.is_alive():
+                return  # Stopped but not yet exited, it carries on
+            self._wake.clear()
+            self._thread = Thread(target=self._run, name='bluetooth-supervisor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop reconnecting, the caller closes the socket"""
+        with self._lock:
+            self._running = False
+            self._wake.set()
+
+    def link_lost(self, reason=None):
+        """Report that the connected socket failed, called by the reader"""
+        with self._lock:
+            if self.state == CONNECTED:
+                self.stats['links_lost'] += 1
+                self._wake.set()
+
+    def _set_state(self, state, detail=None):
+        self.state = state
+        if self.on_state:
+            try:
+                self.on_state(state, detail)
+            except Exception as e:
+                print(f"Error reporting Bluetooth state {state}: {e}")
+
+    def _wait_backoff(self, reason):
+        """Sleep the next backoff delay, returns early when stopped"""
+        self.stats['failures'] += 1
+        delay = self.backoff.next()
+        print(f"Bluetooth connect failed ({reason}), retrying in {delay:.1f}s")
+        self._set_state(BACKOFF, delay)
+        self._wake.wait(delay)
+        self._wake.clear()
+
+    def _run(self):
+        while self._running:
+            self._set_state(SCANNING)
+            try:
+                device = self.find_device()
+            except Exception as e:
+                print(f"Error finding Bluetooth device: {e}")
+                device = None
+            if device is None:
+                self._wait_backoff('device not found')
+                continue
+
+            if not self._running:
+                break
+            self._set_state(CONNECTING)
+            try:
+                socket = self.open_socket(device)
+            except Exception as e:
+                self._wait_backoff(str(e))
+                continue
+
+            self._wake.clear()
+            self.backoff.reset()
+            self.stats['connects'] += 1
+            self._set_state(CONNECTED)
+            try:
+                self.on_connected(socket)
+            except Exception as e:
+                print(f"Error starting Bluetooth reader: {e}")
+                self._wait_backoff(str(e))
+                continue
+            # Wait for the reader to report the link lost, or for stop()
+            self._wake.wait()
+            self._wake.clear()
+
+        self._set_state(IDLE)
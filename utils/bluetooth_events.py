@@ -0,0 +1,111 @@
+import time
+from collections import namedtuple
+from queue import Empty, SimpleQueue
+from threading import Lock
+from kivy.clock import Clock
+
+# A coalesced button press, press_type is one of BluetoothService.SINGLE/DOUBLE/TRIPLE_PRESS
+ButtonEvent = namedtuple('ButtonEvent', ['press_type', 'sequence', 'timestamp'])
+# Connection state change: 'connected', 'disconnected', 'reconnecting', ...
+StatusEvent = namedtuple('StatusEvent', ['status', 'detail', 'timestamp'])
+# Any other message from the wearable
+RawEvent = namedtuple('RawEvent', ['message', 'timestamp'])
+
+EVENT_TYPES = (ButtonEvent, StatusEvent, RawEvent)
+
+class BluetoothEventBus:
+    """
+    Hands Bluetooth events from the reader thread to the Kivy main thread.
+
+    publish() never blocks: it puts the event on a SimpleQueue and makes
+    sure one drain is scheduled on the Clock. The drain delivers queued
+    events in batches, so a burst costs one frame callback instead of one
+    per event. When more than max_pending events are waiting, status and raw
+    events are dropped and counted. Button events are always accepted.
+    """
+
+    def __init__(self, max_pending=256, batch_size=64, schedule=None):
+        """
+        Args:
+            max_pending (int): Queue depth above which low value events are dropped
+            batch_size (int): Events delivered per drain before yielding the frame
+            schedule: Callable taking a callback to run on the main thread,
+                defaults to Clock.schedule_once
+        """
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.schedule = schedule or Clock.schedule_once
+        self.stats = {'published': 0, 'delivered': 0, 'dropped': 0, 'drains': 0, 'max_depth': 0,
+                      'errors': 0}
+        self._queue = SimpleQueue()
+        self._subscribers = {event_type: [] for event_type in EVENT_TYPES}
+        self._pending = 0
+        self._drain_scheduled = False
+        self._lock = Lock()
+
+    def subscribe(self, event_type, callback):
+        """Call callback on the main thread with every event of event_type"""
+        self._subscribers[event_type].append(callback)
+
+    def unsubscribe(self, event_type, callback):
+        if callback in self._subscribers[event_type]:
+            self._subscribers[event_type].remove(callback)
+
+    def publish(self, event):
+        """
+        Queue an event from any thread.
+
+        Returns:
+            bool: False if the event was dropped
+        """
+        with self._lock:
+            if self._pending >= self.max_pending and not isinstance(event, ButtonEvent):
+                self.stats['dropped'] += 1
+                return False
+            self._pending += 1
+            self.stats['published'] += 1
+            self.stats['max_depth'] = max(self.stats['max_depth'], self._pending)
+            needs_drain = not self._drain_scheduled
+            self._drain_scheduled = True
+        self._queue.put(event)
+        if needs_drain:
+            self.schedule(self.drain)
+        return True
+
+    def button(self, press_type, sequence):
+        return self.publish(ButtonEvent(press_type, sequence, time.time()))
+
+    def status(self, status, detail=None):
+        return self.publish(StatusEvent(status, detail, time.time()))
+
+    def raw(self, message):
+        return self.publish(RawEvent(message, time.time()))
+
+    def pending(self):
+        """Events waiting to be delivered"""
+        return self._pending
+
+    def drain(self, dt=None):
+        """Deliver up to batch_size events, runs on the main thread"""
+        delivered = 0
+        while delivered < self.batch_size:
+            try:
+                event = self._queue.get_nowait()
+            except Empty:
+                break
+            delivered += 1
+            for callback in list(self._subscribers[type(event)]):
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"Error handling Bluetooth event {event}: {e}")
+
+        with self._lock:
+            self._pending -= delivered
+            self.stats['delivered'] += delivered
+            self.stats['drains'] += 1
+            more = self._pending > 0
+            self._drain_scheduled = more
+        if more:
+            self.schedule(self.drain)
@@ -0,0 +1,166 @@
+import struct
+
+NEWLINE = 'newline'
+LENGTH_PREFIXED = 'length'
+
+class StreamClosed(Exception):
+    """The transport reached end of stream"""
+
+class JavaInputStream:
+    """
+    Adapts a java.io.InputStream to readinto().
+
+    The stream handle and the Java-side byte[] are created once and reused,
+    so each read is a single JNI call instead of a getInputStream() lookup
+    plus a fresh array every time.
+    """
+
+    def __init__(self, stream, chunk_size=1024):
+        self.stream = stream
+        self._chunk = bytearray(chunk_size)
+
+    def readinto(self, view):
+        """Read into a writable buffer, returns the byte count or raises StreamClosed"""
+        size = min(len(view), len(self._chunk))
+        count = self.stream.read(self._chunk, 0, size)
+        if count is None or count < 0:
+            raise StreamClosed()
+        view[:count] = self._chunk[:count]
+        return count
+
+class SocketStream:
+    """Adapts anything with recv_into() (a Python socket) to readinto()"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def readinto(self, view):
+        count = self.sock.recv_into(view)
+        if not count:
+            raise StreamClosed()
+        return count
+
+def open_stream(socket, chunk_size=1024):
+    """Wrap a Bluetooth or Python socket in a readinto() stream"""
+    if hasattr(socket, 'recv_into'):
+        return SocketStream(socket)
+    return JavaInputStream(socket.getInputStream(), chunk_size)
+
+class FrameReader:
+    """
+    Splits a byte stream into frames.
+
+    Bytes are read into one reusable bytearray and frames are handed out as
+    memoryview slices of it, so nothing is copied between the transport and
+    the consumer. A frame split across reads is completed by the next read,
+    and several frames in one read are all returned. Frames are either
+    newline terminated (a trailing carriage return is dropped) or carry a
+    big-endian length prefix. Oversized frames are skipped so one bad frame
+    cannot wedge the stream.
+    """
+
+    def __init__(self, stream, framing=NEWLINE, buffer_size=4096, max_frame=1024, prefix_size=2):
+        """
+        Args:
+            stream: Object with readinto(), see open_stream()
+            framing (str): NEWLINE or LENGTH_PREFIXED
+            buffer_size (int): Receive buffer size in bytes
+            max_frame (int): Largest frame accepted, longer ones are discarded
+            prefix_size (int): Length prefix size in bytes, 1 or 2
+        """
+        if max_frame + prefix_size > buffer_size:
+            raise ValueError("buffer_size must hold a whole frame")
+        self.stream = stream
+        self.framing = framing
+        self.max_frame = max_frame
+        self._prefix = struct.Struct('>B' if prefix_size == 1 else '>H')
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0  # First unconsumed byte
+        self._end = 0  # One past the last received byte
+        self._scan = 0  # Where the delimiter search resumes
+        self._skipping = False  # Discarding the rest of an oversized newline frame
+        self.stats = {'reads': 0, 'bytes': 0, 'frames': 0, 'oversized': 0}
+
+    def read_frames(self):
+        """
+        Block for one read and return every frame it completed.
+
+        The returned memoryviews are only valid until the next call.
+
+        Returns:
+            list: memoryview per complete frame, possibly empty
+
+        Raises:
+            StreamClosed: The transport closed
+        """
+        self._compact()
+        count = self.stream.readinto(self._view[self._end:])
+        self._end += count
+        self.stats['reads'] += 1
+        self.stats['bytes'] += count
+        if self.framing == LENGTH_PREFIXED:
+            return self._split_length_prefixed()
+        return self._split_lines()
+
+    def frames(self):
+        """Yield frames until the transport closes"""
+        try:
+            while True:
+                yield from self.read_frames()
+        except StreamClosed:
+            return
+
+    def _compact(self):
+        """Move a partial frame to the front so the next read has room"""
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0
+        elif self._start and len(self._buffer) - self._end < self.max_frame:
+            pending = self._end - self._start
+            self._buffer[:pending] = self._view[self._start:self._end]
+            self._scan -= self._start
+            self._start, self._end = 0, pending
+
+    def _split_lines(self):
+        frames = []
+        while True:
+            index = self._buffer.find(b'\n', self._scan, self._end)
+            if index < 0:
+                break
+            start, stop = self._start, index
+            self._start = self._scan = index + 1
+            if self._skipping:
+                self._skipping = False
+                continue
+            if stop > start and self._buffer[stop - 1] == 0x0D:
+                stop -= 1
+            if stop > start:
+                frames.append(self._view[start:stop])
+
+        self._scan = self._end
+        if self._end - self._start > self.max_frame:
+            # No delimiter within max_frame, drop what we have and resync on the next newline
+            self.stats['oversized'] += 1
+            self._skipping = True
+            self._start = self._scan = self._end
+        self.stats['frames'] += len(frames)
+        return frames
+
+    def _split_length_prefixed(self):
+        frames = []
+        header = self._prefix.size
+        while self._end - self._start >= header:
+            (length,) = self._prefix.unpack_from(self._buffer, self._start)
+            if length > self.max_frame:
+                # A corrupt length cannot be resynced, drop everything buffered
+                self.stats['oversized'] += 1
+                self._start = self._end
+                break
+            if self._end - self._start < header + length:
+                break
+            begin = self._start + header
+            frames.append(self._view[begin:begin + length])
+            self._start = begin + length
+        self._scan = self._start
+        self.stats['frames'] += len(frames)
+        return frames
@@ -1,6 +1,13 @@
 from kivy.utils import platform
-from jnius import autoclass
 from threading import Thread
+from utils.alert_coalescer import AlertCoalescer
+from utils.bluetooth_connection import CONNECTED, ConnectionSupervisor
+from utils.bluetooth_events import BluetoothEventBus, ButtonEvent, RawEvent, StatusEvent
+from utils.bluetooth_framing import FrameReader, StreamClosed, open_stream
+from utils.bluetooth_writer import NORMAL, BluetoothWriter, open_output
+from utils.device_registry import get_device_registry
+from utils.gesture_decoder import GestureDecoder
+from utils.shared import shared_instance
 import time
 
 class BluetoothService:
@@ -11,16 +18,87 @@ class BluetoothService:
     DOUBLE_PRESS = "double_press"  # Warning message
     TRIPLE_PRESS = "triple_press"  # Emergency message
     
-    def __init__(self):
+    # Wire tokens sent by the ESP32 firmware
+    PRESS_TOKENS = {
+        "button_press_1": SINGLE_PRESS,
+        "button_press_2": DOUBLE_PRESS,
+        "button_press_3": TRIPLE_PRESS,
+    }
+    # Raw button events, "btn_down:<millis>" and "btn_up:<millis>" with the
+    # wearable's own clock, decoded into presses on the phone
+    BUTTON_DOWN = "btn_down"
+    BUTTON_UP = "btn_up"
+    # Messages passed to the message callback for each dispatched press
+    PRESS_MESSAGES = {
+        SINGLE_PRESS: "one_time",
+        DOUBLE_PRESS: "two_time",
+        TRIPLE_PRESS: "three_time",
+    }
+    # Higher severity presses upgrade lower ones inside the coalescing window
+    PRESS_SEVERITY = {
+        SINGLE_PRESS: 1,
+        DOUBLE_PRESS: 2,
+        TRIPLE_PRESS: 3,
+    }
+    
+    # Serial port profile, what the ESP32 BluetoothSerial library advertises
+    SPP_UUID = "00001101-0000-1000-8000-00805F9B34FB"
+    # Bonded devices whose name contains this are wearables
+    DEVICE_NAME_FILTER = "ESP"
+    
+    def __init__(self, alert_window=10.0, alert_settle=1.5, find_device=None, open_socket=None, backoff=None,
+                 multi_press_window=0.4, long_press=1.5, registry=None):
+        """
+        Args:
+            alert_window (float): Seconds repeated presses are coalesced
+            alert_settle (float): Seconds a lower severity press waits for an upgrade
+            multi_press_window (float): Longest gap between presses of one raw gesture
+            long_press (float): Hold time that makes a raw long press (emergency), None to disable
+            find_device: Replaces the bonded device lookup, e.g. with a simulator
+            open_socket: Replaces the RFCOMM connect, called with the found device
+            backoff (Backoff): Reconnect delays
+            registry (DeviceRegistry): Remembered wearables, defaults to the shared registry
+        """
         self.socket = None
         self.is_connected = False
         self.message_callback = None
         self.button_callback = None
-        self.message_queue = []
-        self.connection_retries = 0
-        self.max_retries = 5
+        self.frame_reader = None
+        # Outbound messages queue here while disconnected and go out in batches
+        self.writer = BluetoothWriter(on_error=self._link_lost)
+        self.adapter = None
+        self.registry = registry or get_device_registry()
+        self._rescan = False  # Scan the bonded devices instead of connecting by address
+        self._custom_transport = find_device is not None
+        self.supervisor = ConnectionSupervisor(
+            find_device or self._find_bonded_device,
+            open_socket or self._open_rfcomm,
+            self.attach,
+            on_state=self._on_connection_state,
+            backoff=backoff
+        )
+        # Callbacks run on the main thread, the reader thread only publishes
+        self.events = BluetoothEventBus()
+        self.events.subscribe(ButtonEvent, self._deliver_button)
+        self.events.subscribe(RawEvent, self._deliver_message)
+        self.events.subscribe(StatusEvent, self._deliver_message)
+        # Repeated or bouncing presses are merged so contacts never get SMS storms
+        self.alert_coalescer = AlertCoalescer(
+            self._dispatch_alert,
+            self.PRESS_SEVERITY,
+            window=alert_window,
+            settle=alert_settle
+        )
+        # Raw down/up events are classified here, presses go through the coalescer like firmware presses
+        self.gesture_decoder = GestureDecoder(
+            self.alert_coalescer.submit,
+            (self.SINGLE_PRESS, self.DOUBLE_PRESS, self.TRIPLE_PRESS),
+            window=multi_press_window,
+            long_press=long_press
+        )
         if platform == 'android':
             try:
+                from jnius import autoclass
                 self.BluetoothAdapter = autoclass('android.bluetooth.BluetoothAdapter')
                 self.UUID = autoclass('java.util.UUID')
                 self.adapter = self.BluetoothAdapter.getDefaultAdapter()
@@ -28,156 +106,191 @@ class BluetoothService:
                 print(f"Error initializing Bluetooth adapter: {e}")
                 self.adapter = None
     
-    def connect_to_esp32(self, on_message=None):
-        """Connect to ESP32 device"""
-        if platform != 'android':
-            print("Bluetooth is only supported on Android")
-            return False
-            
-        self.message_callback = on_message
-        devices = self.adapter.getBondedDevices().toArray()
-        
-        for device in devices:
-            if "ESP" in device.getName():
-                try:
-                    self.socket = device.createRfcommSocketToServiceRecord(
-                        self.UUID.fromString("00001101-0000-1000-8000-00805F9B34FB"))
-                    self.socket.connect()
-                    self.is_connected = True
-                    print("Connected to ESP32")
-                    Thread(target=self._listen_for_messages, daemon=True).start()
-                    return True
-                except Exception as e:
-                    print(f"Connection failed: {e}")
-                    self.is_connected = False
-                    return False
-        
-        print("ESP32 not found!")
-        return False
-    
     def connect_to_esp32(self, on_message=None, on_button_press=None):
-        """Connect to ESP32 device
+        """Start keeping the ESP32 connected
+        
+        Returns straight away, the supervisor thread connects and reconnects
+        in the background and reports progress as status events.
         
         Args:
             on_message: Callback for general messages
-            on_button_press: Callback for button press events
+            on_button_press: Callback for button press events, called with
+                the press type and the alert sequence number
+                
+        Callbacks left as None keep the ones already set, so a screen can
+        restart the shared link without taking over the alert callback.
+                
+        Returns:
+            bool: True if the supervisor is running
         """
-        if platform != 'android':
+        if platform != 'android' and not self._custom_transport:
             print("Bluetooth is only supported on Android")
             return False
             
-        self.message_callback = on_message
-        self.button_callback = on_button_press
-        devices = self.adapter.getBondedDevices().toArray()
+        if on_message is not None:
+            self.message_callback = on_message
+        if on_button_press is not None:
+            self.button_callback = on_button_press
+        self.supervisor.start()
+        return True
+
+    def _find_bonded_device(self):
+        """Get the wearable to connect to, or None
         
-        for device in devices:
-            if "ESP" in device.getName():
-                try:
-                    self.socket = device.createRfcommSocketToServiceRecord(
-                        self.UUID.fromString("00001101-0000-1000-8000-00805F9B34FB"))
-                    self.socket.connect()
-                    self.is_connected = True
-                    print("Connected to ESP32")
-                    Thread(target=self._listen_for_messages, daemon=True).start()
-                    return True
-                except Exception as e:
-                    print(f"Connection failed: {e}")
-                    self.is_connected = False
-                    return False
+        The remembered wearable is looked up by address, without going
+        through the bonded devices. They are only scanned when no wearable
+        is remembered yet or the last connect failed.
+        """
+        if not self.adapter:
+            return None
+        remembered = self.registry.preferred()
+        if remembered and not self._rescan:
+            return self.adapter.getRemoteDevice(remembered['address'])
+        self._rescan = False
+        device = self.registry.choose(self.adapter.getBondedDevices().toArray(), self.DEVICE_NAME_FILTER)
+        if device is None:
+            print("ESP32 not found!")
+        return device
+
+    def _open_rfcomm(self, device):
+        """Open a serial port profile socket to the device"""
+        socket = device.createRfcommSocketToServiceRecord(self.UUID.fromString(self.SPP_UUID))
+        try:
+            socket.connect()
+        except Exception:
+            socket.close()
+            self.registry.record_failure(device.getAddress())
+            self._rescan = True
+            raise
+        self.registry.remember(device.getAddress(), device.getName())
+        print(f"Connected to {device.getName()} ({device.getAddress()})")
+        return socket
+
+    def _on_connection_state(self, state, detail):
+        """Publish supervisor transitions, connected is published when the reader starts"""
+        if state != CONNECTED:
+            self.events.status(state, detail)
         
-        print("ESP32 not found!")
-        return False
+    def attach(self, socket):
+        """Start reading from a connected socket
         
-    def _listen_for_messages(self):
-        """Listen for incoming messages from ESP32"""
-        while self.is_connected:
+        Args:
+            socket: Connected BluetoothSocket, or anything with the same
+                getInputStream()/getOutputStream() calls or recv_into()
+        """
+        self.socket = socket
+        # One stream handle and receive buffer for the life of the connection
+        self.frame_reader = FrameReader(open_stream(socket))
+        self.is_connected = True
+        self.events.status('connected')
+        Thread(target=self._listen_for_messages, args=(self.frame_reader,), daemon=True).start()
+        self.writer.attach(open_output(socket))
+
+    def _listen_for_messages(self, reader):
+        """Listen for incoming messages from ESP32, one newline terminated token per frame"""
+        while self.is_connected and reader is self.frame_reader:
             try:
-                if self.socket:
-                    data = self.socket.getInputStream().read(1024).decode().strip()
-                    if data:
-                        # Process button press events
-                        if data == "button_press_1":
-                            if self.button_callback:
-                                self.button_callback(self.SINGLE_PRESS)
-                            if self.message_callback:
-                                self.message_callback("one_time")
-                        elif data == "button_press_2":
-                            if self.button_callback:
-                                self.button_callback(self.DOUBLE_PRESS)
-                            if self.message_callback:
-                                self.message_callback("two_time")
-                        elif data == "button_press_3":
-                            if self.button_callback:
-                                self.button_callback(self.TRIPLE_PRESS)
-                            if self.message_callback:
-                                self.message_callback("three_time")
-                        # Handle other messages
-                        elif self.message_callback:
-                            self.message_callback(data)
+                for frame in reader.read_frames():
+                    self._handle_frame(str(frame, 'utf-8', 'replace').strip())
             except Exception as e:
-                print(f"Error reading message: {e}")
-                self.is_connected = False
-                self._reconnect()
+                if reader is not self.frame_reader or not self.is_connected:
+                    break  # Disconnected on purpose
+                if isinstance(e, StreamClosed):
+                    print("ESP32 closed the connection")
+                else:
+                    print(f"Error reading message: {e}")
+                self._link_lost(e)
                 break
-    
-    def _reconnect(self):
-        """Attempt to reconnect to ESP32 with retry limits"""
-        if self.connection_retries >= self.max_retries:
-            print("Max reconnection attempts reached")
+
+    def _handle_frame(self, data):
+        """Route one message from the ESP32"""
+        if not data:
             return
-            
-        self.connection_retries += 1
-        print(f"Attempting reconnect ({self.connection_retries}/{self.max_retries})...")
-        time.sleep(2 * self.connection_retries)  # Exponential backoff
+        # Process button press events through the coalescer
+        press_type = self.PRESS_TOKENS.get(data)
+        if press_type:
+            self.alert_coalescer.submit(press_type)
+        # Raw down/up events go through the gesture decoder, anything else is a general message
+        elif not self._handle_button_event(data):
+            self.events.raw(data)
+    
+    def _handle_button_event(self, data):
+        """Feed a raw down/up event to the gesture decoder, returns False if data is not one"""
+        kind, _, stamp = data.partition(':')
+        if kind not in (self.BUTTON_DOWN, self.BUTTON_UP):
+            return False
+        try:
+            device_ms = int(stamp)
+        except ValueError:
+            return False
+        if kind == self.BUTTON_DOWN:
+            self.gesture_decoder.button_down(device_ms)
+        else:
+            self.gesture_decoder.button_up(device_ms)
+        return True
+
+    def _dispatch_alert(self, event):
+        """Publish a coalesced button press for the main thread
         
-        if self.connect_to_esp32(self.message_callback):
-            self.connection_retries = 0  # Reset counter on success
-            # Resend any queued messages
-    def _process_message_queue(self):
-        """Process queued messages after reconnection"""
-        while self.is_connected and self.message_queue:
-            try:
-                message = self.message_queue.pop(0)
-                self.socket.getOutputStream().write(message.encode())
-                self.socket.getOutputStream().flush()
-            except Exception as e:
-                print(f"Error sending queued message: {e}")
-                self.message_queue.insert(0, message)  # Re-add failed message
-                self._reconnect()
-                break
+        Args:
+            event: AlertEvent with press_type and sequence number
+        """
+        self.events.button(event.press_type, event.sequence)
+
+    def _deliver_button(self, event):
+        """Deliver a button press to the callbacks, runs on the main thread"""
+        if self.button_callback:
+            self.button_callback(event.press_type, event.sequence)
+        if self.message_callback:
+            self.message_callback(self.PRESS_MESSAGES[event.press_type])
 
-            if self.message_queue:
-                Thread(target=self._process_message_queue, daemon=True).start()
+    def _deliver_message(self, event):
+        """Deliver a raw message or connection status to the message callback, runs on the main thread"""
+        if self.message_callback:
+            self.message_callback(event.message if isinstance(event, RawEvent) else event.status)
     
+    def _link_lost(self, error):
+        """Mark the link down and let the supervisor reconnect"""
+        if not self.is_connected:
+            return
+        self.is_connected = False
+        self.writer.detach()
+        self.gesture_decoder.reset()
+        try:
+            self.socket.close()
+        except Exception:
+            pass
+        self.events.status('disconnected', str(error))
+        self.supervisor.link_lost(error)
+
     def disconnect(self):
-        """Disconnect from ESP32"""
+        """Disconnect from ESP32 and stop reconnecting"""
+        self.supervisor.stop()
         if self.socket:
             try:
                 self.is_connected = False
+                self.frame_reader = None
+                self.writer.detach()
                 self.socket.close()
                 self.socket = None
+                self.events.status('disconnected')
                 print("Disconnected from ESP32")
             except Exception as e:
                 print(f"Error disconnecting: {e}")
     
-    def send_message(self, message):
-        """Send message to ESP32 with queuing"""
-        if not self.is_connected or not self.socket:
-            print("Queueing message until connection restored")
-            self.message_queue.append(message)
-            return False
-            
-        try:
-            # Send any queued messages first
-            while self.message_queue:
-                queued_msg = self.message_queue.pop(0)
-                self.socket.getOutputStream().write(queued_msg.encode())
+    def send_message(self, message, priority=NORMAL):
+        """Queue a message for the ESP32, sent as soon as the link is up
+        
+        Args:
+            message: Text or bytes to send
+            priority: NORMAL, or HIGH to take the place of normal messages when the queue is full
             
-            self.socket.getOutputStream().write(message.encode())
-            self.socket.getOutputStream().flush()
-            return True
-        except Exception as e:
-            print(f"Error sending message: {e}")
-            self.message_queue.append(message)
-            self._reconnect()
-            return False
\ No newline at end of file
+        Returns:
+            bool: False if the queue was full and the message was dropped
+        """
+        return self.writer.send(message, priority)
+
+@shared_instance
+def get_bluetooth_service():
+    """Get the service that owns the wearable link, shared by every screen"""
+    return BluetoothService()
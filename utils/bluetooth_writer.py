@@ -0,0 +1,166 @@
+from collections import deque
+from threading import Condition, Thread
+
+# Message priorities
+NORMAL = 0
+HIGH = 1
+
+# What to drop when the queue is full
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+class SocketOutput:
+    """Adapts anything with sendall() (a Python socket) to write()/flush()"""
+
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, data):
+        self.sock.sendall(data)
+
+    def flush(self):
+        pass
+
+def open_output(socket):
+    """Get a write()/flush() stream for a Bluetooth or Python socket"""
+    if hasattr(socket, 'sendall'):
+        return SocketOutput(socket)
+    return socket.getOutputStream()
+
+class BluetoothWriter:
+    """
+    Sends outbound messages to the wearable from a single writer thread.
+
+    Messages wait in a bounded deque. The writer takes everything pending (up
+    to max_batch_bytes), joins it and sends it as one write and one flush, so
+    a burst of commands costs one round trip instead of one per message.
+    While disconnected messages stay queued and go out on the next attach.
+    When the queue is full a high priority message evicts the oldest normal
+    one, otherwise the policy drops either the oldest queued message or the
+    new one.
+    """
+
+    def __init__(self, max_pending=64, max_batch_bytes=512, policy=DROP_OLDEST, on_error=None):
+        """
+        Args:
+            max_pending (int): Messages queued at most
+            max_batch_bytes (int): Largest combined write
+            policy (str): DROP_OLDEST or DROP_NEWEST when full
+            on_error: Called with the exception when a write fails
+        """
+        self.max_pending = max_pending
+        self.max_batch_bytes = max_batch_bytes
+        self.policy = policy
+        self.on_error = on_error
+        self.stats = {'queued': 0, 'sent': 0, 'dropped': 0, 'writes': 0, 'bytes': 0, 'failures': 0,
+                      'max_depth': 0, 'max_batch': 0}
+        self._queue = deque()  # (priority, bytes)
+        self._output = None
+        self._running = False
+        self._cond = Condition()
+
+    def attach(self, output):
+        """Start writing to a connected stream, sends anything queued while disconnected"""
+        with self._cond:
+            self._output = output
+            if not self._running:
+                self._running = True
+                Thread(target=self._run, name='bluetooth-writer', daemon=True).start()
+            self._cond.notify_all()
+
+    def detach(self):
+        """Stop writing, queued messages are kept for the next attach"""
+        with self._cond:
+            self._output = None
+
+    def stop(self):
+        """Stop the writer thread"""
+        with self._cond:
+            self._running = False
+            self._output = None
+            self._cond.notify_all()
+
+    def send(self, message, priority=NORMAL):
+        """
+        Queue a message without blocking.
+
+        Args:
+            message (str or bytes): Message to send
+            priority (int): NORMAL or HIGH
+
+        Returns:
+            bool: False if the message was dropped
+        """
+        data = message.encode() if isinstance(message, str) else bytes(message)
+        with self._cond:
+            if len(self._queue) >= self.max_pending and not self._make_room(priority):
+                self.stats['dropped'] += 1
+                return False
+            self._queue.append((priority, data))
+            self.stats['queued'] += 1
+            self.stats['max_depth'] = max(self.stats['max_depth'], len(self._queue))
+            self._cond.notify_all()
+        return True
+
+    def pending(self):
+        """Messages waiting to be written"""
+        return len(self._queue)
+
+    def _make_room(self, priority):
+        """Drop a queued message for a new one if the policy allows, caller holds the lock"""
+        if priority > NORMAL:
+            for index, (queued_priority, _) in enumerate(self._queue):
+                if queued_priority < priority:
+                    del self._queue[index]
+                    self.stats['dropped'] += 1
+                    return True
+        if self.policy == DROP_OLDEST:
+            self._queue.popleft()
+            self.stats['dropped'] += 1
+            return True
+        return False
+
+    def _next_batch(self):
+        """Take pending messages up to max_batch_bytes, caller holds the lock"""
+        batch = [self._queue.popleft()]
+        size = len(batch[0][1])
+        while self._queue and size + len(self._queue[0][1]) <= self.max_batch_bytes:
+            item = self._queue.popleft()
+            batch.append(item)
+            size += len(item[1])
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running and (self._output is None or not self._queue):
+                    self._cond.wait()
+                if not self._running:
+                    return
+                output = self._output
+                batch = self._next_batch()
+
+            data = b''.join(item[1] for item in batch)
+            try:
+                output.write(data)
+                output.flush()
+            except Exception as e:
+                with self._cond:
+                    # Put the batch back in order and wait for the next attach
+                    self._queue.extendleft(reversed(batch))
+                    while len(self._queue) > self.max_pending:
+                        self._queue.pop()
+                        self.stats['dropped'] += 1
+                    if self._output is output:
+                        self._output = None
+                    self.stats['failures'] += 1
+                print(f"Error sending Bluetooth messages: {e}")
+                if self.on_error:
+                    self.on_error(e)
+                continue
+
+            with self._cond:
+                self.stats['writes'] += 1
+                self.stats['sent'] += len(batch)
+                self.stats['bytes'] += len(data)
+                self.stats['max_batch'] = max(self.stats['max_batch'], len(batch))
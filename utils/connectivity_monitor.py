@@ -0,0 +1,170 @@
+import os
+import socket
+import time
+from threading import Event, Lock, Thread
+from kivy.utils import platform
+
+class ConnectivityMonitor:
+    """
+    Tracks whether the device can reach the network.
+
+    A background thread keeps the state current so is_online() answers
+    instantly. Android reports connectivity through ConnectivityManager, which
+    costs no traffic. Elsewhere, or if ConnectivityManager cannot be queried,
+    a short TCP connect to a well-known host acts as a probe. A network may
+    block the probe, so an offline verdict from the probe alone is only advice
+    (see is_confirmed_offline). Senders report network errors they hit, which
+    triggers a recheck straight away, and successful sends, which prove the
+    network is up. Listeners are told when the state changes.
+    """
+
+    def __init__(self, probe_host=None, probe_port=53, probe_timeout=1.5,
+                 online_interval=30.0, offline_interval=5.0, android_interval=2.0,
+                 fallback_interval=120.0):
+        """
+        Args:
+            probe_host (str): Host to connect to, defaults to CONNECTIVITY_PROBE_HOST or 8.8.8.8
+            probe_port (int): Port to connect to
+            probe_timeout (float): Seconds a probe may take
+            online_interval (float): Seconds between probes while online
+            offline_interval (float): Seconds between probes while offline, so recovery is noticed quickly
+            android_interval (float): Seconds between ConnectivityManager checks
+            fallback_interval (float): Seconds between probes on Android when
+                ConnectivityManager cannot be queried
+        """
+        self.probe_host = probe_host or os.getenv('CONNECTIVITY_PROBE_HOST', '8.8.8.8')
+        self.probe_port = probe_port
+        self.probe_timeout = probe_timeout
+        self.online_interval = online_interval
+        self.offline_interval = offline_interval
+        self.android_interval = android_interval
+        self.fallback_interval = fallback_interval
+        self.checked_at = None
+        self._online = True  # Assume online until a check says otherwise
+        self._confirmed = False  # Offline verdict came from the OS, not the probe alone
+        self._android_available = True
+        self._listeners = []
+        self._thread = None
+        self._running = False
+        self._wake = Event()
+        self._lock = Lock()
+
+    def is_online(self):
+        """Last known reachability, never blocks"""
+        self.start()
+        return self._online
+
+    def is_confirmed_offline(self):
+        """Offline as reported by the OS, a failed probe alone does not count"""
+        self.start()
+        return not self._online and self._confirmed
+
+    def start(self):
+        """Start the monitor thread if it is not running"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = Thread(target=self._run, name='connectivity-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the monitor thread"""
+        with self._lock:
+            self._running = False
+        self._wake.set()
+
+    def add_listener(self, callback):
+        """Call callback(online) from the monitor thread whenever reachability changes"""
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+        self.start()
+
+    def remove_listener(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    def report_failure(self):
+        """A sender hit a network error, recheck now rather than at the next interval"""
+        self._wake.set()
+
+    def report_success(self):
+        """A sender reached the network, so it is up"""
+        self._set_online(True)
+
+    def check_now(self):
+        """Check reachability synchronously and update the state"""
+        online, confirmed = self._check()
+        self._set_online(online, confirmed)
+        return online
+
+    def _check(self):
+        """Returns (online, confirmed), confirmed when the OS answered rather than the probe"""
+        if platform == 'android' and self._android_available:
+            online = self._check_android()
+            if online is not None:
+                return online, True
+            # Don't retry and log every couple of seconds, fall back to the probe for good
+            self._android_available = False
+        return self._probe(), False
+
+    def _check_android(self):
+        """Ask ConnectivityManager for a validated network, None if it cannot be queried"""
+        try:
+            from jnius import autoclass, cast
+            PythonActivity = autoclass('org.kivy.android.PythonActivity')
+            Context = autoclass('android.content.Context')
+            NetworkCapabilities = autoclass('android.net.NetworkCapabilities')
+            manager = cast(
+                'android.net.ConnectivityManager',
+                PythonActivity.mActivity.getSystemService(Context.CONNECTIVITY_SERVICE)
+            )
+            network = manager.getActiveNetwork()
+            if network is None:
+                return False
+            capabilities = manager.getNetworkCapabilities(network)
+            return capabilities is not None and capabilities.hasCapability(
+                NetworkCapabilities.NET_CAPABILITY_VALIDATED
+            )
+        except Exception as e:
+            print(f"Error checking Android connectivity: {str(e)}")
+            return None
+
+    def _probe(self):
+        """Open and close a TCP connection to the probe host"""
+        try:
+            with socket.create_connection((self.probe_host, self.probe_port), timeout=self.probe_timeout):
+                return True
+        except OSError:
+            return False
+
+    def _set_online(self, online, confirmed=True):
+        with self._lock:
+            self.checked_at = time.time()
+            changed = online != self._online
+            self._online = online
+            self._confirmed = confirmed
+            listeners = list(self._listeners)
+        if not changed:
+            return
+        print(f"Network {'reachable' if online else 'unreachable'}")
+        for callback in listeners:
+            try:
+                callback(online)
+            except Exception as e:
+                print(f"Error in connectivity listener: {str(e)}")
+
+    def _run(self):
+        while self._running:
+            self.check_now()
+            if platform == 'android':
+                interval = self.android_interval if self._android_available else self.fallback_interval
+            else:
+                interval = self.online_interval if self._online else self.offline_interval
+            self._wake.wait(interval)
+            self._wake.clear()
+
+# Singleton instance
+connectivity_monitor = ConnectivityMonitor()
@@ -763,6 +763,7 @@ class DatabaseService:
             
             # Check if phone number is changing
             old_phone = user.phone_number
+            old_full_name = user.full_name
             new_phone = profile_data.get('phone_number')
             phone_changed = new_phone and new_phone != old_phone
             
@@ -787,6 +788,13 @@ class DatabaseService:
             # Commit changes
             self.session().commit()
             
+            # Alert bodies and armed alerts embed the name and phone, rebuild them only if those changed
+            if user.full_name != old_full_name or user.phone_number != old_phone:
+                from utils.alert_templates import alert_templates
+                from utils.emergency_contact_service import EmergencyContactService
+                alert_templates.invalidate_user(user.id)
+                EmergencyContactService.disarm(user.id)
+            
             # Verify the changes were saved
             updated_user = self.session().query(User).filter(User.id == user.id).first()
             print(f"\nVerifying updated user data:")
@@ -920,6 +928,27 @@ class DatabaseService:
                     connection.execute(text("ALTER TABLE users ADD COLUMN last_phone_change TIMESTAMP"))
                     connection.commit()
             
+            # Alert channel columns on emergency contacts
+            if inspector.has_table('emergency_contacts'):
+                contact_columns = [col['name'] for col in inspector.get_columns('emergency_contacts')]
+                from sqlalchemy import text
+                for column in ('email', 'webhook_url'):
+                    if column not in contact_columns:
+                        print(f"[INFO] Adding {column} column to emergency_contacts table")
+                        with self.engine.connect() as connection:
+                            connection.execute(text(f"ALTER TABLE emergency_contacts ADD COLUMN {column} VARCHAR"))
+                            connection.commit()
+            
+            # Channels still owed on queued alert deliveries
+            if inspector.has_table('alert_deliveries'):
+                delivery_columns = [col['name'] for col in inspector.get_columns('alert_deliveries')]
+                if 'pending_channels' not in delivery_columns:
+                    from sqlalchemy import text
+                    print("[INFO] Adding pending_channels column to alert_deliveries table")
+                    with self.engine.connect() as connection:
+                        connection.execute(text("ALTER TABLE alert_deliveries ADD COLUMN pending_channels VARCHAR"))
+                        connection.commit()
+            
             print("[INFO] Database tables and columns are up to date")
             return True
             
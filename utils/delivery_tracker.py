@@ -0,0 +1,291 @@
+import json
+import traceback
+from datetime import datetime, timedelta
+from threading import Lock
+from models.database_models import Alert, AlertDelivery
+
+# Allowed status changes, anything else is ignored as stale or out of order
+STATUS_TRANSITIONS = {
+    AlertDelivery.QUEUED: {AlertDelivery.SENT, AlertDelivery.GATEWAY_ACKED, AlertDelivery.DELIVERED, AlertDelivery.FAILED},
+    AlertDelivery.SENT: {AlertDelivery.QUEUED, AlertDelivery.GATEWAY_ACKED, AlertDelivery.DELIVERED, AlertDelivery.FAILED},
+    AlertDelivery.GATEWAY_ACKED: {AlertDelivery.DELIVERED, AlertDelivery.FAILED},
+    AlertDelivery.FAILED: {AlertDelivery.QUEUED, AlertDelivery.SENT, AlertDelivery.GATEWAY_ACKED, AlertDelivery.DELIVERED},
+    AlertDelivery.DELIVERED: set(),
+}
+
+UNDELIVERED_STATUSES = (
+    AlertDelivery.QUEUED,
+    AlertDelivery.SENT,
+    AlertDelivery.GATEWAY_ACKED,
+    AlertDelivery.FAILED,
+)
+
+class DeliveryTracker:
+    """
+    Records alerts and per-contact delivery status.
+    Uses its own sessions so callers' sessions stay read-only.
+    """
+
+    def __init__(self, session_factory=None):
+        """
+        Args:
+            session_factory: Callable returning a new session, defaults to the
+                             DatabaseService session factory
+        """
+        self.session_factory = session_factory
+        self._claim_lock = Lock()
+
+    def _new_session(self):
+        if self.session_factory is None:
+            from utils.database_service import DatabaseService
+            self.session_factory = DatabaseService().Session
+        return self.session_factory()
+
+    @staticmethod
+    def can_transition(current, new):
+        """Check if a delivery may move from one status to another"""
+        return new in STATUS_TRANSITIONS.get(current, set())
+
+    def record_alert(self, user_id, message_type, message, deliveries):
+        """
+        Store an alert and the outcome for each contact in one transaction.
+
+        Args:
+            user_id: User ID
+            message_type (str): Alert type
+            message (str): Body that was sent
+            deliveries (list): Dicts with phone_number, contact_name, and
+                               delivery status, gateway, provider_id, message,
+                               and optionally pending_channels (channel -> address)
+
+        Returns:
+            int: Alert ID, or None if it could not be recorded
+        """
+        session = self._new_session()
+        try:
+            alert = Alert(user_id=user_id, message_type=message_type, message=message)
+            recorded = set()
+            for delivery in deliveries:
+                # One row per number, a duplicate would fail the whole alert on the unique constraint
+                if delivery['phone_number'] in recorded:
+                    continue
+                recorded.add(delivery['phone_number'])
+                status = delivery['status']
+                alert.deliveries.append(AlertDelivery(
+                    contact_name=delivery.get('contact_name'),
+                    phone_number=delivery['phone_number'],
+                    status=status,
+                    gateway=delivery.get('gateway'),
+                    provider_message_id=delivery.get('provider_id'),
+                    error=delivery.get('message') if status == AlertDelivery.FAILED else None,
+                    pending_channels=json.dumps(delivery['pending_channels'])
+                    if delivery.get('pending_channels') else None
+                ))
+            session.add(alert)
+            session.commit()
+            return alert.id
+        except Exception as e:
+            print(f"Error recording alert: {str(e)}")
+            traceback.print_exc()
+            session.rollback()
+            return None
+        finally:
+            session.close()
+
+    def update_status(self, alert_id, phone_number, status, error=None):
+        """
+        Move one delivery to a new status.
+
+        Returns:
+            bool: True if the transition was applied
+        """
+        return self.ingest_reports([{
+            'alert_id': alert_id,
+            'phone_number': phone_number,
+            'status': status,
+            'error': error
+        }])['updated'] == 1
+
+    def ingest_reports(self, reports):
+        """
+        Apply delivery reports in bulk.
+
+        Each report identifies its delivery by provider_message_id, or by
+        alert_id and phone_number, and carries a status and optional error.
+        Resends of queued deliveries may also carry the gateway and provider_id
+        that finally accepted them, and the pending_channels still owed. All
+        matching rows are loaded with two queries and committed once.
+
+        Returns:
+            dict: Counts of updated, ignored (invalid transition) and unknown reports
+        """
+        counts = {'updated': 0, 'ignored': 0, 'unknown': 0}
+        if not reports:
+            return counts
+
+        provider_ids = [report['provider_message_id'] for report in reports if report.get('provider_message_id')]
+        alert_ids = [report['alert_id'] for report in reports if report.get('alert_id') is not None]
+
+        session = self._new_session()
+        try:
+            by_provider_id = {}
+            if provider_ids:
+                for delivery in session.query(AlertDelivery).filter(
+                    AlertDelivery.provider_message_id.in_(provider_ids)
+                ):
+                    by_provider_id[delivery.provider_message_id] = delivery
+
+            by_alert_phone = {}
+            if alert_ids:
+                for delivery in session.query(AlertDelivery).filter(
+                    AlertDelivery.alert_id.in_(alert_ids)
+                ):
+                    by_alert_phone[(delivery.alert_id, delivery.phone_number)] = delivery
+
+            for report in reports:
+                if report.get('provider_message_id'):
+                    delivery = by_provider_id.get(report['provider_message_id'])
+                else:
+                    delivery = by_alert_phone.get((report.get('alert_id'), report.get('phone_number')))
+
+                if delivery is None:
+                    counts['unknown'] += 1
+                elif self.can_transition(delivery.status, report['status']):
+                    delivery.status = report['status']
+                    if report.get('error'):
+                        delivery.error = report['error']
+                    if report.get('gateway'):
+                        delivery.gateway = report['gateway']
+                    if report.get('provider_id'):
+                        delivery.provider_message_id = report['provider_id']
+                    if 'pending_channels' in report:
+                        delivery.pending_channels = json.dumps(report['pending_channels']) \
+                            if report['pending_channels'] else None
+                    counts['updated'] += 1
+                else:
+                    counts['ignored'] += 1
+
+            session.commit()
+        except Exception as e:
+            print(f"Error ingesting delivery reports: {str(e)}")
+            traceback.print_exc()
+            session.rollback()
+        finally:
+            session.close()
+        return counts
+
+    def poll_reports(self, router, minutes=60):
+        """
+        Ask providers for the status of recent undelivered messages and ingest the answers.
+
+        Args:
+            router: GatewayRouter holding the gateways that sent the messages
+            minutes (int): How far back to look
+
+        Returns:
+            dict: Counts from ingest_reports
+        """
+        pending = {}
+        for delivery in self.undelivered(minutes, statuses=(AlertDelivery.SENT, AlertDelivery.GATEWAY_ACKED)):
+            if delivery['gateway'] and delivery['provider_message_id']:
+                pending.setdefault(delivery['gateway'], []).append(delivery['provider_message_id'])
+
+        reports = []
+        for gateway_name, provider_ids in pending.items():
+            gateway = router.get_gateway(gateway_name)
+            if gateway:
+                reports.extend(gateway.fetch_delivery_reports(provider_ids))
+        return self.ingest_reports(reports)
+
+    def undelivered(self, minutes=15, user_id=None, statuses=UNDELIVERED_STATUSES, limit=500):
+        """
+        Get deliveries created in the last N minutes that have not been delivered.
+
+        Args:
+            minutes (int): Look-back window
+            user_id: Only this user's alerts if given
+            statuses (tuple): Statuses to include
+            limit (int): Maximum rows
+
+        Returns:
+            list: Delivery dicts, oldest first
+        """
+        cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+        session = self._new_session()
+        try:
+            query = session.query(AlertDelivery).filter(
+                AlertDelivery.status.in_(statuses),
+                AlertDelivery.created_at >= cutoff
+            )
+            if user_id is not None:
+                query = query.join(Alert).filter(Alert.user_id == user_id)
+            deliveries = query.order_by(AlertDelivery.created_at).limit(limit).all()
+            return [delivery.to_dict() for delivery in deliveries]
+        except Exception as e:
+            print(f"Error querying undelivered alerts: {str(e)}")
+            return []
+        finally:
+            session.close()
+
+    def queued_deliveries(self, minutes=30, limit=500):
+        """
+        Get deliveries still waiting to be sent, with the alert they belong to.
+
+        Args:
+            minutes (int): Look-back window, older queued alerts are not worth sending
+            limit (int): Maximum rows
+
+        Returns:
+            list: Delivery dicts with the alert message and message_type, oldest first
+        """
+        return self._queued(minutes, limit, claim=False)
+
+    def claim_queued(self, minutes=30, limit=500):
+        """
+        Take queued deliveries for resending, so no other caller resends them too.
+
+        Each row moves from QUEUED to SENT with a conditional update, and only
+        the rows this call moved are returned. The resend then reports the real
+        outcome, or QUEUED again if there is still no gateway.
+
+        Returns:
+            list: Delivery dicts like queued_deliveries, now SENT
+        """
+        with self._claim_lock:
+            return self._queued(minutes, limit, claim=True)
+
+    def _queued(self, minutes, limit, claim):
+        cutoff = datetime.utcnow() - timedelta(minutes=minutes)
+        session = self._new_session()
+        try:
+            rows = session.query(AlertDelivery, Alert).join(Alert).filter(
+                AlertDelivery.status == AlertDelivery.QUEUED,
+                AlertDelivery.created_at >= cutoff
+            ).order_by(AlertDelivery.created_at).limit(limit).all()
+            queued = []
+            for delivery, alert in rows:
+                if claim:
+                    # Rows another process claimed since the query are skipped
+                    claimed = session.query(AlertDelivery).filter(
+                        AlertDelivery.id == delivery.id,
+                        AlertDelivery.status == AlertDelivery.QUEUED
+                    ).update({'status': AlertDelivery.SENT}, synchronize_session=False)
+                    if not claimed:
+                        continue
+                entry = delivery.to_dict()
+                entry['status'] = AlertDelivery.SENT if claim else entry['status']
+                entry['message'] = alert.message
+                entry['message_type'] = alert.message_type
+                queued.append(entry)
+            if claim:
+                session.commit()
+            return queued
+        except Exception as e:
+            print(f"Error querying queued alerts: {str(e)}")
+            session.rollback()
+            return []
+        finally:
+            session.close()
+
+# Singleton instance
+delivery_tracker = DeliveryTracker()
@@ -0,0 +1,154 @@
+import json
+import os
+import time
+from threading import Lock
+from utils.shared import app_data_dir, shared_instance
+
+class DeviceRegistry:
+    """
+    Remembers the wearables this phone has connected to.
+
+    Each device is kept by Bluetooth address with its name, when it was first
+    and last connected, and its connect and failure counts. The preferred
+    device (the one last connected, or the one the user picked) is connected
+    by address without scanning. When several wearables are bonded, a scan
+    prefers the preferred device, then the most recently used one, so the
+    phone keeps talking to the same wearable instead of whichever is listed
+    first. The registry is a small JSON file written atomically on change.
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): JSON file to persist to, None keeps the registry in memory only
+        """
+        self.path = path
+        self._devices = {}  # address -> metadata dict
+        self._preferred = None
+        self._lock = Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self._devices = {device['address']: device for device in data.get('devices', [])}
+            self._preferred = data.get('preferred')
+            if self._preferred not in self._devices:
+                self._preferred = None
+        except Exception as e:
+            print(f"Error loading Bluetooth device registry: {e}")
+
+    def _save(self):
+        """Write the registry, caller holds the lock"""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump({'preferred': self._preferred, 'devices': list(self._devices.values())}, f)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            print(f"Error saving Bluetooth device registry: {e}")
+
+    def preferred(self):
+        """Get the device to connect to directly, or None"""
+        with self._lock:
+            device = self._devices.get(self._preferred)
+            return dict(device) if device else None
+
+    def devices(self):
+        """Get every remembered device, most recently connected first"""
+        with self._lock:
+            devices = [dict(device) for device in self._devices.values()]
+        return sorted(devices, key=lambda device: device['last_seen'] or 0, reverse=True)
+
+    def remember(self, address, name=None, now=None):
+        """
+        Record a successful connect, making the device the preferred one.
+
+        Args:
+            address (str): Bluetooth address
+            name (str): Device name
+            now (float): Current time, for tests
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            device = self._devices.get(address)
+            if device is None:
+                device = self._devices[address] = {
+                    'address': address, 'name': name, 'first_seen': now, 'last_seen': now,
+                    'connects': 0, 'failures': 0
+                }
+            device['name'] = name or device['name']
+            device['last_seen'] = now
+            device['connects'] += 1
+            self._preferred = address
+            self._save()
+
+    def record_failure(self, address):
+        """Count a failed connect to a device"""
+        with self._lock:
+            device = self._devices.get(address)
+            if device is not None:
+                device['failures'] += 1
+                self._save()
+
+    def select(self, address):
+        """Make a remembered device the one to connect to, returns False if it is unknown"""
+        with self._lock:
+            if address not in self._devices:
+                return False
+            self._preferred = address
+            self._save()
+            return True
+
+    def forget(self, address):
+        """Remove a device, e.g. when the user unpairs it"""
+        with self._lock:
+            if self._devices.pop(address, None) is None:
+                return
+            if self._preferred == address:
+                self._preferred = None
+            self._save()
+
+    def choose(self, candidates, name_filter=None):
+        """
+        Pick the device to connect to from a scan.
+
+        Args:
+            candidates (iterable): Devices with getAddress() and getName()
+            name_filter (str): Only consider devices whose name contains this
+
+        Returns:
+            The preferred device if present, else the most recently used
+            remembered one, else the first match, or None
+        """
+        matches = [device for device in candidates
+                   if not name_filter or name_filter in (device.getName() or '')]
+        if not matches:
+            return None
+        with self._lock:
+            preferred = self._preferred
+            last_seen = {address: device['last_seen'] or 0 for address, device in self._devices.items()}
+        for device in matches:
+            if device.getAddress() == preferred:
+                return device
+        known = [device for device in matches if device.getAddress() in last_seen]
+        if known:
+            return max(known, key=lambda device: last_seen[device.getAddress()])
+        if len(matches) > 1:
+            print(f"{len(matches)} wearables found, using {matches[0].getName()} ({matches[0].getAddress()})")
+        return matches[0]
+
+def default_registry_path():
+    """Device registry in the app's private storage"""
+    return os.path.join(app_data_dir(), 'bluetooth_devices.json')
+
+@shared_instance
+def get_device_registry():
+    """Get the device registry shared by every screen"""
+    return DeviceRegistry(default_registry_path())
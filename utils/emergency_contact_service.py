@@ -1,17 +1,48 @@
 from utils.contact_service import ContactService
 from utils.veevotech_service import VeevotechService
-from models.database_models import EmergencyContact, User
+from utils.sms_gateways import get_sms_router
+from utils.message_scheduler import get_message_scheduler, priority_for
+from utils.delivery_tracker import delivery_tracker
+from utils.alert_templates import alert_templates
+from utils.connectivity_monitor import connectivity_monitor
+from utils.sms_encoding import sms_encoder
+from utils.location_codes import plus_code_link
+from utils.location_trail import get_location_trail
+from utils.reverse_geocoder import get_reverse_geocoder
+from utils.alert_history import get_alert_history, SOURCE_UI
+from utils.alert_channels import get_channel_dispatcher
+from utils.phone_util import normalize_phone_number
+from models.database_models import EmergencyContact, User, AlertDelivery
 from sqlalchemy.orm import Session
-import requests
 from kivy.utils import platform
 if platform == 'android':
     from plyer import gps
+from threading import Lock, Thread
 import time
 
 class EmergencyContactService:
+    # Armed state per user, shared by every instance so any screen can invalidate it
+    _armed_states = {}
+    _armed_lock = Lock()
+    # Most recent GPS fix as (lat, lon, timestamp), kept fresh while armed
+    _last_fix = None
+    _location_updates_active = False
+    _drain_on_reconnect = False  # Connectivity listener registered
+    location_max_age = 120  # Seconds a cached fix is considered usable
+    location_format = 'link'  # 'link' for a maps URL, 'plus_code' for a shorter Plus Code link
+    trail_minutes = 10  # Movement summarized in alerts, 0 to leave it out
+    include_place = True  # Name the nearest town from the bundled offline index
+    message_types = ("emergency", "warning", "check", "accidental")
+
     def __init__(self):
         self.contact_service = ContactService()
         self.veevotech_service = VeevotechService()
+        self.sms_router = get_sms_router()
+        self.scheduler = get_message_scheduler()
+        self.channels = get_channel_dispatcher()  # SMS, email and webhook fan-out
+        self.delivery_tracker = delivery_tracker
+        self.sms_encoder = sms_encoder  # Compacts bodies to fit one SMS segment
+        self.locale = None  # Alert template locale, None uses the registry default
     
     def request_permissions(self, callback=None):
         """Request necessary permissions for contact access"""
@@ -20,103 +51,478 @@ class EmergencyContactService:
     def get_phone_contacts(self):
         """Get all contacts from phone book"""
         return self.contact_service.get_all_contacts()
+
+    def arm(self, session: Session, user_id):
+        """Prepare everything an alert needs so a button press only does network sends
         
-    def send_custom_message(self, session: Session, user_id: int, custom_message: str):
-        """Send a custom message to all emergency contacts
+        Preloads the user and their emergency contacts, renders every alert
+        message type into the template cache, warms the gateway connection and starts location updates.
         
         Args:
             session: Database session
             user_id: User ID
-            custom_message: Custom message to send
+            
+        Returns:
+            bool: True if the user is armed
         """
         if not session or not user_id:
+            return False
+
+        try:
+            user, contacts = self._fetch_recipients(session, user_id)
+            if not user:
+                print(f"Cannot arm alerts, user not found: {user_id}")
+                return False
+
+            # Plain values so the armed state does not depend on the session
+            state = {
+                'user': user,
+                'contacts': contacts,
+                'armed_at': time.time()
+            }
+
+            for message_type in self.message_types:
+                self._render_template(message_type)(user)
+
+            with self._armed_lock:
+                EmergencyContactService._armed_states[str(user_id)] = state
+        except Exception as e:
+            print(f"Error arming emergency alerts: {str(e)}")
+            return False
+
+        self.sms_router.warm_up()
+        self._start_location_updates()
+        self._watch_connectivity()
+        print(f"Emergency alerts armed for user {user_id} with {len(state['contacts'])} contacts")
+        return True
+
+    @classmethod
+    def disarm(cls, user_id=None):
+        """Drop the armed state after profile or contact changes
+        
+        Args:
+            user_id: User to disarm, or None to disarm everyone
+        """
+        with cls._armed_lock:
+            if user_id is None:
+                cls._armed_states.clear()
+            else:
+                cls._armed_states.pop(str(user_id), None)
+
+    @classmethod
+    def get_armed_state(cls, user_id):
+        """Get the armed state for a user, or None if not armed"""
+        with cls._armed_lock:
+            return cls._armed_states.get(str(user_id))
+
+    @staticmethod
+    def _contact_snapshot(contact):
+        """Plain copy of the contact fields alert channels need"""
+        return {
+            'name': contact.name,
+            'phone_number': contact.phone_number,
+            'email': contact.email,
+            'webhook_url': contact.webhook_url
+        }
+
+    def _fetch_recipients(self, session: Session, user_id):
+        """Read the user and contact snapshots from the database
+        
+        Only the columns alerts need are selected, so nothing is added to the
+        session's identity map and there is nothing for the caller to commit.
+        
+        Returns:
+            tuple: (user dict, list of contact dicts), user is None if not found
+        """
+        user = session.query(User.id, User.full_name, User.phone_number).filter(
+            User.id == user_id
+        ).first()
+        if not user:
+            return None, []
+
+        emergency_contacts = session.query(
+            EmergencyContact.name,
+            EmergencyContact.phone_number,
+            EmergencyContact.email,
+            EmergencyContact.webhook_url
+        ).filter(EmergencyContact.user_id == user_id).all()
+
+        user_data = {
+            'id': user.id,
+            'full_name': user.full_name,
+            'phone_number': user.phone_number
+        }
+        contacts = self._unique_recipients(
+            self._contact_snapshot(contact) for contact in emergency_contacts
+        )
+        return user_data, contacts
+
+    @staticmethod
+    def _unique_recipients(contacts):
+        """One recipient per phone number, so a number saved twice gets one SMS and one delivery row
+        
+        Contacts sharing a number are merged under both names. An email or
+        webhook the merged contact already has a different one of is kept as
+        an extra recipient without a phone number, so no channel is lost.
+        
+        Returns:
+            list: Contact dicts
+        """
+        recipients, extras, by_number = [], [], {}
+        for contact in contacts:
+            number = normalize_phone_number(contact.get('phone_number'))
+            first = by_number.get(number) if number else None
+            if first is None:
+                recipients.append(contact)
+                if number:
+                    by_number[number] = contact
+                continue
+
+            first['name'] = f"{first['name']}, {contact['name']}"
+            extra = {}
+            for field in ('email', 'webhook_url'):
+                value = contact.get(field)
+                if not value or value == first.get(field):
+                    continue
+                if first.get(field):
+                    extra[field] = value
+                else:
+                    first[field] = value
+            if extra:
+                extras.append(dict(extra, name=contact['name'], phone_number=None))
+        return recipients + extras
+
+    def _load_recipients(self, session: Session, user_id):
+        """Get the user and contact snapshots, from the armed state when available
+        
+        Returns:
+            tuple: (user dict, list of contact dicts), user is None if not found
+        """
+        state = self.get_armed_state(user_id)
+        if state:
+            return state['user'], state['contacts']
+        if not session:
+            return None, []
+        return self._fetch_recipients(session, user_id)
+
+    def _render_template(self, message_type):
+        """Body renderer for a template message type, rendered bodies are cached per user"""
+        def render(user):
+            return alert_templates.render(
+                user['id'], message_type, user['full_name'], user['phone_number'], self.locale
+            )
+        return render
+
+    def dispatch_alert(self, session: Session, user_id, message_type, render_body=None, sender=None,
+                       source=SOURCE_UI, sequence=None):
+        """Send an alert to all emergency contacts, the core every send path shares
+        
+        Contacts are read once (from the armed state when available), the
+        location is acquired once and the body is rendered once for everyone.
+        The session is only read from, the caller keeps ownership of it.
+        
+        Args:
+            session: Database session, may be None when the user is armed
+            user_id: User ID
+            message_type: Type of message (emergency, warning, check, accidental, custom)
+            render_body: Callable taking the user dict and returning the body without
+                the location, defaults to the cached template for message_type
+            sender: Callable taking (contacts, message, message_type) and returning
+                per-contact result dicts, defaults to the channel dispatcher
+            source: What triggered the alert, for the alert history
+            sequence: Wearable press sequence number, if any
+            
+        Returns:
+            dict: status, message, per-contact details and the alert ID
+        """
+        if not user_id:
             return {'status': 'error', 'message': 'Invalid session or user ID'}
 
         try:
-            # Get user and their emergency contacts
-            user = session.query(User).filter(User.id == user_id).first()
+            user, emergency_contacts = self._load_recipients(session, user_id)
             if not user:
                 return {'status': 'error', 'message': 'User not found'}
             
-            emergency_contacts = session.query(EmergencyContact).filter(
-                EmergencyContact.user_id == user_id
-            ).all()
-            
             if not emergency_contacts:
                 return {'status': 'error', 'message': 'No emergency contacts found'}
             
             # Get location information if available
-            location_str = self._get_location()
+            fix, age = self._locate()
+            location_str = self._format_location(*fix, age=age) if fix else ""
             
-            # Add location to message if available
-            message = custom_message + location_str
+            render_body = render_body or self._render_template(message_type)
             
-            results = []
-            success_count = 0
-            for contact in emergency_contacts:
-                # Send message through Veevotech
-                url = f"{self.veevotech_service.base_url}/sendsms"
-                params = {
-                    "hash": self.veevotech_service.api_hash,
-                    "receivernum": contact.phone_number,
-                    "sendernum": "Default",
-                    "textmessage": message
-                }
-                
-                try:
-                    # Make API request with timeout
-                    response = requests.get(url, params=params, timeout=10)
-                    response.raise_for_status()
-                    
-                    # Parse response
-                    api_response = response.json() if response.text else {}
-                    is_success = response.status_code == 200 and api_response.get('status') != 'error'
-                    
-                    if is_success:
-                        success_count += 1
-                    
-                    result = {
-                        'status': 'success' if is_success else 'error',
-                        'message': api_response.get('message', 'Message sent' if is_success else 'Failed to send message')
-                    }
-                except requests.exceptions.Timeout:
-                    result = {'status': 'error', 'message': 'Request timed out'}
-                except requests.exceptions.RequestException as e:
-                    result = {'status': 'error', 'message': f'API request failed: {str(e)}'}
-                except ValueError as e:
-                    result = {'status': 'error', 'message': f'Invalid API response: {str(e)}'}
-                except Exception as e:
-                    result = {'status': 'error', 'message': f'Unexpected error: {str(e)}'}
-                
-                results.append({
-                    'contact_name': contact.name,
-                    'phone_number': contact.phone_number,
-                    'status': result['status'],
-                    'message': result.get('message', '')
-                })
+            # Add location to message if available, compacted to fit a single segment
+            message = self.sms_encoder.fit(render_body(user) + location_str)
             
-            overall_status = 'success' if success_count == len(emergency_contacts) else \
-                           'partial' if success_count > 0 else 'error'
+            # Every channel of every contact is sent at once, each within its own budget
+            pending_sms = []  # (phone_number, future) of SMS still sending at their timeout
+            if sender:
+                results = sender(emergency_contacts, message, message_type)
+            else:
+                results = self.channels.dispatch(emergency_contacts, message, message_type,
+                                                 pending_sms=pending_sms)
+            # Extra email/webhook recipients of a merged contact only count when a channel took them
+            counted = [result for result in results if result.get('phone_number') or result.get('channels')]
+            success_count = sum(1 for result in counted if result['status'] == 'success')
+            # SMS still sending in the scheduler are on their way, not failed
+            pending_count = sum(1 for result in counted if result['status'] == 'pending')
+            
+            overall_status = 'success' if success_count == len(counted) else \
+                           'partial' if success_count + pending_count > 0 else 'error'
+            
+            # Keep a record of who was reached so undelivered alerts can be retried
+            alert_id = self._record_alert(user['id'], message_type, message, results,
+                                          source=source, sequence=sequence, fix=fix,
+                                          status=overall_status)
+            self._track_pending_sms(user['id'], alert_id, pending_sms)
             
             return {
                 'status': overall_status,
-                'message': f'Custom messages sent to {success_count} out of {len(emergency_contacts)} contacts',
-                'details': results
+                'message': f'Messages sent to {success_count} out of {len(counted)} contacts' +
+                           (f', {pending_count} still sending' if pending_count else ''),
+                'details': results,
+                'alert_id': alert_id
             }
             
         except Exception as e:
             return {'status': 'error', 'message': f'System error: {str(e)}'}
-        finally:
-            try:
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
+        
+    def send_custom_message(self, session: Session, user_id: int, custom_message: str, source=SOURCE_UI):
+        """Send a custom message to all emergency contacts
+        
+        Args:
+            session: Database session
+            user_id: User ID
+            custom_message: Custom message to send
+            source: What triggered the message, for the alert history
+        """
+        return self.dispatch_alert(session, user_id, 'custom',
+                                   render_body=lambda user: custom_message, source=source)
+
     
-    def _get_location(self):
-        """Get current location if available"""
-        location_str = ""
-        if platform == 'android':
+    def _record_alert(self, user_id, message_type, message, results, source=SOURCE_UI,
+                      sequence=None, fix=None, status=None):
+        """Store the alert with each contact's delivery status and add it to the history
+        
+        Returns:
+            int: Alert ID from the delivery tracker
+        """
+        deliveries = []
+        for result in results:
+            if not result.get('phone_number'):
+                continue  # Email or webhook only recipient, recorded in the history
+            delivery = dict(result)
+            # Delivery tracking follows the SMS, other channels are recorded in the history
+            delivery['status'] = self._delivery_status(result.get('channels', {}).get('sms', result))
+            if delivery['status'] == AlertDelivery.QUEUED:
+                # Other channels that failed go out again with the queued SMS
+                delivery['pending_channels'] = {
+                    name: address for name, address in result.get('failed_channels', {}).items()
+                    if name != 'sms' and address
+                }
+            deliveries.append(delivery)
+        alert_id = self.delivery_tracker.record_alert(user_id, message_type, message, deliveries)
+
+        try:
+            lat, lon = fix if fix else (None, None)
+            get_alert_history().append(
+                user_id, message_type, source,
+                message=message,
+                results=results,
+                alert_id=alert_id,
+                sequence=sequence,
+                lat=lat,
+                lon=lon,
+                place=self._describe_place(lat, lon) if fix else None,
+                status=status
+            )
+        except Exception as e:
+            print(f"Error recording alert history: {str(e)}")
+        return alert_id
+
+    def _track_pending_sms(self, user_id, alert_id, pending_sms):
+        """Update SENT deliveries when the scheduler finishes the SMS that were still sending"""
+        if alert_id is None:
+            return
+        for phone_number, future in pending_sms:
+            if not phone_number:
+                continue
+
+            def on_done(future, phone_number=phone_number):
+                try:
+                    sms = future.result()
+                except Exception as e:
+                    sms = {'status': 'error', 'message': f'Unexpected error: {str(e)}'}
+                status = self._delivery_status(sms)
+                self.delivery_tracker.ingest_reports([{
+                    'alert_id': alert_id,
+                    'phone_number': phone_number,
+                    'status': status,
+                    'error': sms.get('message') if status == AlertDelivery.FAILED else None,
+                    'gateway': sms.get('gateway'),
+                    'provider_id': sms.get('provider_id')
+                }])
+                # The history logged this contact as still sending
+                get_alert_history().update_outcome(
+                    user_id, alert_id, phone_number, 'success' if sms['status'] == 'success' else 'error'
+                )
+
+            future.add_done_callback(on_done)
+
+    @staticmethod
+    def _delivery_status(result):
+        """Map a send result to a delivery status
+        
+        Sends no gateway would take are queued for retry, and an SMS still
+        being sent when the alert is recorded is SENT until its result arrives.
+        """
+        if result['status'] == 'success':
+            return AlertDelivery.GATEWAY_ACKED
+        if result.get('pending'):
+            return AlertDelivery.SENT
+        if result.get('circuit_open') or result.get('offline'):
+            return AlertDelivery.QUEUED
+        return AlertDelivery.FAILED
+
+    def retry_queued(self, minutes=30):
+        """Resend deliveries that were queued because no gateway was reachable
+        
+        Called both when home is entered and when the network returns, so the
+        deliveries are claimed first and each one is only resent by one caller.
+        Email and webhook channels that failed with the queued SMS go out again
+        with it.
+        
+        Args:
+            minutes (int): Only retry alerts queued within this window
+            
+        Returns:
+            dict: Counts from the delivery tracker, plus how many were resent
+        """
+        queued = self.delivery_tracker.claim_queued(minutes)
+        if not queued:
+            return {'resent': 0, 'updated': 0, 'ignored': 0, 'unknown': 0}
+
+        jobs = []
+        for delivery in queued:
+            sms = self.scheduler.submit(delivery['phone_number'], delivery['message'],
+                                        priority_for(delivery['message_type']))
+            others = {
+                name: self.channels.submit(name, address, delivery['message'], delivery['message_type'])
+                for name, address in delivery['pending_channels'].items()
+            }
+            jobs.append((delivery, sms, others))
+
+        reports = []
+        for delivery, sms, others in jobs:
+            result = sms.result()
+            status = self._delivery_status(result)
+            still_pending = {}
+            for name, future in others.items():
+                try:
+                    sent = future is not None and future.result()['status'] == 'success'
+                except Exception as e:
+                    print(f"Error resending {name} alert: {str(e)}")
+                    sent = False
+                if not sent:
+                    still_pending[name] = delivery['pending_channels'][name]
+            reports.append({
+                'alert_id': delivery['alert_id'],
+                'phone_number': delivery['phone_number'],
+                # Still no gateway puts it back in the queue for the next retry
+                'status': status,
+                'error': result.get('message') if status == AlertDelivery.FAILED else None,
+                'gateway': result.get('gateway'),
+                'provider_id': result.get('provider_id'),
+                'pending_channels': still_pending
+            })
+        counts = self.delivery_tracker.ingest_reports(reports)
+        counts['resent'] = sum(1 for report in reports if report['status'] != AlertDelivery.QUEUED)
+        print(f"Retried {len(queued)} queued alert deliveries, {counts['resent']} left the queue")
+        return counts
+
+    def _watch_connectivity(self):
+        """Drain queued alerts whenever the network comes back"""
+        if EmergencyContactService._drain_on_reconnect:
+            return
+        EmergencyContactService._drain_on_reconnect = True
+        connectivity_monitor.add_listener(self._on_connectivity_change)
+
+    def _on_connectivity_change(self, online):
+        if online:
+            Thread(target=self.retry_queued, daemon=True).start()
+
+    @classmethod
+    def _on_location(cls, **kwargs):
+        """Keep the latest GPS fix for alerts and add it to the location trail"""
+        lat, lon = kwargs.get('lat'), kwargs.get('lon')
+        if lat is not None and lon is not None:
+            cls._last_fix = (lat, lon, time.time())
+            try:
+                get_location_trail().add_fix(lat, lon, kwargs.get('accuracy'))
+            except Exception as e:
+                print(f"Error recording location trail: {e}")
+
+    def _format_location(self, lat, lon, age=None):
+        """Location suffix for an alert, with the nearest place and recent movement when known
+        
+        Args:
+            lat, lon: Position
+            age (float): Seconds since a last known position was recorded, None for a current fix
+        """
+        if self.location_format == 'plus_code':
+            link = plus_code_link(lat, lon)
+        else:
+            link = f"https://maps.google.com/?q={lat},{lon}"
+
+        place = self._describe_place(lat, lon) if self.include_place else None
+        label = "Location" if age is None else f"Last known location ({self._format_age(age)} ago)"
+        location_str = f"\n{label}: {place}, {link}" if place else f"\n{label}: {link}"
+
+        if self.trail_minutes:
+            try:
+                summary = get_location_trail().summary(self.trail_minutes)
+            except Exception as e:
+                print(f"Error reading location trail: {e}")
+                summary = None
+            if summary:
+                location_str += f"\n{summary}"
+        return location_str
+
+    def _describe_place(self, lat, lon):
+        """Nearest place from the offline index, or None"""
+        try:
+            return get_reverse_geocoder().describe(lat, lon)
+        except Exception as e:
+            print(f"Error resolving place name: {e}")
+            return None
+
+    def _start_location_updates(self):
+        """Keep GPS running while armed so alerts use a fresh fix without waiting"""
+        if platform != 'android' or EmergencyContactService._location_updates_active:
+            return
+        try:
+            gps.configure(on_location=EmergencyContactService._on_location)
+            gps.start(minTime=1000, minDistance=0)
+            EmergencyContactService._location_updates_active = True
+        except Exception as e:
+            print(f"Error starting location updates: {e}")
+
+    def _get_cached_fix(self):
+        """Get the latest fix as (lat, lon) if it is recent enough"""
+        fix = EmergencyContactService._last_fix
+        if fix and time.time() - fix[2] <= self.location_max_age:
+            return fix[0], fix[1]
+        return None
+
+    def _get_fix(self):
+        """Get the current position as (lat, lon), or None if unavailable"""
+        cached = self._get_cached_fix()
+        if cached is not None:
+            return cached
+
+        fix = None
+        if platform == 'android' and not EmergencyContactService._location_updates_active:
             try:
                 gps.configure(on_location=lambda **kwargs: None)
                 gps.start(minTime=1000, minDistance=0)
@@ -124,8 +530,7 @@ class EmergencyContactService:
                 time.sleep(2)
                 location = gps.get_location()
                 if location:
-                    lat, lon = location.get('lat', 0), location.get('lon', 0)
-                    location_str = f"\nLocation: https://maps.google.com/?q={lat},{lon}"
+                    fix = location.get('lat', 0), location.get('lon', 0)
             except Exception as e:
                 print(f"Error getting location: {e}")
             finally:
@@ -133,114 +538,71 @@ class EmergencyContactService:
                     gps.stop()
                 except:
                     pass
-        return location_str
+        return fix
+
+    def _get_last_known_fix(self):
+        """Get the newest fix of any age as (lat, lon, age in seconds), or None
+        
+        Uses the GPS listener's last fix or the location trail, which also
+        survives app restarts, whichever is newer.
+        """
+        candidates = []
+        fix = EmergencyContactService._last_fix
+        if fix:
+            candidates.append(fix)
+        try:
+            point = get_location_trail().latest()
+            if point:
+                candidates.append((point.lat, point.lon, point.timestamp))
+        except Exception as e:
+            print(f"Error reading location trail: {e}")
+        if not candidates:
+            return None
+        lat, lon, timestamp = max(candidates, key=lambda candidate: candidate[2])
+        return lat, lon, max(0.0, time.time() - timestamp)
+
+    def _locate(self):
+        """Get the position for an alert as ((lat, lon), age)
+        
+        Age is None for a current fix. When no current fix can be had (the
+        listener stalled, or the phone has not moved long enough for the
+        cached fix to expire) the last known position is used with its age,
+        so an alert never goes out without a location that was once known.
+        
+        Returns:
+            tuple: ((lat, lon) or None, age in seconds or None)
+        """
+        fix = self._get_fix()
+        if fix is not None:
+            return fix, None
+        last_known = self._get_last_known_fix()
+        if last_known is None:
+            return None, None
+        return last_known[:2], last_known[2]
+
+    @staticmethod
+    def _format_age(seconds):
+        """Short age for an SMS, e.g. 45s, 12 min, 3 h"""
+        if seconds < 60:
+            return f"{int(seconds)}s"
+        if seconds < 3600:
+            return f"{int(seconds // 60)} min"
+        return f"{int(seconds // 3600)} h"
+
+    def _get_location(self):
+        """Get current location if available"""
+        fix, age = self._locate()
+        return self._format_location(*fix, age=age) if fix else ""
     
-    def send_emergency_message(self, session: Session, user_id: int, message_type="emergency"):
+    def send_emergency_message(self, session: Session, user_id: int, message_type="emergency",
+                               source=SOURCE_UI, sequence=None):
         """Send emergency message to all emergency contacts
         
         Args:
             session: Database session
             user_id: User ID
             message_type: Type of message (emergency, warning, check, accidental)
+            source: What triggered the alert, for the alert history
+            sequence: Wearable press sequence number, if any
         """
-        if not session or not user_id:
-            return {'status': 'error', 'message': 'Invalid session or user ID'}
-
-        try:
-            # Get user and their emergency contacts
-            user = session.query(User).filter(User.id == user_id).first()
-            if not user:
-                return {'status': 'error', 'message': 'User not found'}
-            
-            emergency_contacts = session.query(EmergencyContact).filter(
-                EmergencyContact.user_id == user_id
-            ).all()
-            
-            if not emergency_contacts:
-                return {'status': 'error', 'message': 'No emergency contacts found'}
-            
-            # Get location information if available
-            location_str = self._get_location()
-            
-            # Prepare message based on type
-            base_message = ""
-            if message_type == "emergency":
-                base_message = f"EMERGENCY ALERT: {user.full_name} has triggered an emergency alert. "
-                base_message += f"Please contact them immediately at {user.phone_number}."
-            elif message_type == "warning":
-                base_message = f"WARNING: {user.full_name} has triggered a warning alert. "
-                base_message += f"Please check on them when possible at {user.phone_number}."
-            elif message_type == "check":
-                base_message = f"CHECK-IN: {user.full_name} would like you to check on them. "
-                base_message += f"Please contact them when convenient at {user.phone_number}."
-            elif message_type == "accidental":
-                base_message = f"ACCIDENTAL ALERT: {user.full_name}'s previous alert was triggered by mistake. "
-                base_message += f"No action is required. The user is safe."
-            else:
-                base_message = f"ALERT: {user.full_name} has triggered an alert. "
-                base_message += f"Please contact them at {user.phone_number}."
-            
-            # Add location to message if available
-            message = base_message + location_str
-            
-            results = []
-            success_count = 0
-            for contact in emergency_contacts:
-                # Send emergency message through Veevotech
-                url = f"{self.veevotech_service.base_url}/sendsms"
-                params = {
-                    "hash": self.veevotech_service.api_hash,
-                    "receivernum": contact.phone_number,
-                    "sendernum": "Default",
-                    "textmessage": message
-                }
-                
-                try:
-                    # Make API request with timeout
-                    response = requests.get(url, params=params, timeout=10)
-                    response.raise_for_status()
-                    
-                    # Parse response
-                    api_response = response.json() if response.text else {}
-                    is_success = response.status_code == 200 and api_response.get('status') != 'error'
-                    
-                    if is_success:
-                        success_count += 1
-                    
-                    result = {
-                        'status': 'success' if is_success else 'error',
-                        'message': api_response.get('message', 'Message sent' if is_success else 'Failed to send message')
-                    }
-                except requests.exceptions.Timeout:
-                    result = {'status': 'error', 'message': 'Request timed out'}
-                except requests.exceptions.RequestException as e:
-                    result = {'status': 'error', 'message': f'API request failed: {str(e)}'}
-                except ValueError as e:
-                    result = {'status': 'error', 'message': f'Invalid API response: {str(e)}'}
-                except Exception as e:
-                    result = {'status': 'error', 'message': f'Unexpected error: {str(e)}'}
-                
-                results.append({
-                    'contact_name': contact.name,
-                    'phone_number': contact.phone_number,
-                    'status': result['status'],
-                    'message': result.get('message', '')
-                })
-            
-            overall_status = 'success' if success_count == len(emergency_contacts) else \
-                           'partial' if success_count > 0 else 'error'
-            
-            return {
-                'status': overall_status,
-                'message': f'Messages sent to {success_count} out of {len(emergency_contacts)} contacts',
-                'details': results
-            }
-            
-        except Exception as e:
-            return {'status': 'error', 'message': f'System error: {str(e)}'}
-        finally:
-            try:
-                session.commit()
-            except Exception:
-                session.rollback()
-                raise
\ No newline at end of file
+        return self.dispatch_alert(session, user_id, message_type, source=source, sequence=sequence)
@@ -0,0 +1,185 @@
+import math
+import time
+from threading import Lock
+
+class LatencyTracker:
+    """
+    Latency statistics for one gateway.
+    Keeps an EWMA with mean deviation plus a log-bucketed histogram that acts
+    as a small percentile sketch. Bucket counts are halved periodically so the
+    percentiles follow recent behaviour.
+    """
+
+    def __init__(self, alpha=0.2, min_latency=0.01, growth=1.25, buckets=48, decay_every=200):
+        self.alpha = alpha
+        self.min_latency = min_latency
+        self.growth = growth
+        self.ewma = None
+        self.deviation = 0.0
+        self.samples = 0
+        self._counts = [0.0] * buckets
+        self._total = 0.0
+        self._decay_every = decay_every
+        self._since_decay = 0
+        self._log_growth = math.log(growth)
+        self._lock = Lock()
+
+    def _bucket(self, latency):
+        if latency <= self.min_latency:
+            return 0
+        index = int(math.log(latency / self.min_latency) / self._log_growth) + 1
+        return min(index, len(self._counts) - 1)
+
+    def _bucket_upper(self, index):
+        return self.min_latency * self.growth ** index
+
+    def record(self, latency):
+        """Record one latency in seconds"""
+        with self._lock:
+            self.samples += 1
+            if self.ewma is None:
+                self.ewma = latency
+                self.deviation = latency / 2
+            else:
+                self.deviation += self.alpha * (abs(latency - self.ewma) - self.deviation)
+                self.ewma += self.alpha * (latency - self.ewma)
+
+            self._counts[self._bucket(latency)] += 1
+            self._total += 1
+            self._since_decay += 1
+            if self._since_decay >= self._decay_every:
+                self._counts = [count / 2 for count in self._counts]
+                self._total /= 2
+                self._since_decay = 0
+
+    def percentile(self, fraction):
+        """Approximate latency below which the given fraction of sends completed, None if empty"""
+        with self._lock:
+            if not self._total:
+                return None
+            target = fraction * self._total
+            running = 0.0
+            for index, count in enumerate(self._counts):
+                running += count
+                if running >= target:
+                    return self._bucket_upper(index)
+            return self._bucket_upper(len(self._counts) - 1)
+
+class CircuitBreaker:
+    """
+    Fails fast once a gateway is clearly down.
+    Opens after consecutive failures, lets a single probe through after the
+    reset timeout, and closes again when the probe succeeds.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = Lock()
+
+    def is_available(self):
+        """Check without side effects whether a send could be attempted now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return not self._probe_in_flight
+
+    def allow_request(self):
+        """Claim permission to send, moving an expired open circuit to half-open"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                print("Circuit closed, gateway recovered")
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_ignored(self):
+        """Finish a send that says nothing about the gateway being up or down"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit opened after {self.consecutive_failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+class GatewayHealth:
+    """Success score, latency statistics and circuit breaker for one gateway"""
+
+    def __init__(self, alpha=0.2, min_timeout=2.0, timeout_multiplier=3.0, min_samples=10,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.alpha = alpha
+        self.score = 1.0  # EWMA of send success, 1.0 is fully healthy
+        self.latency = LatencyTracker(alpha=alpha)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self._lock = Lock()
+
+    def record(self, success, latency, rate_limited=False, rejected=False):
+        """
+        Record the outcome of one send.
+
+        Only transport errors and server failures count toward opening the
+        circuit. A rejected message (bad number, refused content) is about
+        that message, not the gateway, so a contact with bad data cannot take
+        the provider down for everyone. A rate limit leaves the failure count
+        as it was, so an outage interleaved with 429s still opens the circuit.
+        """
+        if not rejected:
+            with self._lock:
+                self.score += self.alpha * ((1.0 if success else 0.0) - self.score)
+        if success:
+            self.latency.record(latency)
+            self.breaker.record_success()
+        elif rate_limited or rejected:
+            self.breaker.record_ignored()
+        else:
+            self.breaker.record_failure()
+
+    def expected_ack_time(self):
+        """Latency by which a healthy send normally has acked, None until observed"""
+        if self.latency.samples >= self.min_samples:
+            return self.latency.percentile(0.9)
+        if self.latency.ewma is None:
+            return None
+        return self.latency.ewma + 4 * self.latency.deviation
+
+    def timeout(self, requested):
+        """
+        Timeout derived from observed latency, never longer than requested.
+        Until enough sends have been seen the requested timeout is used.
+        """
+        if self.latency.samples < self.min_samples:
+            return requested
+        p99 = self.latency.percentile(0.99)
+        return min(requested, max(self.min_timeout, p99 * self.timeout_multiplier))
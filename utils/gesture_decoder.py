@@ -0,0 +1,137 @@
+from threading import Lock, Timer
+
+# Wearable clocks are 32-bit millisecond counters that wrap
+CLOCK_MASK = 0xFFFFFFFF
+
+class GestureDecoder:
+    """
+    Turns raw button down/up events into press gestures.
+
+    Presses separated by at most window seconds (measured with the device's
+    own timestamps, so Bluetooth delays and batched delivery do not skew
+    them) count as one gesture. A gesture is emitted as soon as it cannot
+    change any more:
+    - the press that reaches the highest count emits immediately, on the way down
+    - holding the button for long_press seconds emits long_press_type while it is still held
+    - otherwise the count is emitted once window passes with no new press
+    """
+
+    def __init__(self, on_gesture, press_types, window=0.4, long_press=1.5, long_press_type=None,
+                 timer_factory=Timer):
+        """
+        Args:
+            on_gesture: Called with the press type of each gesture
+            press_types (sequence): Press type for 1, 2, 3... presses
+            window (float): Longest gap in seconds between presses of one gesture
+            long_press (float): Hold time in seconds that makes a long press, None to disable
+            long_press_type: Press type a long press emits, defaults to the highest
+            timer_factory: Creates (delay, callback) timers, for tests
+        """
+        self.on_gesture = on_gesture
+        self.press_types = tuple(press_types)
+        self.window = window
+        self.long_press = long_press
+        self.long_press_type = long_press_type or self.press_types[-1]
+        self.timer_factory = timer_factory
+        self.stats = {'downs': 0, 'ups': 0, 'gestures': 0, 'early': 0, 'long_presses': 0, 'stray': 0}
+        self._count = 0
+        self._down_at = None  # Device time of the press being held
+        self._up_at = None  # Device time of the last release
+        self._timer = None
+        self._generation = 0  # Invalidates timers from earlier states
+        self._lock = Lock()
+
+    @staticmethod
+    def _elapsed(start_ms, end_ms):
+        """Seconds between two device timestamps, across counter wrap"""
+        return ((end_ms - start_ms) & CLOCK_MASK) / 1000.0
+
+    def button_down(self, device_ms):
+        """Handle a press at the given device time in milliseconds"""
+        emitted = []
+        with self._lock:
+            self.stats['downs'] += 1
+            if self._count and self._up_at is not None and \
+                    self._elapsed(self._up_at, device_ms) > self.window:
+                # The previous gesture ended before this press, even if its timer has not fired yet
+                emitted.append(self._finish())
+            self._cancel_timer()
+            self._count += 1
+            self._down_at = device_ms
+            self._up_at = None
+
+            if self._count >= len(self.press_types):
+                self.stats['early'] += 1
+                emitted.append(self._finish())
+            elif self.long_press:
+                self._start_timer(self.long_press, self._on_long_press)
+        self._emit(emitted)
+
+    def button_up(self, device_ms):
+        """Handle a release at the given device time in milliseconds"""
+        emitted = []
+        with self._lock:
+            self.stats['ups'] += 1
+            if self._down_at is None:
+                # Release of a press that already emitted (highest count or long press)
+                self.stats['stray'] += 1
+                return
+            held = self._elapsed(self._down_at, device_ms)
+            self._cancel_timer()
+            self._down_at = None
+
+            if self.long_press and held >= self.long_press:
+                self.stats['long_presses'] += 1
+                emitted.append(self._finish(self.long_press_type))
+            else:
+                self._up_at = device_ms
+                self._start_timer(self.window, self._on_window_closed)
+        self._emit(emitted)
+
+    def reset(self):
+        """Forget any gesture in progress, e.g. after the link drops"""
+        with self._lock:
+            self._cancel_timer()
+            self._count = 0
+            self._down_at = self._up_at = None
+
+    def _finish(self, press_type=None):
+        """End the current gesture, caller holds the lock"""
+        press_type = press_type or self.press_types[min(self._count, len(self.press_types)) - 1]
+        self._cancel_timer()
+        self._count = 0
+        self._down_at = self._up_at = None
+        self.stats['gestures'] += 1
+        return press_type
+
+    def _start_timer(self, delay, callback):
+        generation = self._generation
+        self._timer = self.timer_factory(delay, lambda: callback(generation))
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _cancel_timer(self):
+        self._generation += 1
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _on_long_press(self, generation):
+        with self._lock:
+            if generation != self._generation or self._down_at is None:
+                return
+            self.stats['long_presses'] += 1
+            self.stats['early'] += 1
+            press_type = self._finish(self.long_press_type)
+        self._emit([press_type])
+
+    def _on_window_closed(self, generation):
+        with self._lock:
+            if generation != self._generation or not self._count:
+                return
+            press_type = self._finish()
+        self._emit([press_type])
+
+    def _emit(self, press_types):
+        for press_type in press_types:
+            self.on_gesture(press_type)
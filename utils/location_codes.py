@@ -0,0 +1,76 @@
+import math
+
+EARTH_RADIUS_M = 6371008.8
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+PLUS_CODE_ALPHABET = '23456789CFGHJMPQRVWX'
+COMPASS_POINTS = ('N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW')
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+def bearing_deg(lat1, lon1, lat2, lon2):
+    """Initial bearing from the first point to the second, 0 is north"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dlambda = math.radians(lon2 - lon1)
+    x = math.sin(dlambda) * math.cos(phi2)
+    y = math.cos(phi1) * math.sin(phi2) - math.sin(phi1) * math.cos(phi2) * math.cos(dlambda)
+    return (math.degrees(math.atan2(x, y)) + 360) % 360
+
+def compass_point(bearing):
+    """Eight-point compass direction for a bearing"""
+    return COMPASS_POINTS[int((bearing + 22.5) // 45) % 8]
+
+def geohash(lat, lon, precision=8):
+    """
+    Encode a position as a geohash.
+    Eight characters is a cell of about 38 x 19 metres.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits, value, even = 0, 0, True
+    while len(chars) < precision:
+        target, bounds = (lon, lon_range) if even else (lat, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = (value << 1) | 1
+            bounds[0] = middle
+        else:
+            value <<= 1
+            bounds[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+def plus_code(lat, lon):
+    """
+    Encode a position as a 10 digit Open Location Code (Plus Code).
+    The cell is about 14 x 14 metres, and Google Maps opens the code directly.
+    """
+    # Work in integer units of 1/8000 degree, the size of the last pair
+    lat = min(max(lat, -90.0), 90.0)
+    lon = (lon + 180.0) % 360.0 - 180.0
+    lat_units = min(int(math.floor((lat + 90.0) * 8000)), 180 * 8000 - 1)
+    lon_units = int(math.floor((lon + 180.0) * 8000))
+
+    digits = []
+    for _ in range(5):
+        digits.append(PLUS_CODE_ALPHABET[lon_units % 20])
+        digits.append(PLUS_CODE_ALPHABET[lat_units % 20])
+        lat_units //= 20
+        lon_units //= 20
+    code = ''.join(reversed(digits))
+    return f"{code[:8]}+{code[8:]}"
+
+def plus_code_link(lat, lon):
+    """Short link that opens a position in the maps app"""
+    return f"https://plus.codes/{plus_code(lat, lon)}"
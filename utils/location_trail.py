@@ -0,0 +1,236 @@
+import bisect
+import os
+import struct
+import time
+from collections import namedtuple
+from threading import Lock
+from utils.shared import app_data_dir, shared_instance
+from utils.location_codes import bearing_deg, compass_point, distance_m
+
+TrailPoint = namedtuple('TrailPoint', ('timestamp', 'lat', 'lon', 'accuracy'))
+
+# The file is a sequence of 8 byte slots. A keyframe takes two slots and holds
+# an absolute time and position, a delta takes one and holds the change since
+# the previous record. Coordinates are quantized to 1e-5 degree, about a metre.
+SLOT_SIZE = 8
+KEYFRAME = 1
+DELTA = 2
+QUANTUM = 100000
+_KEY_HEADER = struct.Struct('<BBHI')  # kind, accuracy m, reserved, unix seconds
+_KEY_POSITION = struct.Struct('<ii')  # lat, lon in quanta
+_DELTA = struct.Struct('<BBHhh')  # kind, accuracy m, seconds since previous, dlat, dlon
+_MAX_DELTA = 32767
+_MAX_DT = 65535
+
+class LocationTrail:
+    """
+    Append-only on-device record of recent GPS fixes.
+
+    Fixes are thinned adaptively. While moving, one is kept every
+    min_interval seconds. While stationary, one is kept every max_interval
+    seconds. Appends write a single fixed-width record. A small in-memory
+    index of keyframe times lets "last N minutes" reads seek straight to the
+    right place instead of scanning the file. When the file reaches max_bytes
+    it is rotated to a single .1 backup.
+    """
+
+    def __init__(self, path, keyframe_every=60, min_interval=5.0, max_interval=60.0,
+                 min_distance=15.0, max_bytes=2 * 1024 * 1024):
+        """
+        Args:
+            path (str): Trail file
+            keyframe_every (int): Deltas between keyframes
+            min_interval (float): Seconds between recorded fixes while moving
+            max_interval (float): Seconds between recorded fixes while stationary
+            min_distance (float): Metres of movement that count as moving
+            max_bytes (int): File size that triggers rotation
+        """
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.min_distance = min_distance
+        self.max_bytes = max_bytes
+        self._keyframe_times = []
+        self._keyframe_offsets = []
+        self._last = None  # (timestamp, lat quanta, lon quanta, accuracy) of the last record
+        self._since_keyframe = 0
+        self._size = 0
+        self._file = None
+        self._lock = Lock()
+        self._open()
+
+    @property
+    def backup_path(self):
+        return self.path + '.1'
+
+    def _open(self):
+        """Index the existing file, dropping a partly written final record"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        data = b''
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                data = f.read()
+
+        valid = 0
+        for offset, kind, point in self._iter_records(data):
+            if kind == KEYFRAME:
+                self._keyframe_times.append(point[0])
+                self._keyframe_offsets.append(offset)
+                self._since_keyframe = 0
+            else:
+                self._since_keyframe += 1
+            self._last = point
+            valid = offset + (2 * SLOT_SIZE if kind == KEYFRAME else SLOT_SIZE)
+
+        if valid != len(data):
+            print(f"Location trail: dropping {len(data) - valid} bytes of incomplete records")
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid)
+        self._size = valid
+        self._file = open(self.path, 'ab')
+
+    @staticmethod
+    def _iter_records(data, offset=0):
+        """Yield (offset, kind, (timestamp, lat quanta, lon quanta, accuracy)) from raw slots"""
+        last = None
+        end = len(data)
+        while offset + SLOT_SIZE <= end:
+            kind = data[offset]
+            if kind == KEYFRAME:
+                if offset + 2 * SLOT_SIZE > end:
+                    return
+                _, accuracy, _, timestamp = _KEY_HEADER.unpack_from(data, offset)
+                lat, lon = _KEY_POSITION.unpack_from(data, offset + SLOT_SIZE)
+                last = (timestamp, lat, lon, accuracy)
+                yield offset, kind, last
+                offset += 2 * SLOT_SIZE
+            elif kind == DELTA and last is not None:
+                _, accuracy, dt, dlat, dlon = _DELTA.unpack_from(data, offset)
+                last = (last[0] + dt, last[1] + dlat, last[2] + dlon, accuracy)
+                yield offset, kind, last
+                offset += SLOT_SIZE
+            else:
+                return
+
+    def add_fix(self, lat, lon, accuracy=None, timestamp=None):
+        """
+        Offer a GPS fix to the trail.
+
+        Returns:
+            bool: True if the fix was recorded, False if it was thinned out
+        """
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            if self._last is not None:
+                elapsed = now - self._last[0]
+                if elapsed < self.min_interval:
+                    return False
+                moved = distance_m(self._last[1] / QUANTUM, self._last[2] / QUANTUM, lat, lon)
+                threshold = max(self.min_distance, accuracy or 0)
+                if moved < threshold and elapsed < self.max_interval:
+                    return False
+            self._append(int(now), int(round(lat * QUANTUM)), int(round(lon * QUANTUM)),
+                         min(int(accuracy or 0), 255))
+            return True
+
+    def _append(self, timestamp, lat, lon, accuracy):
+        """Write one record, caller holds the lock"""
+        record = None
+        if self._last is not None and self._since_keyframe < self.keyframe_every:
+            dt = timestamp - self._last[0]
+            dlat = lat - self._last[1]
+            dlon = lon - self._last[2]
+            if 0 <= dt <= _MAX_DT and abs(dlat) <= _MAX_DELTA and abs(dlon) <= _MAX_DELTA:
+                record = _DELTA.pack(DELTA, accuracy, dt, dlat, dlon)
+                self._since_keyframe += 1
+
+        if record is None:
+            if self._size >= self.max_bytes:
+                self._rotate()
+            record = _KEY_HEADER.pack(KEYFRAME, accuracy, 0, timestamp) + _KEY_POSITION.pack(lat, lon)
+            self._keyframe_times.append(timestamp)
+            self._keyframe_offsets.append(self._size)
+            self._since_keyframe = 0
+
+        self._file.write(record)
+        self._file.flush()
+        self._size += len(record)
+        self._last = (timestamp, lat, lon, accuracy)
+
+    def _rotate(self):
+        """Move the current file to the backup and start a new one, caller holds the lock"""
+        self._file.close()
+        os.replace(self.path, self.backup_path)
+        self._file = open(self.path, 'ab')
+        self._size = 0
+        self._keyframe_times = []
+        self._keyframe_offsets = []
+
+    def latest(self):
+        """Most recent recorded fix as a TrailPoint, or None"""
+        with self._lock:
+            if self._last is None:
+                return None
+            return self._to_point(self._last)
+
+    @staticmethod
+    def _to_point(record):
+        timestamp, lat, lon, accuracy = record
+        return TrailPoint(timestamp, lat / QUANTUM, lon / QUANTUM, accuracy or None)
+
+    def recent(self, minutes=10, now=None):
+        """
+        Get the fixes recorded in the last N minutes, oldest first.
+
+        Returns:
+            list: TrailPoint tuples
+        """
+        cutoff = (time.time() if now is None else now) - minutes * 60
+        with self._lock:
+            self._file.flush()
+            index = bisect.bisect_right(self._keyframe_times, cutoff) - 1
+            read_backup = index < 0 and os.path.exists(self.backup_path)
+            start = self._keyframe_offsets[index] if index >= 0 else 0
+
+            data = b''
+            if read_backup:
+                with open(self.backup_path, 'rb') as f:
+                    data = f.read()
+            points = [record for _, _, record in self._iter_records(data) if record[0] >= cutoff]
+
+            with open(self.path, 'rb') as f:
+                f.seek(start)
+                data = f.read(self._size - start)
+        points.extend(record for _, _, record in self._iter_records(data) if record[0] >= cutoff)
+        return [self._to_point(record) for record in points]
+
+    def summary(self, minutes=10, stationary_radius=50.0, now=None):
+        """
+        One line describing recent movement for an alert, or None without enough history.
+        """
+        points = self.recent(minutes, now)
+        if len(points) < 2:
+            return None
+        first, last = points[0], points[-1]
+        span = max(1, int(round((last.timestamp - first.timestamp) / 60)))
+        moved = distance_m(first.lat, first.lon, last.lat, last.lon)
+        if moved < stationary_radius:
+            return f"Trail: not moving for {span} min"
+        direction = compass_point(bearing_deg(first.lat, first.lon, last.lat, last.lon))
+        return f"Trail: moved {moved / 1000:.1f} km {direction} in {span} min"
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+def default_trail_path():
+    """Trail file in the app's private storage"""
+    return os.path.join(app_data_dir(), 'location_trail.bin')
+
+@shared_instance
+def get_location_trail():
+    """Get the shared location trail, opened on first use"""
+    return LocationTrail(default_trail_path())
@@ -0,0 +1,190 @@
+import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Thread
+from utils.sms_gateways import get_sms_router
+from utils.shared import shared_instance
+
+# Message classes, lower value is more urgent
+EMERGENCY = 0
+WARNING = 1
+OTP = 2
+CHECK_IN = 3
+
+PRIORITY_NAMES = {
+    EMERGENCY: 'emergency',
+    WARNING: 'warning',
+    OTP: 'otp',
+    CHECK_IN: 'check_in',
+}
+
+# Alert message types mapped to their class, accidental corrections go out as fast as warnings
+MESSAGE_TYPE_PRIORITIES = {
+    'emergency': EMERGENCY,
+    'warning': WARNING,
+    'accidental': WARNING,
+    'custom': WARNING,
+    'check': CHECK_IN,
+}
+
+# Concurrent sends each class may have in flight
+DEFAULT_BUDGETS = {
+    EMERGENCY: 8,
+    WARNING: 4,
+    OTP: 2,
+    CHECK_IN: 2,
+}
+
+# Classes worth a duplicate SMS from a second gateway when the first is slow
+HEDGED_PRIORITIES = (EMERGENCY, WARNING)
+
+def priority_for(message_type):
+    """Get the scheduling class for an alert message type"""
+    return MESSAGE_TYPE_PRIORITIES.get(message_type, WARNING)
+
+class ScheduledMessage:
+    """An outbound SMS waiting for a worker"""
+
+    __slots__ = ('phone_number', 'message', 'priority', 'timeout', 'future', 'enqueued_at')
+
+    def __init__(self, phone_number, message, priority, timeout):
+        self.phone_number = phone_number
+        self.message = message
+        self.priority = priority
+        self.timeout = timeout
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+class MessageScheduler:
+    """
+    Priority scheduler in front of the SMS gateways.
+
+    Each class has its own queue and concurrency budget. Workers always take
+    the most urgent message whose class has budget left, and part of the
+    worker pool is reserved for emergencies, so an emergency never waits
+    behind OTPs or check-ins. When a provider rate-limits, low priority
+    messages are shed instead of competing with alerts for the remaining capacity.
+    """
+
+    def __init__(self, router, budgets=None, max_in_flight=8, emergency_reserve=4,
+                 shed_priority=OTP, rate_limit_backoff=30.0):
+        """
+        Args:
+            router: GatewayRouter used to send
+            budgets (dict): Class -> max concurrent sends
+            max_in_flight (int): Worker threads, the total concurrent sends
+            emergency_reserve (int): Workers only emergencies may use
+            shed_priority (int): Classes at or below this urgency are shed while rate limited
+            rate_limit_backoff (float): Seconds to keep shedding after a rate limit response
+        """
+        self.router = router
+        self.budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        self.max_in_flight = max_in_flight
+        self.emergency_reserve = min(emergency_reserve, max_in_flight)
+        self.shed_priority = shed_priority
+        self.rate_limit_backoff = rate_limit_backoff
+        self.stats = {
+            name: {'submitted': 0, 'sent': 0, 'failed': 0, 'shed': 0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self._queues = {priority: deque() for priority in PRIORITY_NAMES}
+        self._in_flight = {priority: 0 for priority in PRIORITY_NAMES}
+        self._rate_limited_until = 0.0
+        self._cond = Condition()
+
+        for index in range(max_in_flight):
+            Thread(target=self._worker, name=f'sms-scheduler-{index}', daemon=True).start()
+
+    def submit(self, phone_number, message, priority, timeout=10):
+        """
+        Queue an SMS.
+
+        Args:
+            phone_number (str): Receiver number
+            message (str): Message body
+            priority (int): EMERGENCY, WARNING, OTP or CHECK_IN
+            timeout (float): Seconds the gateways may take
+
+        Returns:
+            Future: Resolves to the gateway result dict
+        """
+        job = ScheduledMessage(phone_number, message, priority, timeout)
+        with self._cond:
+            self.stats[PRIORITY_NAMES[priority]]['submitted'] += 1
+            if self._is_shedding(priority):
+                self._shed(job)
+                return job.future
+            self._queues[priority].append(job)
+            self._cond.notify_all()
+        return job.future
+
+    def send(self, phone_number, message, priority, timeout=10):
+        """Queue an SMS and wait for its result"""
+        return self.submit(phone_number, message, priority, timeout).result()
+
+    def queue_depths(self):
+        """Number of queued messages per class"""
+        with self._cond:
+            return {PRIORITY_NAMES[priority]: len(queue) for priority, queue in self._queues.items()}
+
+    def _is_shedding(self, priority):
+        return priority >= self.shed_priority and time.monotonic() < self._rate_limited_until
+
+    def _shed(self, job):
+        """Fail a message without sending it, caller holds the lock"""
+        self.stats[PRIORITY_NAMES[job.priority]]['shed'] += 1
+        job.future.set_result({
+            'status': 'error',
+            'message': 'Not sent, SMS provider is rate limiting',
+            'shed': True
+        })
+
+    def _next_job(self):
+        """Pick the most urgent message that has budget, caller holds the lock"""
+        non_emergency_in_flight = sum(
+            count for priority, count in self._in_flight.items() if priority != EMERGENCY
+        )
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            if not queue or self._in_flight[priority] >= self.budgets[priority]:
+                continue
+            if priority != EMERGENCY and non_emergency_in_flight >= self.max_in_flight - self.emergency_reserve:
+                continue
+            return queue.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                self._in_flight[job.priority] += 1
+
+            try:
+                result = self.router.send(job.phone_number, job.message, timeout=job.timeout,
+                                          hedge=job.priority in HEDGED_PRIORITIES,
+                                          attempt_offline=job.priority == EMERGENCY)
+            except Exception as e:
+                result = {'status': 'error', 'message': f'Unexpected error: {str(e)}'}
+
+            with self._cond:
+                self._in_flight[job.priority] -= 1
+                stats = self.stats[PRIORITY_NAMES[job.priority]]
+                stats['sent' if result['status'] == 'success' else 'failed'] += 1
+                if result.get('rate_limited'):
+                    self._rate_limited_until = time.monotonic() + self.rate_limit_backoff
+                    # Drop queued low priority work now rather than send it into the limit
+                    for priority, queue in self._queues.items():
+                        if priority >= self.shed_priority:
+                            while queue:
+                                self._shed(queue.popleft())
+                self._cond.notify_all()
+
+            job.future.set_result(result)
+
+@shared_instance
+def get_message_scheduler():
+    """Get the shared scheduler, built on first use"""
+    return MessageScheduler(get_sms_router())
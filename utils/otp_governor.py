@@ -0,0 +1,91 @@
+import time
+from collections import OrderedDict, deque
+from threading import Lock
+
+# Governor decisions
+SEND = 'send'
+COALESCE = 'coalesce'
+LIMITED = 'limited'
+
+class OtpSendGovernor:
+    """
+    Decides whether a verification code request may go to the gateway.
+
+    Requests for a number that was sent a code less than min_interval ago
+    are coalesced onto the outstanding code when there is one, so a screen
+    that sends on enter right after the previous screen sent costs nothing.
+    Each number may also be sent at most max_per_window codes per sliding
+    window. A send is reserved when it is allowed, before the gateway is
+    called, so concurrent requests see it, and released again if the send fails.
+    """
+
+    def __init__(self, min_interval=30.0, window=3600.0, max_per_window=5, max_numbers=5000):
+        """
+        Args:
+            min_interval (float): Seconds between sends to one number
+            window (float): Sliding window length in seconds
+            max_per_window (int): Sends allowed to one number per window
+            max_numbers (int): Numbers tracked at once, least recently used are forgotten
+        """
+        self.min_interval = min_interval
+        self.window = window
+        self.max_per_window = max_per_window
+        self.max_numbers = max_numbers
+        self.stats = {SEND: 0, COALESCE: 0, LIMITED: 0}
+        self._sends = OrderedDict()  # Number -> deque of send times, oldest first
+        self._lock = Lock()
+
+    def acquire(self, phone_number, has_pending, now=None):
+        """
+        Decide on a send request and reserve the send if it is allowed.
+
+        Args:
+            phone_number (str): Number the code would go to
+            has_pending (bool): Whether the number has a valid code outstanding
+            now (float): Current time, for tests
+
+        Returns:
+            dict: 'decision' (SEND, COALESCE or LIMITED), 'retry_after' in seconds
+                and 'reserved_at', the value to pass to release() if the send fails
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            sends = self._sends.get(phone_number)
+            if sends is None:
+                sends = self._sends[phone_number] = deque()
+            self._sends.move_to_end(phone_number)
+
+            while sends and sends[0] <= now - self.window:
+                sends.popleft()
+
+            if sends and now - sends[-1] < self.min_interval:
+                retry_after = self.min_interval - (now - sends[-1])
+                decision = COALESCE if has_pending else LIMITED
+            elif len(sends) >= self.max_per_window:
+                retry_after = sends[0] + self.window - now
+                decision = LIMITED
+            else:
+                retry_after = 0
+                decision = SEND
+                sends.append(now)
+
+            while len(self._sends) > self.max_numbers:
+                self._sends.popitem(last=False)
+
+            self.stats[decision] += 1
+            return {
+                'decision': decision,
+                'retry_after': max(0, int(retry_after + 0.999)),
+                'reserved_at': now if decision == SEND else None
+            }
+
+    def release(self, phone_number, reserved_at):
+        """Give back a reserved send that never reached the gateway"""
+        if reserved_at is None:
+            return
+        with self._lock:
+            sends = self._sends.get(phone_number)
+            if sends and reserved_at in sends:
+                sends.remove(reserved_at)
+
+otp_send_governor = OtpSendGovernor()
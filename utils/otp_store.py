@@ -0,0 +1,325 @@
+import hashlib
+import hmac
+import os
+import sqlite3
+import time
+from threading import Lock
+from utils.shared import app_data_dir, shared_instance
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS otp_codes (
+    phone_number TEXT PRIMARY KEY,
+    code_hash BLOB NOT NULL,
+    salt BLOB NOT NULL,
+    issued_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_otp_codes_expires ON otp_codes (expires_at);
+"""
+
+class OtpEntry:
+    """One outstanding verification code, only its salted hash is kept"""
+
+    __slots__ = ('phone_number', 'code_hash', 'salt', 'issued_at', 'expires_at', 'attempts', 'replaced')
+
+    def __init__(self, phone_number, code_hash, salt, issued_at, expires_at, attempts=0):
+        self.phone_number = phone_number
+        self.code_hash = code_hash
+        self.salt = salt
+        self.issued_at = issued_at
+        self.expires_at = expires_at
+        self.attempts = attempts
+        self.replaced = None  # Code this one replaced, put back if this one is withdrawn
+
+class TimerWheel:
+    """
+    Buckets keys by the tick they expire in.
+
+    Advancing the wheel hands back only the keys in the slots that were
+    passed, so sweeping costs nothing while no code is due. Keys that are not
+    yet due (a later expiry that wrapped around the wheel, or a code that was
+    replaced) are simply rescheduled by the caller.
+    """
+
+    def __init__(self, slots=256, tick=1.0):
+        """
+        Args:
+            slots (int): Number of buckets
+            tick (float): Seconds each bucket covers
+        """
+        self.tick = tick
+        self._slots = [set() for _ in range(slots)]
+        self._cursor = None  # Last tick that was swept
+
+    def _tick_of(self, timestamp):
+        return int(timestamp // self.tick)
+
+    def schedule(self, key, expires_at):
+        """Put a key in the bucket for its expiry time"""
+        self._slots[self._tick_of(expires_at) % len(self._slots)].add(key)
+
+    def advance(self, now):
+        """
+        Empty every bucket passed since the last call.
+
+        Returns:
+            list: Keys that may have expired
+        """
+        current = self._tick_of(now)
+        if self._cursor is None:
+            self._cursor = current - len(self._slots)
+
+        # The current tick is still filling up, it is swept once it has passed
+        due = []
+        for tick in range(max(self._cursor + 1, current - len(self._slots)), current):
+            slot = self._slots[tick % len(self._slots)]
+            if slot:
+                due.extend(slot)
+                slot.clear()
+        self._cursor = max(self._cursor, current - 1)
+        return due
+
+    def earliest(self, is_live):
+        """Live keys from the next bucket that has any, roughly the ones expiring soonest"""
+        start = (self._cursor or 0) + 1
+        for offset in range(len(self._slots)):
+            live = [key for key in self._slots[(start + offset) % len(self._slots)] if is_live(key)]
+            if live:
+                return live
+        return []
+
+class OtpStore:
+    """
+    Process-wide store of outstanding verification codes.
+
+    Lookups go through an in-memory dict, so verifying is O(1). Codes are
+    kept as salted HMAC-SHA256 hashes and written through to a small SQLite
+    table, so a code survives the app being killed while the user switches to
+    their SMS app. Expired codes are swept in bulk by a timer wheel. The
+    store never holds more than max_entries codes: when it is full, the codes
+    closest to expiring make room, so resend floods cannot grow it.
+    """
+
+    def __init__(self, path=None, ttl=60, max_attempts=5, max_entries=5000, slots=256, tick=1.0):
+        """
+        Args:
+            path (str): SQLite file to persist codes in, None keeps them in memory only
+            ttl (float): Default seconds a code stays valid
+            max_attempts (int): Wrong guesses allowed before a code is revoked
+            max_entries (int): Most codes held at once
+            slots (int): Timer wheel buckets
+            tick (float): Seconds per timer wheel bucket
+        """
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.max_entries = max_entries
+        self.stats = {'issued': 0, 'approved': 0, 'rejected': 0, 'expired': 0, 'evicted': 0}
+        self._entries = {}
+        self._wheel = TimerWheel(slots, tick)
+        self._lock = Lock()
+        self._db = None
+        if path:
+            self._open(path)
+
+    def _open(self, path):
+        """Open the backing table and load the codes that are still valid"""
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.executescript(SCHEMA)
+            now = time.time()
+            with self._db:
+                self._db.execute("DELETE FROM otp_codes WHERE expires_at <= ?", (now,))
+            rows = self._db.execute(
+                "SELECT phone_number, code_hash, salt, issued_at, expires_at, attempts FROM otp_codes "
+                "ORDER BY expires_at DESC LIMIT ?", (self.max_entries,)
+            ).fetchall()
+            for row in rows:
+                entry = OtpEntry(*row)
+                self._entries[entry.phone_number] = entry
+                self._wheel.schedule(entry.phone_number, entry.expires_at)
+        except sqlite3.Error as e:
+            print(f"Error opening OTP store, keeping codes in memory only: {str(e)}")
+            self._db = None
+
+    @staticmethod
+    def _hash(salt, phone_number, code):
+        return hmac.new(salt, f'{phone_number}:{code}'.encode(), hashlib.sha256).digest()
+
+    def _write(self, statement, params):
+        """Write through to the backing table, caller holds the lock"""
+        if self._db is None:
+            return
+        try:
+            with self._db:
+                self._db.execute(statement, params)
+        except sqlite3.Error as e:
+            print(f"Error persisting OTP store: {str(e)}")
+
+    def _remove(self, phone_number):
+        """Forget a code, caller holds the lock"""
+        if self._entries.pop(phone_number, None) is not None:
+            self._write("DELETE FROM otp_codes WHERE phone_number = ?", (phone_number,))
+
+    def _sweep(self, now):
+        """Drop every code the wheel reports as expired, caller holds the lock"""
+        removed = 0
+        for phone_number in self._wheel.advance(now):
+            entry = self._entries.get(phone_number)
+            if entry is None:
+                continue
+            if entry.expires_at <= now:
+                del self._entries[phone_number]
+                removed += 1
+            else:
+                self._wheel.schedule(phone_number, entry.expires_at)
+        if removed:
+            self.stats['expired'] += removed
+            self._write("DELETE FROM otp_codes WHERE expires_at <= ?", (now,))
+        return removed
+
+    def _make_room(self, now):
+        """Evict the codes closest to expiring until there is space, caller holds the lock"""
+        self._sweep(now)
+        while len(self._entries) >= self.max_entries:
+            candidates = self._wheel.earliest(self._entries.__contains__)
+            if not candidates:
+                candidates = [next(iter(self._entries))]
+            victim = min(candidates, key=lambda key: self._entries[key].expires_at)
+            self._remove(victim)
+            self.stats['evicted'] += 1
+
+    def issue(self, phone_number, code, ttl=None, now=None):
+        """
+        Store a new code for a number, replacing any outstanding one.
+
+        Args:
+            phone_number (str): Number the code was sent to
+            code (str): Plain code, only its hash is kept
+            ttl (float): Seconds the code stays valid, defaults to the store's ttl
+            now (float): Current time, for tests
+
+        Returns:
+            OtpEntry: The new code, pass it to withdraw if its SMS never goes out
+        """
+        now = time.time() if now is None else now
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        salt = os.urandom(16)
+        entry = OtpEntry(phone_number, self._hash(salt, phone_number, code), salt, now, expires_at)
+
+        with self._lock:
+            if phone_number not in self._entries:
+                self._make_room(now)
+            previous = self._entries.get(phone_number)
+            if previous is not None:
+                previous.replaced = None  # Only the latest replacement can be undone
+                entry.replaced = previous
+            self._entries[phone_number] = entry
+            self._wheel.schedule(phone_number, expires_at)
+            self.stats['issued'] += 1
+            self._write(
+                "INSERT OR REPLACE INTO otp_codes (phone_number, code_hash, salt, issued_at, expires_at, attempts) "
+                "VALUES (?, ?, ?, ?, ?, 0)",
+                (phone_number, entry.code_hash, salt, now, expires_at)
+            )
+        return entry
+
+    def withdraw(self, entry, now=None):
+        """
+        Take back a code whose SMS never went out.
+
+        The code it replaced is put back if still valid, since the user may
+        already have that one. Nothing changes if a newer code has replaced
+        this one or it has been used.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            phone_number = entry.phone_number
+            if self._entries.get(phone_number) is not entry:
+                return
+            previous, entry.replaced = entry.replaced, None
+            if previous is None or now >= previous.expires_at:
+                self._remove(phone_number)
+                return
+            self._entries[phone_number] = previous
+            self._wheel.schedule(phone_number, previous.expires_at)
+            self._write(
+                "INSERT OR REPLACE INTO otp_codes (phone_number, code_hash, salt, issued_at, expires_at, attempts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (phone_number, previous.code_hash, previous.salt, previous.issued_at, previous.expires_at,
+                 previous.attempts)
+            )
+
+    def verify(self, phone_number, code, now=None):
+        """
+        Check a code, a correct or exhausted code is used up.
+
+        Returns:
+            dict: {'status': 'approved' or 'rejected', 'message': str}
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(phone_number)
+            if entry is None:
+                return {'status': 'rejected', 'message': 'No verification code was sent to this number'}
+
+            if now >= entry.expires_at:
+                self._remove(phone_number)
+                self.stats['expired'] += 1
+                return {'status': 'rejected', 'message': 'Verification code has expired. Please request a new one'}
+
+            if hmac.compare_digest(entry.code_hash, self._hash(entry.salt, phone_number, str(code).strip())):
+                self._remove(phone_number)
+                self.stats['approved'] += 1
+                return {'status': 'approved', 'message': 'Verification successful'}
+
+            entry.attempts += 1
+            self.stats['rejected'] += 1
+            if entry.attempts >= self.max_attempts:
+                self._remove(phone_number)
+                return {'status': 'rejected', 'message': 'Too many incorrect attempts. Please request a new code'}
+            self._write("UPDATE otp_codes SET attempts = ? WHERE phone_number = ?", (entry.attempts, phone_number))
+            return {'status': 'rejected', 'message': 'Invalid verification code'}
+
+    def pending(self, phone_number, now=None):
+        """
+        Get the outstanding code's details for a number.
+
+        Returns:
+            dict: issued_at, expires_at and attempts, or None if no valid code is outstanding
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self._sweep(now)
+            entry = self._entries.get(phone_number)
+            if entry is None or now >= entry.expires_at:
+                return None
+            return {'issued_at': entry.issued_at, 'expires_at': entry.expires_at, 'attempts': entry.attempts}
+
+    def discard(self, phone_number):
+        """Revoke a number's outstanding code"""
+        with self._lock:
+            self._remove(phone_number)
+
+    def sweep(self, now=None):
+        """
+        Drop expired codes.
+
+        Returns:
+            int: Number of codes removed
+        """
+        with self._lock:
+            return self._sweep(time.time() if now is None else now)
+
+    def __len__(self):
+        return len(self._entries)
+
+def default_otp_path():
+    """OTP database in the app's private storage"""
+    return os.path.join(app_data_dir(), 'otp_codes.sqlite3')
+
+@shared_instance
+def get_otp_store():
+    """Get the OTP store shared by every screen"""
+    return OtpStore(default_otp_path())
@@ -0,0 +1,155 @@
+import math
+import mmap
+import os
+import struct
+from utils.location_codes import bearing_deg, compass_point, distance_m
+from utils.shared import shared_instance
+
+# places.bin layout, all little endian:
+#   header   magic, version, reserved, cell size in degrees, place count, cell count, names offset
+#   cells    (cell key, first place, place count), sorted by key
+#   places   (lat e5, lon e5, population, name offset, name length, country), grouped by cell
+#   names    UTF-8 place names
+HEADER = struct.Struct('<4sHHfIII')
+CELL = struct.Struct('<III')
+PLACE = struct.Struct('<iiIIH2s')
+MAGIC = b'SFPL'
+VERSION = 1
+COORD_SCALE = 100000
+
+DEFAULT_INDEX_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'places.bin'
+)
+
+def cell_key(lat, lon, cell_size):
+    """Grid cell holding a position, as a single integer"""
+    row = int((lat + 90.0) // cell_size)
+    col = int((lon + 180.0) // cell_size)
+    return row * cell_columns(cell_size) + col
+
+def cell_columns(cell_size):
+    return int(math.ceil(360.0 / cell_size))
+
+def place_radius_km(population):
+    """Rough built-up radius, a point inside it is 'in' the place rather than near it"""
+    return 1.0 + math.sqrt(population or 0) / 100.0
+
+class Place:
+    """A resolved populated place"""
+
+    __slots__ = ('name', 'country', 'lat', 'lon', 'population', 'distance_km')
+
+    def __init__(self, name, country, lat, lon, population, distance_km):
+        self.name = name
+        self.country = country
+        self.lat = lat
+        self.lon = lon
+        self.population = population
+        self.distance_km = distance_km
+
+    def __repr__(self):
+        return f"Place({self.name}, {self.country}, {self.distance_km:.1f} km)"
+
+class ReverseGeocoder:
+    """
+    Offline nearest-place lookup over the bundled places index.
+
+    The index file is memory-mapped, so only the grid cells a lookup touches
+    are read and start-up costs one small table. Places are bucketed into
+    fixed-size lat/lon cells. A lookup scans only the cells within the search
+    radius. A place's population sets a built-up radius, so a fix in the
+    suburbs of a large city resolves to that city rather than a smaller town
+    whose centre happens to be closer.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, self.cell_size, self.count, cell_count, self._names_offset = \
+            HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a places index: {path}")
+
+        self._places_offset = HEADER.size + cell_count * CELL.size
+        self._cells = {}
+        for key, first, count in CELL.iter_unpack(self._data[HEADER.size:self._places_offset]):
+            self._cells[key] = (first, count)
+        self._columns = cell_columns(self.cell_size)
+
+    def _read_place(self, index):
+        lat, lon, population, name_offset, name_length, country = PLACE.unpack_from(
+            self._data, self._places_offset + index * PLACE.size
+        )
+        return lat / COORD_SCALE, lon / COORD_SCALE, population, name_offset, name_length, country
+
+    def _name(self, name_offset, name_length):
+        start = self._names_offset + name_offset
+        return self._data[start:start + name_length].decode('utf-8')
+
+    def nearest(self, lat, lon, max_km=100.0):
+        """
+        Find the place a position belongs to.
+
+        Args:
+            lat (float): Latitude
+            lon (float): Longitude
+            max_km (float): Ignore places farther than this
+
+        Returns:
+            Place: Best match with its distance in km, or None
+        """
+        lat_span = int(math.ceil(max_km / (111.2 * self.cell_size)))
+        lon_km = 111.2 * self.cell_size * max(math.cos(math.radians(lat)), 0.01)
+        lon_span = min(int(math.ceil(max_km / lon_km)), self._columns // 2)
+
+        row = int((lat + 90.0) // self.cell_size)
+        col = int((lon + 180.0) // self.cell_size)
+
+        best, best_score = None, None
+        for r in range(row - lat_span, row + lat_span + 1):
+            for c in range(col - lon_span, col + lon_span + 1):
+                cell = self._cells.get(r * self._columns + c % self._columns)
+                if cell is None:
+                    continue
+                first, count = cell
+                for index in range(first, first + count):
+                    place = self._read_place(index)
+                    distance = distance_m(lat, lon, place[0], place[1]) / 1000.0
+                    if distance > max_km:
+                        continue
+                    # Distance to the edge of the built-up area, negative when inside
+                    score = distance - place_radius_km(place[2])
+                    if best_score is None or score < best_score:
+                        best, best_score = (place, distance), score
+
+        if best is None:
+            return None
+        (place_lat, place_lon, population, name_offset, name_length, country), distance = best
+        return Place(self._name(name_offset, name_length), country.decode('ascii'),
+                     place_lat, place_lon, population, distance)
+
+    def describe(self, lat, lon, max_km=100.0):
+        """
+        Short description of where a position is, for alerts.
+
+        Returns:
+            str: 'near Lahore' inside the built-up area, '12 km NE of Multan'
+                 outside it, or None when no place is within max_km
+        """
+        place = self.nearest(lat, lon, max_km)
+        if place is None:
+            return None
+        if place.distance_km <= place_radius_km(place.population):
+            return f"near {place.name}"
+        direction = compass_point(bearing_deg(place.lat, place.lon, lat, lon))
+        return f"{place.distance_km:.0f} km {direction} of {place.name}"
+
+    def close(self):
+        self._data.close()
+
+@shared_instance
+def get_reverse_geocoder():
+    """Get the shared geocoder, mapping the bundled index on first use"""
+    return ReverseGeocoder()
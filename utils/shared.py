@@ -0,0 +1,44 @@
+import functools
+import os
+from threading import Lock
+from kivy.utils import platform
+
+def app_data_dir():
+    """
+    Folder for the app's private files, created if missing.
+
+    On Android this is the app's user_data_dir, elsewhere ~/.safinity.
+    SAFINITY_DATA_DIR overrides both, so tools can keep their runs out of the
+    developer's real data.
+    """
+    data_dir = os.getenv('SAFINITY_DATA_DIR')
+    if not data_dir and platform == 'android':
+        from kivy.app import App
+        app = App.get_running_app()
+        if app:
+            data_dir = app.user_data_dir
+    if not data_dir:
+        data_dir = os.path.join(os.path.expanduser('~'), '.safinity')
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+def shared_instance(factory):
+    """
+    Turn a factory into a getter for one instance shared by every caller.
+
+    The instance is built on the first call, under a lock so concurrent
+    first calls from the UI and worker threads still build it once.
+    """
+    instance = None
+    lock = Lock()
+
+    @functools.wraps(factory)
+    def get():
+        nonlocal instance
+        if instance is None:
+            with lock:
+                if instance is None:
+                    instance = factory()
+        return instance
+
+    return get
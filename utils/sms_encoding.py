@@ -0,0 +1,210 @@
+import re
+import unicodedata
+
+# GSM 03.38 default alphabet, one septet per character
+GSM7_BASIC = set(
+    "@£$¥èéùìòÇ\nØø\rÅåΔ_ΦΓΛΩΠΨΣΘΞÆæßÉ !\"#¤%&'()*+,-./0123456789:;<=>?"
+    "¡ABCDEFGHIJKLMNOPQRSTUVWXYZÄÖÑÜ§¿abcdefghijklmnopqrstuvwxyzäöñüà"
+)
+# Extension table, each costs an escape septet plus the character
+GSM7_EXTENDED = set("^{}\\[~]|€\f")
+
+GSM7 = 'gsm7'
+UCS2 = 'ucs2'
+
+# (single segment limit, per segment limit once concatenated), in septets or UTF-16 units
+SEGMENT_LIMITS = {
+    GSM7: (160, 153),
+    UCS2: (70, 67),
+}
+
+# Typographic characters phones and keyboards substitute, mapped to GSM equivalents
+TYPOGRAPHIC_REPLACEMENTS = {
+    '‘': "'", '’': "'", '‚': "'", '‛': "'", 'ʼ': "'", '´': "'", '`': "'",
+    '“': '"', '”': '"', '„': '"',
+    '‐': '-', '‑': '-', '‒': '-', '–': '-', '—': '-', '−': '-',
+    '…': '...',
+    ' ': ' ', ' ': ' ', ' ': ' ', ' ': ' ', ' ': ' ',
+    '​': '', '‌': '', '‍': '', '﻿': '',
+    'ç': 'Ç',  # Lowercase c cedilla is only in GSM as the capital's glyph
+    'ı': 'i', 'ł': 'l', 'Ł': 'L', 'ð': 'd', 'đ': 'd', 'Đ': 'D',
+    'þ': 'th', 'Þ': 'Th', 'œ': 'oe', 'Œ': 'OE',
+}
+
+# Phrase shortenings applied in order, longest phrases first. Each keeps the
+# meaning and urgency of the original: headers are never shortened, since a
+# contact may act on the first word alone.
+DEFAULT_ABBREVIATIONS = (
+    ("has triggered an emergency alert.", "sent an emergency alert."),
+    ("has triggered a warning alert.", "sent a warning."),
+    ("would like you to check on them.", "asks you to check on them."),
+    ("has triggered an alert.", "sent an alert."),
+    ("'s previous alert was triggered by mistake.", "'s last alert was a mistake."),
+    ("Please contact them immediately at", "Contact them immediately at"),
+    ("Please check on them when possible at", "Check on them when possible at"),
+    ("Please contact them when convenient at", "Contact them when convenient at"),
+    ("Please contact them at", "Contact them at"),
+    ("No action is required. The user is safe.", "No action needed, they are safe."),
+    ("\nLocation: ", "\n"),
+)
+
+MAPS_LINK = re.compile(r'https?://(?:www\.)?maps\.google\.com/\?q=(-?\d+(?:\.\d+)?),(-?\d+(?:\.\d+)?)')
+
+def is_gsm7(text):
+    """Check if text can be sent in the GSM 7-bit alphabet"""
+    return all(char in GSM7_BASIC or char in GSM7_EXTENDED for char in text)
+
+def detect_encoding(text):
+    """Get the encoding a phone or gateway would pick for the text, GSM7 or UCS2"""
+    return GSM7 if is_gsm7(text) else UCS2
+
+def _unit_costs(text, encoding):
+    """Length of each character in septets or UTF-16 code units"""
+    if encoding == GSM7:
+        return [2 if char in GSM7_EXTENDED else 1 for char in text]
+    return [2 if ord(char) > 0xFFFF else 1 for char in text]
+
+def segment_count(text, encoding=None):
+    """
+    Number of SMS segments the text needs.
+
+    Concatenated segments lose room to the UDH header, and an escaped GSM
+    character or a surrogate pair is never split across two segments.
+    """
+    encoding = encoding or detect_encoding(text)
+    costs = _unit_costs(text, encoding)
+    single, per_segment = SEGMENT_LIMITS[encoding]
+    if sum(costs) <= single:
+        return 1 if text else 0
+
+    segments, used = 1, 0
+    for cost in costs:
+        if used + cost > per_segment:
+            segments += 1
+            used = 0
+        used += cost
+    return segments
+
+def analyze(text):
+    """
+    Describe how a message body will be sent.
+
+    Returns:
+        dict: encoding, units (septets or UTF-16 units), segments, and the
+              characters that force UCS-2
+    """
+    encoding = detect_encoding(text)
+    return {
+        'encoding': encoding,
+        'units': sum(_unit_costs(text, encoding)),
+        'segments': segment_count(text, encoding),
+        'non_gsm': sorted({char for char in text if char not in GSM7_BASIC and char not in GSM7_EXTENDED}),
+    }
+
+def transliterate(text):
+    """
+    Replace characters outside GSM-7 with the nearest GSM equivalent.
+    Accented Latin letters lose their accent unless GSM has them as is.
+    Characters with no Latin equivalent, such as Urdu script, are kept.
+    """
+    result = []
+    for char in text:
+        if char in GSM7_BASIC or char in GSM7_EXTENDED:
+            result.append(char)
+            continue
+        if char in TYPOGRAPHIC_REPLACEMENTS:
+            result.append(TYPOGRAPHIC_REPLACEMENTS[char])
+            continue
+        stripped = ''.join(
+            part for part in unicodedata.normalize('NFKD', char)
+            if not unicodedata.combining(part)
+        )
+        result.append(stripped if stripped and is_gsm7(stripped) else char)
+    return ''.join(result)
+
+def shorten_location_link(text, precision=5):
+    """
+    Shorten Google Maps links: drop the scheme and round coordinates.
+    Five decimals is about a metre, finer than a phone GPS fix.
+    """
+    def shorten(match):
+        lat = f"{float(match.group(1)):.{precision}f}".rstrip('0').rstrip('.')
+        lon = f"{float(match.group(2)):.{precision}f}".rstrip('0').rstrip('.')
+        return f"maps.google.com/?q={lat},{lon}"
+    return MAPS_LINK.sub(shorten, text)
+
+def abbreviate(text, abbreviations=DEFAULT_ABBREVIATIONS):
+    """Apply phrase shortenings in order"""
+    for phrase, short in abbreviations:
+        text = text.replace(phrase, short)
+    return text
+
+class SmsEncoder:
+    """
+    Fits message bodies into a target number of SMS segments.
+
+    Compaction steps run in order and stop as soon as the body fits, so a
+    message that already fits is sent unchanged. Transliteration comes
+    early because one non-GSM character more than halves the room per
+    segment. The result reports the final encoding and segment count.
+    """
+
+    DEFAULT_STEPS = ('location', 'transliterate', 'abbreviate')
+
+    def __init__(self, target_segments=1, steps=DEFAULT_STEPS, abbreviations=DEFAULT_ABBREVIATIONS,
+                 coordinate_precision=5):
+        """
+        Args:
+            target_segments (int): Segments to aim for
+            steps (tuple): Compaction steps to try, in order, from 'location',
+                           'transliterate' and 'abbreviate'
+            abbreviations (tuple): (phrase, replacement) pairs for the abbreviate step
+            coordinate_precision (int): Decimals kept in shortened location links
+        """
+        self.target_segments = target_segments
+        self.steps = tuple(steps)
+        self.abbreviations = tuple(abbreviations)
+        self.coordinate_precision = coordinate_precision
+
+    def _apply(self, step, text):
+        if step == 'location':
+            return shorten_location_link(text, self.coordinate_precision)
+        if step == 'transliterate':
+            return transliterate(text)
+        if step == 'abbreviate':
+            return abbreviate(text, self.abbreviations)
+        raise ValueError(f"Unknown compaction step: {step}")
+
+    def encode(self, text, target_segments=None):
+        """
+        Compact a body until it fits the target segment count or steps run out.
+
+        Returns:
+            dict: text, encoding, segments, original_segments, and the steps applied
+        """
+        target = target_segments or self.target_segments
+        original_segments = segment_count(text)
+        applied = []
+        for step in self.steps:
+            if segment_count(text) <= target:
+                break
+            compacted = self._apply(step, text)
+            if compacted != text:
+                text = compacted
+                applied.append(step)
+
+        encoding = detect_encoding(text)
+        return {
+            'text': text,
+            'encoding': encoding,
+            'segments': segment_count(text, encoding),
+            'original_segments': original_segments,
+            'steps': applied,
+        }
+
+    def fit(self, text, target_segments=None):
+        """Get just the compacted body"""
+        return self.encode(text, target_segments)['text']
+
+# Singleton instance
+sms_encoder = SmsEncoder()
@@ -0,0 +1,449 @@
+import math
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock
+from urllib.parse import urlparse
+import requests
+from utils.connectivity_monitor import connectivity_monitor
+from utils.gateway_health import GatewayHealth
+from utils.shared import shared_instance
+
+LOOPBACK_HOSTS = ('localhost', '127.0.0.1', '::1')
+
+class SmsGateway:
+    """Base class for SMS providers"""
+
+    name = 'gateway'
+    requires_network = True  # False for gateways that work without connectivity
+
+    def is_configured(self):
+        """Check if the provider has the credentials it needs"""
+        return True
+
+    def send(self, phone_number, message, timeout=10):
+        """
+        Send a single SMS.
+
+        Args:
+            phone_number (str): Receiver number
+            message (str): Message body
+            timeout (float): Seconds to wait for the provider
+
+        Returns:
+            dict: {'status': 'success' or 'error', 'message': str}, plus
+                  'provider_id' when the provider returns a message id,
+                  'rate_limited' when the provider is throttling, and
+                  'rejected' when the provider turned down this message
+                  (bad number, content) rather than failing
+        """
+        raise NotImplementedError
+
+    def warm_up(self, timeout=5):
+        """Open a connection ahead of time so the next send skips connection setup"""
+        return True
+
+    def fetch_delivery_reports(self, provider_ids):
+        """
+        Look up delivery status for previously sent messages.
+
+        Args:
+            provider_ids (list): Provider message ids
+
+        Returns:
+            list: Reports as {'provider_message_id', 'status', 'error'} using
+                  AlertDelivery statuses, empty if the provider has no lookup
+        """
+        return []
+
+class VeevotechGateway(SmsGateway):
+    """Veevotech HTTP SMS API"""
+
+    name = 'veevotech'
+
+    def __init__(self, base_url=None, api_hash=None, sender='Default', pool_size=16):
+        self.base_url = base_url or os.getenv('VEEVOTECH_BASE_URL', 'https://api.veevotech.com/v3')
+        self.api_hash = api_hash or os.getenv('VEEVOTECH_API_HASH')
+        self.sender = sender
+        # Keep-alive session so repeated sends reuse pooled connections,
+        # sized to match concurrent sends so connections are not discarded
+        self.http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.http.mount('https://', adapter)
+        self.http.mount('http://', adapter)
+
+    def is_configured(self):
+        return bool(self.base_url and self.api_hash)
+
+    @property
+    def requires_network(self):
+        # A local mock gateway is reachable even when the device is offline
+        return urlparse(self.base_url).hostname not in LOOPBACK_HOSTS
+
+    def warm_up(self, timeout=5):
+        try:
+            self.http.head(self.base_url, timeout=timeout)
+            return True
+        except requests.exceptions.RequestException as e:
+            print(f"Veevotech warm-up failed: {str(e)}")
+            return False
+
+    def send(self, phone_number, message, timeout=10):
+        url = f"{self.base_url}/sendsms"
+        params = {
+            "hash": self.api_hash,
+            "receivernum": phone_number,
+            "sendernum": self.sender,
+            "textmessage": message
+        }
+
+        try:
+            response = self.http.get(url, params=params, timeout=timeout)
+            if response.status_code == 429:
+                return {'status': 'error', 'message': 'Rate limit exceeded', 'rate_limited': True}
+            if 400 <= response.status_code < 500:
+                return {'status': 'error', 'message': f'Request rejected with HTTP {response.status_code}',
+                        'rejected': True}
+            response.raise_for_status()
+
+            # Parse response
+            api_response = response.json() if response.text else {}
+            is_success = response.status_code == 200 and api_response.get('status') != 'error'
+
+            result = {
+                'status': 'success' if is_success else 'error',
+                'message': api_response.get('message', 'Message sent' if is_success else 'Failed to send message')
+            }
+            if not is_success:
+                result['rejected'] = True  # The gateway answered and refused this message
+            return result
+        except requests.exceptions.Timeout:
+            return {'status': 'error', 'message': 'Request timed out'}
+        except requests.exceptions.ConnectionError as e:
+            connectivity_monitor.report_failure()
+            return {'status': 'error', 'message': f'API request failed: {str(e)}'}
+        except requests.exceptions.RequestException as e:
+            return {'status': 'error', 'message': f'API request failed: {str(e)}'}
+        except ValueError as e:
+            return {'status': 'error', 'message': f'Invalid API response: {str(e)}'}
+        except Exception as e:
+            return {'status': 'error', 'message': f'Unexpected error: {str(e)}'}
+
+class TwilioGateway(SmsGateway):
+    """Twilio Programmable Messaging"""
+
+    name = 'twilio'
+
+    def __init__(self, account_sid=None, auth_token=None, from_number=None, timeout=10):
+        self.account_sid = account_sid or os.getenv('TWILIO_ACCOUNT_SID')
+        self.auth_token = auth_token or os.getenv('TWILIO_AUTH_TOKEN')
+        self.from_number = from_number or os.getenv('TWILIO_FROM_NUMBER')
+        self.timeout = timeout
+        # One client per timeout step, each keeps its own pooled connections
+        self._clients = {}
+        self._clients_lock = Lock()
+
+    def is_configured(self):
+        return bool(self.account_sid and self.auth_token and self.from_number)
+
+    def _get_client(self, timeout=None):
+        """Get a client whose requests time out after timeout seconds, rounded up to half a second"""
+        timeout = math.ceil((timeout or self.timeout) * 2) / 2
+        with self._clients_lock:
+            client = self._clients.get(timeout)
+            if client is None:
+                # Imported lazily so the app runs without Twilio credentials or package
+                from twilio.rest import Client
+                from twilio.http.http_client import TwilioHttpClient
+                client = self._clients[timeout] = Client(
+                    self.account_sid,
+                    self.auth_token,
+                    http_client=TwilioHttpClient(timeout=timeout)
+                )
+        return client
+
+    def send(self, phone_number, message, timeout=10):
+        try:
+            result = self._get_client(timeout).messages.create(
+                to=phone_number,
+                from_=self.from_number,
+                body=message
+            )
+            if result.status == 'failed' or result.error_code:
+                return {'status': 'error', 'message': result.error_message or 'Failed to send message',
+                        'rejected': True}
+            return {'status': 'success', 'message': 'Message sent', 'provider_id': result.sid}
+        except ImportError as e:
+            return {'status': 'error', 'message': f'Twilio is not installed: {str(e)}'}
+        except Exception as e:
+            # TwilioRestException carries the HTTP status, transport errors have none
+            status = getattr(e, 'status', None)
+            return {
+                'status': 'error',
+                'message': f'Twilio request failed: {str(e)}',
+                'rate_limited': status == 429,
+                'rejected': status is not None and 400 <= status < 500 and status != 429
+            }
+
+    # Twilio message statuses mapped to AlertDelivery statuses
+    STATUS_MAP = {
+        'accepted': 'sent',
+        'queued': 'sent',
+        'sending': 'sent',
+        'sent': 'gateway_acked',
+        'delivered': 'delivered',
+        'undelivered': 'failed',
+        'failed': 'failed',
+    }
+
+    def fetch_delivery_reports(self, provider_ids):
+        reports = []
+        for sid in provider_ids:
+            try:
+                message = self._get_client().messages(sid).fetch()
+            except Exception as e:
+                print(f"Error fetching Twilio status for {sid}: {str(e)}")
+                continue
+            status = self.STATUS_MAP.get(message.status)
+            if status:
+                reports.append({
+                    'provider_message_id': sid,
+                    'status': status,
+                    'error': message.error_message
+                })
+        return reports
+
+class StubGateway(SmsGateway):
+    """
+    In-process gateway for local testing.
+    Simulates provider latency and failures and records every message it accepts.
+    """
+
+    requires_network = False
+
+    def __init__(self, name='stub', latency=0.05, jitter=0.0, failure_rate=0.0, seed=None):
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.sent = []
+        self.delivered = set()  # Provider ids to report as delivered
+        self._random = random.Random(seed)
+        self._lock = Lock()
+
+    def send(self, phone_number, message, timeout=10):
+        with self._lock:
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.failure_rate
+
+        if delay > timeout:
+            time.sleep(timeout)
+            return {'status': 'error', 'message': 'Request timed out'}
+        time.sleep(delay)
+
+        if failed:
+            return {'status': 'error', 'message': 'Simulated gateway failure'}
+        with self._lock:
+            self.sent.append((phone_number, message))
+            provider_id = f"{self.name}-{len(self.sent)}"
+            self.delivered.add(provider_id)
+        return {'status': 'success', 'message': 'Message sent', 'provider_id': provider_id}
+
+    def fetch_delivery_reports(self, provider_ids):
+        with self._lock:
+            return [
+                {'provider_message_id': provider_id, 'status': 'delivered', 'error': None}
+                for provider_id in provider_ids if provider_id in self.delivered
+            ]
+
+class GatewayRouter:
+    """
+    Routes SMS across several gateways ordered by health.
+    Sends go to the healthiest gateway first. If it has not acked within an
+    adaptive threshold, the same message is also sent through the next gateway
+    and whichever succeeds first wins. Emergency latency is worth a duplicate SMS,
+    but not every message is: with hedging off (OTPs, where a second provider
+    would deliver a second, different-looking code) the next gateway is only
+    tried after the current one has failed.
+    Each gateway's timeout follows its observed latency, and gateways whose
+    circuit is open are skipped so sends fail fast instead of waiting them out.
+    While the device is offline, gateways that need the network are skipped too,
+    unless the send asks to be attempted anyway and only the probe says so.
+    """
+
+    def __init__(self, gateways, hedge_min=0.5, hedge_max=4.0, hedge_default=2.0, max_workers=16,
+                 connectivity=None):
+        self.gateways = list(gateways)
+        self.connectivity = connectivity or connectivity_monitor
+        self.health = {gateway.name: GatewayHealth() for gateway in self.gateways}
+        self.hedge_min = hedge_min
+        self.hedge_max = hedge_max
+        self.hedge_default = hedge_default
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sms')
+
+    def get_gateway(self, name):
+        """Get a gateway by name, or None"""
+        for gateway in self.gateways:
+            if gateway.name == name:
+                return gateway
+        return None
+
+    def configured_gateways(self):
+        """Gateways that have credentials"""
+        return [gateway for gateway in self.gateways if gateway.is_configured()]
+
+    def ordered_gateways(self, attempt_offline=False):
+        """
+        Configured gateways that can send right now, healthiest first.
+
+        Args:
+            attempt_offline (bool): Keep gateways that need the network unless
+                the OS confirms the device is offline
+        """
+        online = self.connectivity.is_online() or (
+            attempt_offline and not self.connectivity.is_confirmed_offline()
+        )
+        available = [
+            gateway for gateway in self.configured_gateways()
+            if self.health[gateway.name].breaker.is_available()
+            and (online or not gateway.requires_network)
+        ]
+        return sorted(available, key=lambda gateway: self.health[gateway.name].score, reverse=True)
+
+    def hedge_delay(self, gateway):
+        """Seconds to wait for a gateway before hedging to the next one"""
+        expected = self.health[gateway.name].expected_ack_time()
+        if expected is None:
+            return self.hedge_default
+        return min(self.hedge_max, max(self.hedge_min, expected))
+
+    def warm_up(self, timeout=5):
+        """Warm connections to the gateways a send would use first"""
+        for gateway in self.ordered_gateways()[:2]:
+            self._executor.submit(gateway.warm_up, timeout)
+
+    def _timed_send(self, gateway, phone_number, message, timeout):
+        health = self.health[gateway.name]
+        started = time.monotonic()
+        result = gateway.send(phone_number, message, timeout=health.timeout(timeout))
+        if gateway.requires_network and (result['status'] == 'success' or result.get('rejected')
+                                         or result.get('rate_limited')):
+            self.connectivity.report_success()  # The provider answered, so the network is up
+        health.record(
+            result['status'] == 'success',
+            time.monotonic() - started,
+            rate_limited=result.get('rate_limited', False),
+            rejected=result.get('rejected', False)
+        )
+        result['gateway'] = gateway.name
+        return result
+
+    def send(self, phone_number, message, timeout=10, hedge=True, attempt_offline=False):
+        """
+        Send an SMS with hedging and failover.
+
+        Args:
+            phone_number (str): Receiver number
+            message (str): Message body
+            timeout (float): Seconds each gateway may take
+            hedge (bool): Also send through the next gateway when the current one is slow
+            attempt_offline (bool): Try the network gateways even when the probe
+                says the device is offline, for sends too important to queue
+
+        Returns:
+            dict: Result of the first successful gateway, or the last failure
+        """
+        if not self.configured_gateways():
+            return {'status': 'error', 'message': 'No SMS gateway configured'}
+        unavailable = {
+            'status': 'error',
+            'message': 'All SMS gateways are unavailable',
+            'circuit_open': True
+        }
+
+        gateways = self.ordered_gateways(attempt_offline)
+        if not gateways:
+            if not self.connectivity.is_online():
+                # Skip the doomed request, the caller queues it until the network returns
+                return {'status': 'error', 'message': 'No network connection', 'offline': True}
+            return unavailable
+
+        pending = {}
+        last_result = None
+        next_index = 0
+        deadline = time.monotonic() + timeout
+
+        while True:
+            # Start the next gateway when nothing is in flight or the current ones are slow
+            started = None
+            while started is None and next_index < len(gateways) and (hedge or not pending):
+                gateway = gateways[next_index]
+                next_index += 1
+                if self.health[gateway.name].breaker.allow_request():
+                    future = self._executor.submit(self._timed_send, gateway, phone_number, message, timeout)
+                    pending[future] = gateway
+                    started = gateway
+            wait_time = self.hedge_delay(started) if hedge and started and next_index < len(gateways) else None
+
+            if not pending:
+                break
+
+            remaining = max(0, deadline - time.monotonic())
+            done, _ = wait(
+                list(pending),
+                timeout=remaining if wait_time is None else min(wait_time, remaining),
+                return_when=FIRST_COMPLETED
+            )
+
+            for future in done:
+                pending.pop(future)
+                result = future.result()
+                if result['status'] == 'success':
+                    return result
+                last_result = result
+
+            if not done and wait_time is None:
+                # Out of gateways to hedge with and nothing acked before the deadline
+                break
+            if not done and time.monotonic() >= deadline:
+                break
+
+        if last_result is None and next_index >= len(gateways) and not pending:
+            # Every circuit refused the send
+            return unavailable
+        result = last_result or {'status': 'error', 'message': 'Request timed out'}
+        if not self.connectivity.is_online():
+            result['offline'] = True  # Attempted anyway and failed, queue it until the network returns
+        return result
+
+def build_gateways(names=None):
+    """
+    Build gateways by name.
+
+    Args:
+        names (list, optional): Gateway names in priority order, defaults to the
+                                SMS_GATEWAYS environment variable or veevotech,twilio
+
+    Returns:
+        list: Gateway instances
+    """
+    if names is None:
+        names = os.getenv('SMS_GATEWAYS', 'veevotech,twilio').split(',')
+
+    gateways = []
+    for name in (name.strip().lower() for name in names):
+        if name == 'veevotech':
+            gateways.append(VeevotechGateway())
+        elif name == 'twilio':
+            gateways.append(TwilioGateway())
+        elif name.startswith('stub'):
+            gateways.append(StubGateway(name=name))
+        elif name:
+            print(f"Unknown SMS gateway: {name}")
+    return gateways
+
+@shared_instance
+def get_sms_router():
+    """Get the shared router, built on first use so environment settings are loaded"""
+    return GatewayRouter(build_gateways())
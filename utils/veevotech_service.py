@@ -1,93 +1,202 @@
-import requests
-import json
-import random
-import time
-from datetime import datetime, timedelta
+from utils.message_scheduler import get_message_scheduler, OTP
+from utils.otp_governor import otp_send_governor, COALESCE, LIMITED
+from utils.otp_store import get_otp_store
+from utils.phone_util import normalize_phone_number
+from kivy.clock import Clock
+from threading import Event, Lock
+import secrets
+
+class OtpRequest:
+    """Handle for a verification code being sent in the background"""
+
+    def __init__(self, phone_number, callback=None):
+        self.phone_number = phone_number
+        self.status = 'sending'
+        self.result = None
+        self._callbacks = [callback] if callback else []
+        self._followers = []  # Coalesced requests that finish with this one
+        self._lock = Lock()
+        self._done = Event()
+
+    def done(self):
+        """Check if the send has finished"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Wait for the send to finish, returns the result dict or None on timeout"""
+        self._done.wait(timeout)
+        return self.result
+
+    def add_callback(self, callback):
+        """Also hand the result to callback on the main thread, straight away if already known"""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        Clock.schedule_once(lambda dt: callback(self.result))
+
+    def follow(self, request):
+        """Finish another request with this one's result, for a coalesced send"""
+        with self._lock:
+            if not self._done.is_set():
+                self._followers.append(request)
+                return
+        request.finish(dict(self.result, coalesced=True))
+
+    def finish(self, result):
+        """Record the result and hand it to the callbacks on the main thread"""
+        with self._lock:
+            self.result = result
+            self.status = result['status']
+            self._done.set()
+            callbacks, followers = self._callbacks, self._followers
+            self._callbacks, self._followers = [], []
+        for callback in callbacks:
+            Clock.schedule_once(lambda dt, callback=callback: callback(result))
+        for request in followers:
+            request.finish(dict(result, coalesced=True))
+
+# Codes still on their way to the gateway, by OTP key, shared by every screen like the store
+_in_flight = {}
+_in_flight_lock = Lock()
 
 class VeevotechService:
     def __init__(self):
-        self.api_hash = "cb7a018165c3f899e05c692ce428eb64"
-        self.base_url = "https://api.veevotech.com/v3"
-        self.otp_storage = {}  # Temporary storage for OTPs
+        self.scheduler = get_message_scheduler()  # Shared outbound queue, OTPs yield to alerts
+        self.otp_store = get_otp_store()  # Shared by every screen, so a code sent on one can be verified on another
         self.otp_expiry = 1  # OTP expiry in minutes
+        self.governor = otp_send_governor  # Per-number resend limits, shared like the store
+
+    @staticmethod
+    def _otp_key(phone_number):
+        """Key codes by the normalized number so screens that format it differently agree"""
+        return normalize_phone_number(phone_number) or phone_number
 
     def generate_otp(self):
         """Generate a 6-digit OTP"""
-        return str(random.randint(100000, 999999))
+        return str(100000 + secrets.randbelow(900000))
 
     def send_verification_code(self, phone_number):
-        """Send verification code using Veevotech API"""
+        """Send verification code using Veevotech API and wait for the result
+        
+        Blocks until the gateway answers, use send_verification_code_async from the UI.
+        
+        Returns:
+            dict: See send_verification_code_async
+        """
+        return self.send_verification_code_async(phone_number).wait()
+
+    def send_verification_code_async(self, phone_number, callback=None):
+        """Start sending a verification code and return straight away
+        
+        A request for a number that was just sent a code reuses the pending
+        code without another gateway round trip. If that code is still on its
+        way to the gateway, the request finishes with the gateway's answer.
+        
+        Args:
+            phone_number: Number to send the code to
+            callback: Called on the Kivy main thread with the result dict once known
+            
+        Returns:
+            OtpRequest: Handle whose result is a dict with status 'pending' or 'error'
+                and a message, 'coalesced' is True when the outstanding code was
+                reused, 'retry_after' is set when rate limited
+        """
+        request = OtpRequest(phone_number, callback)
+        key = self._otp_key(phone_number)
+        reservation = None
+        issued = None
         try:
+            reservation = self.governor.acquire(key, self.otp_store.pending(key) is not None)
+            if reservation['decision'] == COALESCE:
+                print(f"Verification code already pending for: {phone_number}")
+                with _in_flight_lock:
+                    in_flight = _in_flight.get(key)
+                if in_flight is not None:
+                    in_flight.follow(request)
+                else:
+                    request.finish({'status': 'pending', 'message': 'Verification code sent', 'coalesced': True})
+                return request
+            if reservation['decision'] == LIMITED:
+                print(f"Verification code requests rate limited for: {phone_number}")
+                request.finish({
+                    'status': 'error',
+                    'message': f"Too many verification requests. Please wait {reservation['retry_after']} seconds",
+                    'retry_after': reservation['retry_after']
+                })
+                return request
+            
             # Generate OTP
             otp = self.generate_otp()
             
             # Prepare message
             message = f"Your Safinity verification code is: {otp}"
             
-            # Prepare API request URL with query parameters
-            url = f"{self.base_url}/sendsms"
-            params = {
-                "hash": self.api_hash,
-                "receivernum": phone_number,
-                "sendernum": "Default",
-                "textmessage": message
-            }
-            
-            print(f"Sending SMS with params: {params}")  # Debug print
+            print(f"Sending verification SMS to: {phone_number}")  # Debug print
             
-            # Make API request
-            response = requests.get(url, params=params)
-            print(f"API Response: {response.text}")  # Debug print
+            # Only a hash of the OTP is kept, stored before sending so a fast reply always finds it
+            issued = self.otp_store.issue(key, otp, ttl=self.otp_expiry * 60)
             
-            if response.status_code == 200:
-                # Store OTP with timestamp
-                self.otp_storage[phone_number] = {
-                    'otp': otp,
-                    'timestamp': datetime.now()
-                }
-                print(f"OTP sent successfully: {otp}")
-                return {'status': 'pending', 'message': 'Verification code sent'}
-            else:
-                print(f"Failed to send OTP: {response.text}")
-                return {'status': 'error', 'message': 'Failed to send verification code'}
-                
+            # Queue at OTP priority, the scheduler routes it through the healthiest gateway
+            with _in_flight_lock:
+                _in_flight[key] = request
+            future = self.scheduler.submit(phone_number, message, OTP)
         except Exception as e:
             print(f"Error sending OTP: {str(e)}")
-            return {'status': 'error', 'message': str(e)}
+            self._abandon(key, reservation, issued)
+            self._finish(key, request, {'status': 'error', 'message': str(e)})
+            return request
+
+        future.add_done_callback(
+            lambda done: self._finish(key, request, self._on_code_sent(phone_number, key, reservation, issued, done))
+        )
+        return request
+
+    @staticmethod
+    def _finish(key, request, result):
+        """Finish a send, then stop coalescing onto it so late followers still see its result"""
+        request.finish(result)
+        with _in_flight_lock:
+            if _in_flight.get(key) is request:
+                del _in_flight[key]
+
+    def _on_code_sent(self, phone_number, key, reservation, issued, future):
+        """Turn the gateway result into the OTP result, runs on the scheduler's worker"""
+        try:
+            response = future.result()
+        except Exception as e:
+            response = {'status': 'error', 'message': str(e)}
+        print(f"Gateway response: {response}")  # Debug print
+        
+        if response['status'] == 'success':
+            print(f"OTP sent successfully to: {phone_number}")
+            return {'status': 'pending', 'message': 'Verification code sent'}
+        
+        print(f"Failed to send OTP: {response['message']}")
+        self._abandon(key, reservation, issued)
+        return {'status': 'error', 'message': 'Failed to send verification code'}
+
+    def _abandon(self, key, reservation, issued):
+        """Withdraw a code that never reached the gateway and give back its send
+        
+        Only the code this request issued is withdrawn, an earlier code the
+        user may already have stays valid.
+        """
+        if issued is not None:
+            self.otp_store.withdraw(issued)
+        if reservation:
+            self.governor.release(key, reservation['reserved_at'])
 
     def verify_code(self, phone_number, code):
         """Verify the OTP code"""
         try:
-            # Check if we have a stored OTP for this phone number
-            if phone_number not in self.otp_storage:
-                print(f"No OTP found for phone number: {phone_number}")
-                return {'status': 'rejected', 'message': 'No verification code was sent to this number'}
-            
-            # Get stored OTP data
-            otp_data = self.otp_storage.get(phone_number)
-            stored_otp = otp_data.get('otp')
-            timestamp = otp_data.get('timestamp')
-            
-            # Check if OTP has expired
-            current_time = datetime.now()
-            expiry_time = timestamp + timedelta(minutes=self.otp_expiry)
-            
-            if current_time > expiry_time:
-                print(f"OTP expired for phone number: {phone_number}")
-                # Remove expired OTP
-                del self.otp_storage[phone_number]
-                return {'status': 'rejected', 'message': 'Verification code has expired. Please request a new one'}
-            
-            # Verify OTP
-            if code == stored_otp:
+            result = self.otp_store.verify(self._otp_key(phone_number), code)
+            if result['status'] == 'approved':
                 print(f"OTP verified successfully for: {phone_number}")
-                # Remove used OTP
-                del self.otp_storage[phone_number]
-                return {'status': 'approved', 'message': 'Verification successful'}
             else:
-                print(f"Invalid OTP for phone number: {phone_number}. Expected: {stored_otp}, Got: {code}")
-                return {'status': 'rejected', 'message': 'Invalid verification code'}
+                print(f"OTP rejected for phone number: {phone_number}: {result['message']}")
+            return result
                 
         except Exception as e:
             print(f"Error verifying OTP: {str(e)}")
-            return {'status': 'error', 'message': f'Verification error: {str(e)}'}
\ No newline at end of file
+            return {'status': 'error', 'message': f'Verification error: {str(e)}'}